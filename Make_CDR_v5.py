@@ -1,10 +1,7 @@
 import sys
 import os
-import csv
 import re
-import sqlite3
-from datetime import datetime, timedelta
-from pathlib import Path
+import multiprocessing
 
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QPushButton, QTextBrowser, QFileDialog,
@@ -13,9 +10,9 @@ from PySide6.QtCore import QThread, Signal, Qt
 from PySide6.QtGui import QFont, QIcon
 
 import requests
-import pyodbc
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+
+from cdr.core import (DEFAULT_PROCESS_OPTIONS, CDRProcessor, SqlConnectionPool,
+                      load_db_config, load_process_options, setup_member_mobile_table)
 
 
 def download_db():
@@ -59,320 +56,23 @@ def download_db():
         return False, str(e)
 
 
-def load_db_config():
-    """Config_DB.db에서 DB 연결 정보 로드"""
-    db_path = os.path.join("./DB", "Config_DB.db")
-    
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        query = "SELECT DB_Type, Host, Port, DB_Name, DB_ID, DB_PW FROM DBCON WHERE Name = 'HD_MSSQL'"
-        cursor.execute(query)
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            return {
-                'DB_Type': result[0],
-                'Host': result[1],
-                'Port': result[2],
-                'DB_Name': result[3],
-                'DB_ID': result[4],
-                'DB_PW': result[5]
-            }
-        else:
-            raise Exception("HD_MSSQL 설정을 찾을 수 없습니다.")
-            
-    except Exception as e:
-        raise Exception(f"DB 설정 로드 실패: {e}")
-
-
 class CDRProcessThread(QThread):
-    """CDR 파일 처리를 위한 워커 쓰레드"""
+    """CDR 파일 처리를 위한 워커 쓰레드 (처리는 cdr.core.CDRProcessor가 담당)"""
     log_signal = Signal(str)
     progress_signal = Signal(int)
     finished_signal = Signal(bool, str)
     
-    def __init__(self, csv_file, db_config):
+    def __init__(self, csv_file, db_config, options=None, db_pool=None):
         super().__init__()
-        self.csv_file = csv_file
-        self.db_config = db_config
-        self.conn = None
-        
-    def log(self, message):
-        """로그 메시지 전송"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_signal.emit(f"[{timestamp}] {message}")
-        
+        self.processor = CDRProcessor(
+            csv_file, db_config, options, db_pool,
+            on_log=self.log_signal.emit,
+            on_progress=self.progress_signal.emit,
+            on_finished=self.finished_signal.emit,
+        )
+    
     def run(self):
-        try:
-            # 1. CSV 파일 검증
-            self.log("=" * 60)
-            self.log("CDR 파일 처리 시작")
-            self.log("=" * 60)
-            self.progress_signal.emit(5)
-            
-            if not os.path.exists(self.csv_file):
-                raise Exception(f"CSV 파일을 찾을 수 없습니다: {self.csv_file}")
-            
-            # 파일명에서 날짜 추출 (CDR-25120900.csv -> 25120900)
-            filename = Path(self.csv_file).stem
-            date_str = filename.split('-')[-1]
-            self.log(f"파일명: {filename}")
-            self.log(f"추출된 날짜: {date_str}")
-            
-            # 날짜 파싱 (YYMMDD00 형식)
-            try:
-                file_date = datetime.strptime(date_str[:6], '%y%m%d')
-                # 백업은 다음날 00시에 되므로 하루 전 날짜가 실제 데이터 날짜
-                actual_date = file_date - timedelta(days=1)
-                formatted_date = actual_date.strftime('%Y%m%d')
-                self.log(f"실제 데이터 날짜: {actual_date.strftime('%Y-%m-%d')}")
-            except Exception as e:
-                raise Exception(f"날짜 파싱 실패: {e}")
-            
-            self.progress_signal.emit(10)
-            
-            # 2. CSV 데이터 읽기
-            self.log("\nCSV 파일 읽기 중...")
-            csv_data = []
-            try:
-                with open(self.csv_file, 'r', encoding='utf-8-sig') as f:
-                    reader = csv.reader(f)
-                    csv_data = list(reader)
-                self.log(f"총 {len(csv_data)}개의 레코드를 읽었습니다.")
-            except Exception as e:
-                raise Exception(f"CSV 파일 읽기 실패: {e}")
-            
-            if len(csv_data) == 0:
-                raise Exception("CSV 파일에 데이터가 없습니다.")
-            
-            self.progress_signal.emit(20)
-            
-            # 3. DB 연결
-            self.log("\nSQL Server에 연결 중...")
-            self.log(f"서버: {self.db_config['Host']}:{self.db_config['Port']}")
-            self.log(f"데이터베이스: {self.db_config['DB_Name']}")
-            
-            try:
-                conn_str = (
-                    f"DRIVER={{{self.db_config['DB_Type']}}};"
-                    f"SERVER={self.db_config['Host']},{self.db_config['Port']};"
-                    f"DATABASE={self.db_config['DB_Name']};"
-                    f"UID={self.db_config['DB_ID']};"
-                    f"PWD={self.db_config['DB_PW']}"
-                )
-                self.conn = pyodbc.connect(conn_str)
-                self.log("데이터베이스 연결 성공")
-            except Exception as e:
-                raise Exception(f"DB 연결 실패: {e}")
-            
-            self.progress_signal.emit(25)
-            
-            # 4. 임시 테이블 생성
-            table_name = f"[{filename}]"
-            self.log(f"\n임시 테이블 생성 중: {table_name}")
-            cursor = self.conn.cursor()
-            
-            try:
-                # 테이블이 이미 존재하면 삭제
-                cursor.execute(f"""
-                    IF OBJECT_ID(N'{table_name}', N'U') IS NOT NULL
-                        DROP TABLE {table_name}
-                """)
-                self.conn.commit()
-                
-                # 테이블 생성
-                create_table_sql = f"""
-                CREATE TABLE {table_name}(
-                    [RecDT] [datetime2](7) NULL,
-                    [SendNum] [nvarchar](50) NULL,
-                    [RecvNum] [nvarchar](50) NULL,
-                    [Gubun] [nvarchar](50) NULL,
-                    [StartDT] [datetime2](7) NULL,
-                    [EndDT] [datetime2](7) NULL,
-                    [CallGubun] [nvarchar](50) NULL,
-                    [Result] [nvarchar](50) NULL
-                ) ON [PRIMARY]
-                """
-                cursor.execute(create_table_sql)
-                self.conn.commit()
-                self.log("테이블 생성 완료")
-            except Exception as e:
-                raise Exception(f"테이블 생성 실패: {e}")
-            
-            self.progress_signal.emit(30)
-            
-            # 5. 데이터 삽입
-            self.log(f"\n데이터 삽입 중... (총 {len(csv_data)}개)")
-            try:
-                insert_sql = f"""
-                    INSERT INTO {table_name} 
-                    (RecDT, SendNum, RecvNum, Gubun, StartDT, EndDT, CallGubun, Result)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """
-                
-                # 데이터 전처리: 빈 문자열을 None으로 변환
-                processed_data = []
-                for row in csv_data:
-                    processed_row = []
-                    for value in row:
-                        # 빈 문자열이나 공백만 있는 경우 None으로 변환
-                        if value is None or (isinstance(value, str) and value.strip() == ''):
-                            processed_row.append(None)
-                        else:
-                            processed_row.append(value)
-                    processed_data.append(tuple(processed_row))
-                
-                batch_size = 1000
-                for i in range(0, len(processed_data), batch_size):
-                    batch = processed_data[i:i+batch_size]
-                    cursor.executemany(insert_sql, batch)
-                    self.conn.commit()
-                    progress = 30 + int((i / len(processed_data)) * 20)
-                    self.progress_signal.emit(progress)
-                    if i % 5000 == 0 and i > 0:
-                        self.log(f"  {i}개 레코드 삽입 완료...")
-                
-                self.log(f"전체 데이터 삽입 완료: {len(processed_data)}개")
-            except Exception as e:
-                raise Exception(f"데이터 삽입 실패: {e}")
-            
-            self.progress_signal.emit(50)
-            
-            # 6. 쿼리 실행
-            self.log("\n미통화 리스트 조회 중...")
-            try:
-                query_sql = f"""
-                SELECT DISTINCT c1.SendNum AS 발신번호, c2.CntNum AS 통화시도횟수, 
-                       ISNULL(s1.SaName,'') AS 담당자, ISNULL(m1.Name,'') AS 성명, 
-                       Result AS 통화결과 
-                FROM {table_name} c1 WITH(NOLOCK)
-                LEFT JOIN dbo.Member m1 WITH(NOLOCK) ON c1.SendNum = REPLACE(m1.Mobile,'-','')
-                LEFT JOIN dbo.Staff s1 WITH(NOLOCK) ON m1.Charge_IDP = s1.SaBun
-                LEFT JOIN (SELECT SendNum, COUNT(SendNum) AS CntNum FROM {table_name} WITH(NOLOCK) GROUP BY SendNum) c2 
-                    ON c1.SendNum = c2.SendNum
-                WHERE LEN(c1.SendNum) > 10 AND c1.SendNum NOT IN
-                (
-                    SELECT SendNum FROM {table_name} WHERE Result = 'Success'
-                    UNION ALL
-                    SELECT SendNum FROM {table_name} WHERE Result = 'Success'
-                    UNION ALL
-                    SELECT RecvNum FROM {table_name} WHERE Result = 'Success'
-                    UNION ALL
-                    SELECT RecvNum FROM {table_name} WHERE Result = 'Success'
-                )
-                AND CONVERT(CHAR(8),c1.RecDT,8) >= '09:30:00' AND CONVERT(CHAR(8),c1.RecDT,8) < '18:00:00'
-                ORDER BY 통화시도횟수 DESC
-                """
-                
-                cursor.execute(query_sql)
-                results = cursor.fetchall()
-                columns = [column[0] for column in cursor.description]
-                self.log(f"미통화 리스트 조회 완료: {len(results)}건")
-            except Exception as e:
-                raise Exception(f"쿼리 실행 실패: {e}")
-            
-            self.progress_signal.emit(60)
-            
-            # 7. 엑셀 파일 생성
-            excel_filename = f"{formatted_date}_미통화리스트.xlsx"
-            excel_path = os.path.join(os.path.dirname(self.csv_file), excel_filename)
-            self.log(f"\n엑셀 파일 생성 중: {excel_filename}")
-            
-            try:
-                wb = openpyxl.Workbook()
-                ws = wb.active
-                ws.title = "미통화리스트"
-                
-                # 헤더 스타일
-                header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                header_font = Font(bold=True, color="FFFFFF", size=11)
-                border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-                
-                # 헤더 작성
-                for col_idx, column_name in enumerate(columns, 1):
-                    cell = ws.cell(row=1, column=col_idx, value=column_name)
-                    cell.fill = header_fill
-                    cell.font = header_font
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-                    cell.border = border
-                
-                # 데이터 작성
-                for row_idx, row_data in enumerate(results, 2):
-                    for col_idx, value in enumerate(row_data, 1):
-                        cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                        cell.border = border
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
-                
-                # 열 너비 자동 조정
-                for column in ws.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    ws.column_dimensions[column_letter].width = adjusted_width
-                
-                wb.save(excel_path)
-                self.log(f"엑셀 파일 저장 완료: {excel_path}")
-            except Exception as e:
-                raise Exception(f"엑셀 파일 생성 실패: {e}")
-            
-            self.progress_signal.emit(75)
-            
-            # 8. CDR 테이블에 데이터 병합
-            self.log("\nCDR 메인 테이블에 데이터 병합 중...")
-            try:
-                insert_main_sql = f"INSERT INTO CDR SELECT * FROM {table_name}"
-                cursor.execute(insert_main_sql)
-                affected_rows = cursor.rowcount
-                self.conn.commit()
-                self.log(f"CDR 테이블에 {affected_rows}개 레코드 추가 완료")
-            except Exception as e:
-                raise Exception(f"메인 테이블 병합 실패: {e}")
-            
-            self.progress_signal.emit(90)
-            
-            # 9. 임시 테이블 삭제
-            self.log(f"\n임시 테이블 삭제 중: {table_name}")
-            try:
-                cursor.execute(f"DROP TABLE {table_name}")
-                self.conn.commit()
-                self.log("임시 테이블 삭제 완료")
-            except Exception as e:
-                self.log(f"⚠ 임시 테이블 삭제 경고: {e}")
-            
-            self.progress_signal.emit(100)
-            
-            # 완료
-            self.log("\n" + "=" * 60)
-            self.log("✓ 모든 작업이 성공적으로 완료되었습니다!")
-            self.log(f"✓ 엑셀 파일: {excel_path}")
-            self.log(f"✓ 미통화 건수: {len(results)}건")
-            self.log("=" * 60)
-            
-            self.finished_signal.emit(True, excel_path)
-            
-        except Exception as e:
-            self.log(f"\n❌ 오류 발생: {str(e)}")
-            self.log("=" * 60)
-            self.finished_signal.emit(False, str(e))
-            
-        finally:
-            if self.conn:
-                self.conn.close()
-                self.log("\n데이터베이스 연결 종료")
+        self.processor.run()
 
 
 class CDRProcessorApp(QMainWindow):
@@ -380,6 +80,8 @@ class CDRProcessorApp(QMainWindow):
         super().__init__()
         self.thread = None
         self.db_config = None
+        self.process_options = dict(DEFAULT_PROCESS_OPTIONS)
+        self.db_pool = None
         self.init_ui()
         self.load_config()
         
@@ -406,7 +108,7 @@ class CDRProcessorApp(QMainWindow):
         file_layout = QHBoxLayout()
         
         self.file_path_edit = QLineEdit()
-        self.file_path_edit.setPlaceholderText("CDR CSV 파일을 선택하세요 (예: CDR-25120900.csv)")
+        self.file_path_edit.setPlaceholderText("CDR CSV 파일을 선택하세요 (예: CDR-25120900.csv, CDR-25120900.csv.gz)")
         self.file_path_edit.setReadOnly(True)
         
         self.file_btn = QPushButton("파일 선택")
@@ -561,6 +263,14 @@ class CDRProcessorApp(QMainWindow):
         try:
             self.log_browser.append("\nDB 연결 정보 로드 중...")
             self.db_config = load_db_config()
+            self.process_options = load_process_options()
+            
+            # 처리할 때마다 다시 로그인하지 않도록 연결 풀 생성
+            self.db_pool = SqlConnectionPool(
+                self.db_config,
+                max_size=self.process_options['db_pool_size'],
+                max_idle_seconds=self.process_options['db_pool_idle_seconds']
+            )
             
             # UI에 정보 표시 (마스킹)
             self.server_edit.setText(self.db_config['Host'])
@@ -577,6 +287,12 @@ class CDRProcessorApp(QMainWindow):
             self.log_browser.append(f"✓ 서버: {self.db_config['Host']}:{self.db_config['Port']}")
             self.log_browser.append(f"✓ 데이터베이스: {self.db_config['DB_Name']}")
             self.log_browser.append(f"✓ 사용자: {username_masked}")
+            if self.process_options['adaptive_batch']:
+                batch_label = f"적응형 {self.process_options['batch_size_min']}~{self.process_options['batch_size_max']}"
+            else:
+                batch_label = self.process_options['batch_size']
+            self.log_browser.append(f"✓ 삽입 엔진: {self.process_options['insert_engine']} "
+                                    f"(배치 {batch_label}건)")
             self.log_browser.append("\n" + "=" * 60)
             self.log_browser.append("✓ 데이터베이스 설정 로드 완료")
             self.log_browser.append("=" * 60)
@@ -600,7 +316,7 @@ class CDRProcessorApp(QMainWindow):
             self,
             "CDR CSV 파일 선택",
             "",
-            "CSV Files (*.csv);;All Files (*)"
+            "CDR Files (*.csv *.csv.gz *.gz *.csv.zst *.zst);;CSV Files (*.csv);;All Files (*)"
         )
         if file_path:
             self.file_path_edit.setText(file_path)
@@ -636,7 +352,9 @@ class CDRProcessorApp(QMainWindow):
         # 워커 쓰레드 생성 및 시작
         self.thread = CDRProcessThread(
             self.file_path_edit.text(),
-            self.db_config
+            self.db_config,
+            self.process_options,
+            self.db_pool
         )
         
         self.thread.log_signal.connect(self.update_log)
@@ -656,6 +374,14 @@ class CDRProcessorApp(QMainWindow):
         """진행률 업데이트"""
         self.progress_bar.setValue(value)
         
+    def closeEvent(self, event):
+        """종료 시 연결 풀 정리"""
+        if self.thread and self.thread.isRunning():
+            self.thread.wait()
+        if self.db_pool:
+            self.db_pool.close()
+        super().closeEvent(event)
+        
     def process_finished(self, success, result):
         """처리 완료"""
         self.start_btn.setEnabled(True)
@@ -676,6 +402,10 @@ class CDRProcessorApp(QMainWindow):
 
 
 def main():
+    # cx_Freeze 실행파일에서 병렬 파싱 워커 프로세스를 띄우기 위해 필요
+    multiprocessing.freeze_support()
+    if sys.argv[1:] == ['--setup-member-mobile']:
+        sys.exit(setup_member_mobile_table())
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
     
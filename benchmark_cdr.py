@@ -0,0 +1,429 @@
+"""
+CDR 처리 성능 측정 스크립트
+실행: python benchmark_cdr.py [항목 ...]
+
+항목을 지정하지 않으면 전체를 실행합니다.
+"""
+
+import os
+import sys
+import gzip
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import timeit
+from datetime import datetime, timedelta
+
+import cdr.core as cdr
+
+
+def make_timestamps(count, fmt='%Y-%m-%d %H:%M:%S', seed=0):
+    """하루치 CDR 일시 문자열 생성 (초 단위, 같은 값이 반복됨)"""
+    rng = random.Random(seed)
+    day = datetime(2025, 12, 8)
+    values = []
+    for _ in range(count):
+        rec_dt = day + timedelta(seconds=rng.randrange(9 * 3600, 19 * 3600))
+        values.append(rec_dt.strftime(fmt))
+    return values
+
+
+def print_result(name, count, seconds, baseline=None):
+    rate = count / seconds if seconds > 0 else 0.0
+    line = f"  {name:<28} {seconds:8.3f}초  {rate:>14,.0f} 건/초"
+    if baseline:
+        line += f"  (x{baseline / seconds:,.1f})"
+    print(line)
+
+
+def bench_datetime(count=300000, repeat=3):
+    """일시 변환: datetime.strptime vs 일반 파서 vs CDRDatetimeParser"""
+    print("=" * 60)
+    print(f"일시 변환 성능 ({count:,}건, {repeat}회 중 최솟값)")
+    print("=" * 60)
+
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y/%m/%d %H:%M:%S', '%Y%m%d%H%M%S'):
+        values = make_timestamps(count, fmt)
+        print(f"\n형식: {fmt} (고유값 {len(set(values)):,}개)")
+
+        def run_strptime():
+            strptime = datetime.strptime
+            return [strptime(value, fmt) for value in values]
+
+        def run_general():
+            return [cdr.parse_cdr_datetime(value) for value in values]
+
+        def run_fast_cold():
+            # 매번 새 파서 → 형식 감지 + 캐시 채우기 비용 포함
+            parse = cdr.CDRDatetimeParser().parse
+            return [parse(value) for value in values]
+
+        warm_parser = cdr.CDRDatetimeParser()
+        run_fast_warm_values = [warm_parser.parse(value) for value in values]
+
+        def run_fast_warm():
+            parse = warm_parser.parse
+            return [parse(value) for value in values]
+
+        expected = run_strptime()
+        assert run_general() == expected
+        assert run_fast_cold() == expected
+        assert run_fast_warm_values == expected
+
+        baseline = min(timeit.repeat(run_strptime, number=1, repeat=repeat))
+        print_result("datetime.strptime", count, baseline)
+        print_result("parse_cdr_datetime", count, min(timeit.repeat(run_general, number=1, repeat=repeat)), baseline)
+        print_result("CDRDatetimeParser (신규)", count, min(timeit.repeat(run_fast_cold, number=1, repeat=repeat)), baseline)
+        print_result("CDRDatetimeParser (캐시)", count, min(timeit.repeat(run_fast_warm, number=1, repeat=repeat)), baseline)
+    print()
+
+
+def normalize_rows_legacy(rows):
+    """기존 행 단위 전처리 (빈 값만 None, 일시는 문자열 그대로 서버에서 변환)"""
+    return [tuple(None if value.strip() == '' else value for value in row) for row in rows]
+
+
+def normalize_rows_parsed(rows):
+    """행 단위 전처리 + 일시 변환 (normalize_batch와 같은 결과, 비교 기준)"""
+    parse = cdr.parse_cdr_datetime
+    return [
+        tuple(None if value.strip() == '' else parse(value) if idx in cdr.DATETIME_COLUMN_INDEXES else value
+              for idx, value in enumerate(row))
+        for row in rows
+    ]
+
+
+def normalize_batch_arrow(rows):
+    """pyarrow 컬럼 연산으로 배치 전처리 (normalize_batch와 같은 결과, 비교용)"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    normalized = []
+    for idx, column in enumerate(zip(*rows)):
+        array = pa.array(column, type=pa.string())
+        trimmed = pc.utf8_trim_whitespace(array)
+        values = pc.if_else(pc.equal(trimmed, ''), pa.scalar(None, pa.string()), array)
+        if idx in cdr.DATETIME_COLUMN_INDEXES:
+            values = pc.strptime(pc.utf8_trim_whitespace(values), format='%Y-%m-%d %H:%M:%S', unit='us')
+        normalized.append(values.to_pylist())
+    return list(zip(*normalized))
+
+
+def bench_normalize(rows=300000, repeat=3):
+    """배치 전처리: 기존 행 단위 루프 vs normalize_batch (컬럼 단위) vs pyarrow 컬럼 연산, 배치 크기별
+
+    기준은 같은 결과(일시 변환 포함)를 내는 행 단위 루프. 일시를 문자열로 넘기던 기존 루프는 참고용.
+    """
+    print("=" * 60)
+    print(f"배치 전처리 성능 ({rows:,}건, {repeat}회 중 최솟값)")
+    print("=" * 60)
+
+    try:
+        import pyarrow
+    except ImportError:
+        pyarrow = None
+        print("  (pyarrow 미설치 - pyarrow 항목 생략)")
+
+    timestamps = make_timestamps(rows)
+    results = ('Success', 'NoAnswer', 'Busy', '')
+    data = [
+        (ts, f"010{n:08d}", '0212345678', 'IN', ts, ts, 'NORMAL', results[n % len(results)])
+        for n, ts in enumerate(timestamps)
+    ]
+    for batch_size in (1000, 10000, 50000):
+        print(f"\n배치 {batch_size:,}건")
+        batches = [data[start:start + batch_size] for start in range(0, rows, batch_size)]
+
+        def run_legacy():
+            return [row for batch in batches for row in normalize_rows_legacy(batch)]
+
+        def run_rows():
+            return [row for batch in batches for row in normalize_rows_parsed(batch)]
+
+        def run_python():
+            parser = cdr.CDRDatetimeParser()
+            return [row for batch in batches for row in cdr.normalize_batch(batch, parser=parser)]
+
+        def run_arrow():
+            return [row for batch in batches for row in normalize_batch_arrow(batch)]
+
+        expected = run_rows()
+        assert run_python() == expected, "normalize_batch 결과가 다릅니다"
+        baseline = min(timeit.repeat(run_rows, number=1, repeat=repeat))
+        print_result("기존 루프 (일시는 문자열)", rows, min(timeit.repeat(run_legacy, number=1, repeat=repeat)), baseline)
+        print_result("행 단위 루프 + 일시 변환", rows, baseline)
+        print_result("normalize_batch", rows, min(timeit.repeat(run_python, number=1, repeat=repeat)), baseline)
+        if pyarrow is not None:
+            assert run_arrow() == expected, "pyarrow 전처리 결과가 다릅니다"
+            print_result("pyarrow 컬럼 연산", rows, min(timeit.repeat(run_arrow, number=1, repeat=repeat)), baseline)
+    print()
+
+
+def write_synthetic_csv(path, rows, seed=0, quoted=False):
+    """하루치 합성 CDR CSV 파일 작성 (quoted면 모든 필드를 따옴표로 감쌈)"""
+    rng = random.Random(seed)
+    day = datetime(2025, 12, 8)
+    results = ('Success', 'NoAnswer', 'Busy', 'Cancel', '')
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        for _ in range(rows):
+            rec_dt = day + timedelta(seconds=rng.randrange(0, 24 * 3600))
+            end_dt = rec_dt + timedelta(seconds=rng.randrange(0, 600))
+            fields = (f"{rec_dt:%Y-%m-%d %H:%M:%S}", f"010{rng.randrange(10 ** 8):08d}", f"02{rng.randrange(10 ** 8):08d}",
+                      'IN', f"{rec_dt:%Y-%m-%d %H:%M:%S}", f"{end_dt:%Y-%m-%d %H:%M:%S}", 'NORMAL', rng.choice(results))
+            if quoted:
+                fields = [f'"{value}"' for value in fields]
+            f.write(','.join(fields) + '\r\n')
+
+
+def bench_readers(rows=500000, batch_size=1000):
+    """CSV 읽기+전처리: 스트리밍 / 병렬 / gz / zst"""
+    print("=" * 60)
+    print(f"CSV 읽기 성능 ({rows:,}건, 배치 {batch_size})")
+    print("=" * 60)
+
+    work_dir = tempfile.mkdtemp(prefix="cdr_bench_")
+    try:
+        csv_path = os.path.join(work_dir, "CDR-25120900.csv")
+        write_synthetic_csv(csv_path, rows)
+        with open(csv_path, 'rb') as src, gzip.open(csv_path + '.gz', 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst)
+        if cdr.zstandard is not None:
+            with open(csv_path, 'rb') as src, open(csv_path + '.zst', 'wb') as dst:
+                cdr.zstandard.ZstdCompressor().copy_stream(src, dst)
+        print(f"파일 크기: {os.path.getsize(csv_path):,} bytes\n")
+
+        base = dict(cdr.DEFAULT_PROCESS_OPTIONS)
+        cases = [
+            ("stream", csv_path, {}),
+            (f"parallel x{os.cpu_count()}", csv_path, {'parse_workers': 0}),
+            ("stream (.gz)", csv_path + '.gz', {}),
+        ]
+        if cdr.zstandard is not None:
+            cases.append(("stream (.zst)", csv_path + '.zst', {}))
+        else:
+            print("  (zstandard 미설치 - .zst 항목 생략)")
+
+        def run_cases(cases):
+            baseline = None
+            for name, path, options in cases:
+                reader = cdr.open_cdr_reader(path, dict(base, **options))
+                start = time.perf_counter()
+                count = sum(len(batch) for batch in reader.batches(batch_size))
+                elapsed = time.perf_counter() - start
+                assert count == rows, f"{name}: {count} != {rows}"
+                if baseline is None:
+                    baseline = elapsed
+                print_result(name, count, elapsed, baseline)
+
+        run_cases(cases)
+
+        # 모든 필드를 따옴표로 감싼 파일 (범위를 따옴표 필드 밖에서 나누므로 다시 파싱하지 않음)
+        quoted_path = os.path.join(work_dir, "CDR-25120901.csv")
+        write_synthetic_csv(quoted_path, rows, quoted=True)
+        print(f"\n따옴표 필드 파일: {os.path.getsize(quoted_path):,} bytes")
+        run_cases([
+            ("stream", quoted_path, {}),
+            (f"parallel x{os.cpu_count()}", quoted_path, {'parse_workers': 0}),
+        ])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print()
+
+
+def make_cdr_rows(count, numbers=50000, seed=0):
+    """하루치 합성 CDR 레코드 (삽입용 튜플). 같은 번호가 여러 번 나오도록 번호 수를 제한"""
+    rng = random.Random(seed)
+    day = datetime(2025, 12, 8)
+    customers = [f"010{n:08d}" for n in rng.sample(range(10 ** 8), numbers)]
+    results = ('Success', 'NoAnswer', 'Busy', 'Cancel')
+    rows = []
+    for _ in range(count):
+        rec_dt = day + timedelta(seconds=rng.randrange(0, 24 * 3600))
+        end_dt = rec_dt + timedelta(seconds=rng.randrange(0, 600))
+        customer = rng.choice(customers)
+        office = f"02{rng.randrange(100):08d}"
+        if rng.random() < 0.7:
+            send_num, recv_num, gubun = customer, office, 'IN'
+        else:
+            send_num, recv_num, gubun = office, customer, 'OUT'
+        rows.append((rec_dt, send_num, recv_num, gubun, rec_dt, end_dt, 'NORMAL', rng.choice(results)))
+    return rows
+
+
+def bench_query(rows=1000000, repeat=3):
+    """미통화 리스트 조회: 기존 SQL vs 개선 SQL (조회용 인덱스 전/후), SQL Server 필요"""
+    print("=" * 60)
+    print(f"미통화 리스트 조회 성능 ({rows:,}건, {repeat}회 중 최솟값)")
+    print("=" * 60)
+
+    try:
+        conn = cdr.pyodbc.connect(cdr.build_connection_string(cdr.load_db_config()))
+    except Exception as e:
+        print(f"  (DB 연결 실패 - 생략: {e})\n")
+        return
+
+    table_name = f"[CDR-BENCH-{os.getpid()}]"
+    day = datetime(2025, 12, 8)
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"CREATE TABLE {table_name}({cdr.CDR_TABLE_COLUMNS_SQL})")
+        conn.commit()
+        engine = cdr.FastExecuteManyEngine(conn, table_name)
+        engine.prepare()
+        data = make_cdr_rows(rows)
+        for start in range(0, len(data), 10000):
+            engine.insert(data[start:start + 10000])
+        conn.commit()
+        engine.close()
+        print(f"임시 테이블 적재: {engine.summary()}\n")
+
+        def timed(legacy, query_day=day):
+            sql, params = cdr.build_missed_call_query(table_name, query_day, legacy)
+            best = None
+            result = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = cursor.execute(sql, *params).fetchall()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best, sorted(tuple(row) for row in result)
+
+        def report(name, seconds, result, baseline=None):
+            line = f"  {name:<28} {seconds:8.3f}초  결과 {len(result):>8,}건"
+            if baseline:
+                line += f"  (x{baseline / seconds:,.1f})"
+            print(line)
+
+        baseline, expected = timed(True)
+        report("기존 SQL", baseline, expected)
+        seconds, result = timed(False)
+        assert result == expected, "개선 SQL 결과가 기존 SQL과 다릅니다"
+        report("개선 SQL", seconds, result, baseline)
+
+        index_seconds = cdr.create_report_indexes(conn, table_name)
+        print(f"  {'조회용 인덱스 생성':<28} {index_seconds:8.3f}초")
+        seconds, result = timed(True)
+        report("기존 SQL (인덱스)", seconds, result, baseline)
+        seconds, result = timed(False)
+        assert result == expected, "개선 SQL 결과가 기존 SQL과 다릅니다"
+        report("개선 SQL (인덱스)", seconds, result, baseline)
+
+        # 다음 날 레코드를 섞어 여러 날짜에 걸친 임시 테이블: 날짜 없이 시각만 비교하는 개선 SQL과 기존 SQL 비교
+        engine = cdr.FastExecuteManyEngine(conn, table_name)
+        engine.prepare()
+        one_day = timedelta(days=1)
+        engine.insert([
+            (row[0] + one_day, *row[1:4], row[4] + one_day, row[5] + one_day, *row[6:])
+            for row in data[:len(data) // 10]
+        ])
+        conn.commit()
+        engine.close()
+        baseline, expected = timed(True)
+        report("기존 SQL (여러 날짜)", baseline, expected)
+        seconds, result = timed(False, None)
+        assert result == expected, "개선 SQL(여러 날짜) 결과가 기존 SQL과 다릅니다"
+        report("개선 SQL (여러 날짜)", seconds, result, baseline)
+    finally:
+        cursor.execute(f"IF OBJECT_ID(N'{table_name}', N'U') IS NOT NULL DROP TABLE {table_name}")
+        conn.commit()
+        conn.close()
+    print()
+
+
+def make_report_rows(count, seed=0):
+    """미통화 리스트 결과 형태의 합성 행 (발신번호, 통화시도횟수, 담당자, 성명, 통화결과)"""
+    rng = random.Random(seed)
+    staff = [f"담당{n:03d}" for n in range(200)]
+    results = ('NoAnswer', 'Busy', 'Cancel')
+    rows = []
+    for _ in range(count):
+        name = f"회원{rng.randrange(10 ** 6):06d}" if rng.random() < 0.8 else None
+        rows.append((f"010{rng.randrange(10 ** 8):08d}", rng.randrange(1, 20),
+                     rng.choice(staff) if name else None, name, rng.choice(results)))
+    return rows
+
+
+def bench_report(rows=200000):
+    """리포트 작성: openpyxl (기존/쓰기 전용) / xlsxwriter / CSV / Parquet, 같은 결과 행"""
+    print("=" * 60)
+    print(f"리포트 작성 성능 ({rows:,}건)")
+    print("=" * 60)
+
+    columns = list(cdr.MissedCallCollector.COLUMNS)
+    data = make_report_rows(rows)
+    work_dir = tempfile.mkdtemp(prefix="cdr_bench_")
+    try:
+        baseline = None
+        for name in ('openpyxl_normal', 'openpyxl', 'xlsxwriter', 'csv', 'parquet'):
+            writer_class = cdr.REPORT_WRITERS[name]
+            path = os.path.join(work_dir, f"report_{name}{writer_class.extension}")
+            try:
+                writer = cdr.write_report(writer_class, path, columns, data)
+            except Exception as e:
+                print(f"  {name:<28} (생략: {e})")
+                continue
+            assert writer.rows == rows, f"{name}: {writer.rows} != {rows}"
+            if baseline is None:
+                baseline = writer.elapsed
+            print_result(name, rows, writer.elapsed, baseline)
+            print(f"  {'':<28} 파일 크기 {os.path.getsize(path):,} bytes")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print()
+
+
+def bench_startup(repeat=5):
+    """시작 시간: 명령행(python -m cdr) vs GUI(Make_CDR_v5 + QApplication), 새 프로세스 기준"""
+    print("=" * 60)
+    print(f"시작 시간 ({repeat}회 중 최솟값)")
+    print("=" * 60)
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    cases = [
+        ("python (빈 인터프리터)", [sys.executable, '-c', 'pass']),
+        ("명령행 python -m cdr", [sys.executable, '-m', 'cdr', '--help']),
+        ("GUI 모듈 + QApplication", [sys.executable, '-c',
+                                    'import Make_CDR_v5; from PySide6.QtWidgets import QApplication; QApplication([])']),
+    ]
+    for name, command in cases:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = subprocess.run(command, cwd=root, env=env, capture_output=True, text=True)
+            elapsed = time.perf_counter() - start
+            if result.returncode != 0:
+                error = (result.stderr.strip().splitlines() or ['?'])[-1]
+                print(f"  {name:<28} (생략: {error})")
+                break
+            best = elapsed if best is None else min(best, elapsed)
+        else:
+            print(f"  {name:<28} {best:8.3f}초")
+    print()
+
+
+BENCHMARKS = {
+    'datetime': bench_datetime,
+    'normalize': bench_normalize,
+    'readers': bench_readers,
+    'query': bench_query,
+    'report': bench_report,
+    'startup': bench_startup,
+}
+
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"알 수 없는 항목: {name} (사용 가능: {', '.join(BENCHMARKS)})")
+            return 1
+    for name in names:
+        BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -44,6 +44,7 @@ def check_requirements():
         "PySide6": "PySide6", 
         "pyodbc": "pyodbc",
         "openpyxl": "openpyxl",
+        "xlsxwriter": "xlsxwriter",
         "requests": "requests",
     }
     
@@ -83,7 +84,8 @@ def check_files():
     required_files = [
         # "cdr_processor.py",
         # "setup.py",
-        "Make_CDR_v5.py","cx_Freeze_Setup.py"
+        "Make_CDR_v5.py","cx_Freeze_Setup.py",
+        "cdr/core.py","cdr/__main__.py"
     ]
     
     optional_files = [
@@ -210,7 +212,7 @@ CDR CSV 파일을 처리하여 미통화 리스트를 생성하고 엑셀 파일
 
 5. **결과 확인**
    - 처리가 완료되면 엑셀 파일이 생성됩니다.
-   - 파일명 형식: 20251208_미통화리스트.xlsx
+   - 파일명 형식: 20251208_CDR-25120900_미통화리스트.xlsx
 
 ## 시스템 요구사항
 
@@ -221,7 +223,7 @@ CDR CSV 파일을 처리하여 미통화 리스트를 생성하고 엑셀 파일
 ## 생성되는 파일/폴더
 
 - `./DB/Config_DB.db` - 데이터베이스 설정 파일
-- `YYYYMMDD_미통화리스트.xlsx` - 처리 결과 엑셀 파일
+- `YYYYMMDD_<CSV 파일명>_미통화리스트.xlsx` - 처리 결과 엑셀 파일
 
 ## 문제 해결
 
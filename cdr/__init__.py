@@ -0,0 +1,21 @@
+"""
+CDR 처리 패키지
+
+GUI 없이 사용하는 처리 핵심(cdr.core)과 명령행 도구(python -m cdr)로 구성된다.
+"""
+
+from cdr.core import (
+    DEFAULT_PROCESS_OPTIONS,
+    CDRProcessor,
+    SqlConnectionPool,
+    load_db_config,
+    load_process_options,
+)
+
+__all__ = [
+    'DEFAULT_PROCESS_OPTIONS',
+    'CDRProcessor',
+    'SqlConnectionPool',
+    'load_db_config',
+    'load_process_options',
+]
@@ -0,0 +1,114 @@
+"""
+CDR 처리 명령행 도구 (PySide6 없이 실행)
+실행: python -m cdr process CDR-25120900.csv [--option 이름=값 ...]
+      python -m cdr batch 폴더 "폴더/CDR-2512*.csv" [--workers N] [--force]
+      python -m cdr watch 폴더 [--interval 초] [--workers N]
+      python -m cdr setup-member-mobile
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+
+from cdr.core import (DEFAULT_PROCESS_OPTIONS, CDRBatchRunner, CDRProcessor, load_db_config,
+                      load_process_options, parse_option_value, setup_member_mobile_table)
+
+
+def parse_options(values):
+    """--option 이름=값 목록을 처리 옵션으로 변환 (Config_DB.db의 CDR_OPTION 위에 덮어씀)"""
+    options = load_process_options()
+    for item in values:
+        name, sep, value = item.partition('=')
+        name = name.strip()
+        if not sep or name not in DEFAULT_PROCESS_OPTIONS:
+            raise Exception(f"알 수 없는 처리 옵션: {item} (형식: 이름=값)")
+        options[name] = parse_option_value(name, value)
+    return options
+
+
+def run_process(args):
+    """CDR 파일 한 개 처리. 반환값: 종료 코드 (성공 0, 실패 1)"""
+    options = parse_options(args.option)
+    db_config = load_db_config()
+    outcome = {}
+    
+    def finished(success, result):
+        outcome['success'] = success
+        outcome['result'] = result
+    
+    start = time.perf_counter()
+    processor = CDRProcessor(
+        args.file, db_config, options,
+        on_log=lambda message: print(message, flush=True),
+        on_finished=finished,
+    )
+    processor.run()
+    print(f"소요 시간: {time.perf_counter() - start:.2f}초")
+    return 0 if outcome.get('success') else 1
+
+
+def run_batch(args):
+    """폴더/패턴의 CDR 파일을 일괄 처리하거나(batch) 폴더를 감시(watch). 반환값: 실패가 없으면 0"""
+    options = parse_options(args.option)
+    runner = CDRBatchRunner(
+        load_db_config(), options, args.workers, getattr(args, 'force', False),
+        on_log=lambda message: print(message, flush=True),
+    )
+    try:
+        if args.command == 'watch':
+            runner.watch(args.folder, args.interval)
+        else:
+            runner.run(args.paths)
+    finally:
+        runner.close()
+        print("=" * 60)
+        print(runner.summary())
+        print("=" * 60)
+    return 1 if runner.failed() else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m cdr', description="CDR 파일 처리 (GUI 없이 실행)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    process = commands.add_parser('process', help="CDR 파일 처리 (적재 → 미통화 리스트 → CDR 병합)")
+    process.add_argument('file', help="CDR 파일 (.csv / .csv.gz / .csv.zst)")
+    process.add_argument('-o', '--option', action='append', default=[], metavar='이름=값',
+                         help="처리 옵션 지정 (여러 번 사용 가능, 예: -o report_writer=csv)")
+    process.set_defaults(func=run_process)
+    
+    option_help = "처리 옵션 지정 (여러 번 사용 가능, 예: -o report_writer=csv)"
+    
+    batch = commands.add_parser('batch', help="폴더 / glob 패턴의 CDR 파일을 작업자 풀로 일괄 처리")
+    batch.add_argument('paths', nargs='+', help="폴더, glob 패턴 또는 CDR 파일")
+    batch.add_argument('-w', '--workers', type=int, help="동시에 처리할 파일 수 (기본: batch_workers 옵션)")
+    batch.add_argument('--force', action='store_true', help="이미 처리한 파일도 다시 처리")
+    batch.add_argument('-o', '--option', action='append', default=[], metavar='이름=값', help=option_help)
+    batch.set_defaults(func=run_batch)
+    
+    watch = commands.add_parser('watch', help="폴더를 감시해 새로 들어온 CDR 파일을 처리 (Ctrl+C로 종료)")
+    watch.add_argument('folder', help="감시할 폴더")
+    watch.add_argument('-i', '--interval', type=float, help="폴더 확인 주기 (초, 기본: watch_interval_seconds 옵션)")
+    watch.add_argument('-w', '--workers', type=int, help="동시에 처리할 파일 수 (기본: batch_workers 옵션)")
+    watch.add_argument('-o', '--option', action='append', default=[], metavar='이름=값', help=option_help)
+    watch.set_defaults(func=run_batch)
+    
+    setup = commands.add_parser('setup-member-mobile', help="dbo.CDR_MemberMobile 생성 및 전체 동기화")
+    setup.set_defaults(func=lambda args: setup_member_mobile_table())
+    return parser
+
+
+def main(argv=None):
+    # cx_Freeze 실행파일에서 병렬 파싱 워커 프로세스를 띄우기 위해 필요
+    multiprocessing.freeze_support()
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
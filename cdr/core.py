@@ -0,0 +1,3894 @@
+"""
+CDR 처리 핵심 모듈 (PySide6 없이 사용 가능)
+
+CSV 읽기, 스테이징 적재, 미통화 리스트 조회/작성, CDR 병합을 담당한다.
+GUI(Make_CDR_v5.py)와 명령행(python -m cdr)이 CDRProcessor를 공유한다.
+"""
+
+import os
+import csv
+import glob
+import re
+import shutil
+import codecs
+import gzip
+import io
+import itertools
+import mmap
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from copy import copy
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+import pyodbc
+import openpyxl
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+# pyarrow가 설치되어 있으면 Parquet 리포트 형식을 선택 가능
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# zstandard가 설치되어 있으면 .zst 압축 CDR 파일을 읽을 수 있음
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# xlsxwriter - 미통화 리스트 기본 작성기 (없으면 openpyxl로 작성)
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+
+def load_db_config():
+    """Config_DB.db에서 DB 연결 정보 로드"""
+    db_path = os.path.join("./DB", "Config_DB.db")
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        
+        query = "SELECT DB_Type, Host, Port, DB_Name, DB_ID, DB_PW FROM DBCON WHERE Name = 'HD_MSSQL'"
+        cursor.execute(query)
+        result = cursor.fetchone()
+        conn.close()
+        
+        if result:
+            return {
+                'DB_Type': result[0],
+                'Host': result[1],
+                'Port': result[2],
+                'DB_Name': result[3],
+                'DB_ID': result[4],
+                'DB_PW': result[5]
+            }
+        else:
+            raise Exception("HD_MSSQL 설정을 찾을 수 없습니다.")
+            
+    except Exception as e:
+        raise Exception(f"DB 설정 로드 실패: {e}")
+
+
+# 처리 옵션 기본값 (Config_DB.db의 CDR_OPTION 테이블에 같은 이름이 있으면 덮어씀)
+DEFAULT_PROCESS_OPTIONS = {
+    'insert_engine': 'fast_executemany',    # executemany | fast_executemany | tvp
+    'batch_size': 1000,
+    'commit_policy': 'rows',                # rows | seconds | single (단일 트랜잭션 + TABLOCK)
+    'commit_rows': 1000,                    # rows 정책: 이 건수 이상 쌓이면 커밋
+    'commit_seconds': 5.0,                  # seconds 정책: 마지막 커밋 후 이 시간이 지나면 커밋
+    'adaptive_batch': False,                # 배치 지연 시간/처리량을 보고 삽입 배치 크기 자동 조정
+    'batch_size_min': 500,                  # 적응형 배치 최소 크기 (CSV 읽기 단위)
+    'batch_size_max': 50000,                # 적응형 배치 최대 크기
+    'batch_target_seconds': 1.0,            # 적응형 배치 한 번의 목표 삽입 시간 (초)
+    'insert_writers': 1,                    # 스테이징 삽입 연결 수 (2 이상이면 여러 연결로 나눠 삽입)
+    'merge_mode': 'insert',                 # insert | switch (날짜 파티션 전환) | dedup (행 해시로 중복 제외)
+    'merge_chunk_minutes': 60,              # dedup 병합 한 트랜잭션이 맡는 RecDT 구간 (분)
+    'partition_setup': False,               # switch 모드에서 CDR이 파티션되지 않았으면 파티션 구성 (최초 1회)
+    'report_query': 'optimized',            # optimized | legacy (미통화 리스트 조회 SQL)
+    'report_indexes': True,                 # 조회 전 임시 테이블에 SendNum/RecvNum/Result 인덱스 생성
+    'report_engine': 'server',              # server (임시 테이블 조회) | client (CSV를 읽으면서 집계)
+    'contact_cache': False,                 # 회원/담당자 이름을 로컬 캐시(CDR_Contacts.db)에서 조회
+    'contact_cache_ttl_hours': 24,          # 이 시간이 지나면 캐시 전체를 다시 받음
+    'member_key_column': 'IDP',             # dbo.Member 기본 키 컬럼
+    'member_modified_column': '',           # dbo.Member 수정 일시 컬럼 (지정하면 변경분만 갱신)
+    'staff_modified_column': '',            # dbo.Staff 수정 일시 컬럼 (지정하면 변경분만 갱신)
+    'member_mobile_table': False,           # 서버 조회 시 dbo.CDR_MemberMobile(정규화 번호 → 회원 키)로 조인
+    'member_mobile_full_sync_hours': 24,    # CDR_MemberMobile 전체 동기화 주기 (그 사이에는 변경분만)
+    'excel_mode': 'normal',                 # normal (기존 방식) | stream (쓰기 전용 워크시트, 메모리 일정)
+    'report_writer': 'xlsxwriter',          # xlsxwriter | openpyxl | csv | parquet
+    'stage_overlap': True,                  # 엑셀 생성과 CDR 병합을 겹쳐 실행 (필요하면 추가 연결 1개 사용)
+    'report_split': 'none',                 # none | sheet (담당자별 시트) | file (담당자별 파일)
+    'report_workers': 0,                    # 담당자별 파일 작성 프로세스 수 (0이면 CPU 코어 수, 1이면 순차)
+    'tvp_type_name': 'CDRRowType',          # tvp 엔진용 테이블 형식 (dbo 스키마)
+    'load_mode': 'insert',                  # insert | bulk (BULK INSERT, 실패 시 insert로 대체)
+    'bulk_local_dir': '',                   # bulk 파일을 쓸 폴더 (서버가 읽을 수 있는 공유 폴더)
+    'bulk_server_dir': '',                  # 서버에서 본 같은 폴더 경로 (비우면 bulk_local_dir)
+    'parse_workers': 1,                     # CSV 파싱 프로세스 수 (1: 단일 쓰레드, 0: CPU 코어 수)
+    'parse_chunk_mb': 8,                    # 병렬 파싱 시 한 작업이 맡는 파일 범위 크기 (MB)
+    'parse_ordered': True,                  # 병렬 파싱 결과를 파일 순서대로 삽입할지 여부
+    'resume': True,                         # 중단된 적재를 마지막 커밋 지점부터 이어서 진행
+    'db_pool_size': 4,                      # 실행 간 재사용할 SQL Server 연결 최대 개수
+    'db_pool_idle_seconds': 300,            # 이 시간보다 오래 쉰 연결은 버리고 새로 연결
+    'batch_workers': 2,                     # 일괄/감시 모드에서 동시에 처리할 파일 수
+    'watch_interval_seconds': 10,           # 감시 모드에서 폴더를 확인하는 주기 (초)
+}
+
+
+def load_process_options():
+    """Config_DB.db의 CDR_OPTION 테이블에서 처리 옵션 로드 (테이블이 없으면 기본값)"""
+    options = dict(DEFAULT_PROCESS_OPTIONS)
+    db_path = os.path.join("./DB", "Config_DB.db")
+    if not os.path.exists(db_path):
+        return options
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute("SELECT Name, Value FROM CDR_OPTION").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return options
+    
+    for name, value in rows:
+        if name not in DEFAULT_PROCESS_OPTIONS or value is None:
+            continue
+        options[name] = parse_option_value(name, value)
+    return options
+
+
+def parse_option_value(name, value):
+    """처리 옵션 값을 기본값과 같은 형식으로 변환 (CDR_OPTION 테이블, 명령행 --option)"""
+    default = DEFAULT_PROCESS_OPTIONS[name]
+    try:
+        if isinstance(default, bool):
+            return str(value).strip().lower() in ('1', 'true', 'y', 'yes')
+        if isinstance(default, int):
+            return int(value)
+        if isinstance(default, float):
+            return float(value)
+        return str(value).strip()
+    except ValueError:
+        raise Exception(f"처리 옵션 값이 올바르지 않습니다: {name}={value}")
+
+
+def build_connection_string(db_config):
+    """DB 설정으로 ODBC 연결 문자열 생성"""
+    return (
+        f"DRIVER={{{db_config['DB_Type']}}};"
+        f"SERVER={db_config['Host']},{db_config['Port']};"
+        f"DATABASE={db_config['DB_Name']};"
+        f"UID={db_config['DB_ID']};"
+        f"PWD={db_config['DB_PW']}"
+    )
+
+
+class SqlConnectionPool:
+    """SQL Server 연결 풀
+
+    처리할 때마다 새로 연결(로그인/TLS)하지 않도록 연결을 재사용한다.
+    유휴 연결은 꺼낼 때 SELECT 1로 살아 있는지 확인하고, 끊겼거나
+    max_idle_seconds보다 오래 쉰 연결은 닫고 새로 만든다.
+    여러 쓰레드에서 동시에 사용할 수 있지만, 연결 하나는 한 쓰레드만 사용해야 한다.
+    """
+    
+    def __init__(self, db_config, max_size=4, max_idle_seconds=300, timeout=60):
+        self.db_config = db_config
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._idle = []        # (연결, 반납 시각)
+        self._size = 0         # 풀이 만든 연결 수 (사용 중 + 유휴)
+        self._closed = False
+    
+    def _connect(self):
+        return pyodbc.connect(build_connection_string(self.db_config))
+    
+    @staticmethod
+    def _ping(conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1").fetchone()
+            cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+    
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+    
+    def acquire(self):
+        """연결 꺼내기. 반환값: (연결, 재사용 여부)"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            stale = False
+            with self._cond:
+                if self._closed:
+                    raise Exception("연결 풀이 닫혔습니다.")
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                    stale = time.monotonic() - released_at > self.max_idle_seconds
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise Exception(f"DB 연결 풀 대기 시간 초과 (최대 {self.max_size}개 사용 중)")
+                    self._cond.wait(remaining)
+                    continue
+            
+            if conn is None:
+                try:
+                    return self._connect(), False
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            if not stale and self._ping(conn):
+                return conn, True
+            self._discard(conn)
+    
+    def release(self, conn):
+        """연결 반납 (진행 중인 트랜잭션은 롤백)"""
+        try:
+            conn.rollback()
+        except pyodbc.Error:
+            self._discard(conn)
+            return
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                conn.close()
+                return
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+    
+    def close(self):
+        """유휴 연결을 모두 닫음 (사용 중인 연결은 반납될 때 닫힘)"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except pyodbc.Error:
+                pass
+
+
+# 스테이징 테이블 컬럼 (CSV 컬럼 순서와 동일)
+CDR_COLUMNS = ('RecDT', 'SendNum', 'RecvNum', 'Gubun', 'StartDT', 'EndDT', 'CallGubun', 'Result')
+
+CDR_TABLE_COLUMNS_SQL = """
+    [RecDT] [datetime2](7) NULL,
+    [SendNum] [nvarchar](50) NULL,
+    [RecvNum] [nvarchar](50) NULL,
+    [Gubun] [nvarchar](50) NULL,
+    [StartDT] [datetime2](7) NULL,
+    [EndDT] [datetime2](7) NULL,
+    [CallGubun] [nvarchar](50) NULL,
+    [Result] [nvarchar](50) NULL
+"""
+
+
+# 일시 컬럼 위치 (RecDT, StartDT, EndDT)
+DATETIME_COLUMN_INDEXES = (0, 4, 5)
+
+# 일시 문자열 후보 형식 (ISO 형식은 datetime.fromisoformat으로 먼저 처리)
+DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y/%m/%d %H:%M:%S', '%Y%m%d%H%M%S')
+
+
+def parse_cdr_datetime(value):
+    """CDR 일시 문자열을 datetime으로 변환"""
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"일시 형식을 인식할 수 없습니다: {value!r}")
+
+
+class CDRDatetimeParser:
+    """CDR 일시 파서
+
+    처음 만난 값으로 파일의 일시 형식을 한 번 감지한 뒤 그 형식 전용 경로로 변환한다.
+    - ISO 형식(YYYY-MM-DD HH:MM:SS): datetime.fromisoformat (C 구현)
+    - 그 외 고정 길이 형식: 고정 위치 슬라이싱
+    초 단위 값은 캐시에 보관해 재사용하고, 형식이 맞지 않는 값만 일반 파서로 처리한다.
+    감지 결과와 캐시는 파일마다 다르므로 리더(파일)마다 하나씩 만들어 쓴다 (쓰레드 간 공유 금지).
+    """
+    CACHE_SIZE = 100000
+    REDETECT_AFTER = 100    # 연속으로 이 횟수만큼 형식이 맞지 않으면 다시 감지
+    
+    # 고정 위치 형식: (길이, (구분자 위치, 문자) 목록, 연월일시분초 슬라이스)
+    FIXED_LAYOUTS = {
+        '%Y/%m/%d %H:%M:%S': (19, ((4, '/'), (7, '/'), (10, ' '), (13, ':'), (16, ':')),
+                              ((0, 4), (5, 7), (8, 10), (11, 13), (14, 16), (17, 19))),
+        '%Y%m%d%H%M%S': (14, (),
+                         ((0, 4), (4, 6), (6, 8), (8, 10), (10, 12), (12, 14))),
+    }
+    
+    def __init__(self):
+        self.mode = None
+        self.layout = None
+        self.mismatches = 0
+        self._cache = {}
+    
+    def detect(self, value):
+        """값 하나로 형식 감지"""
+        value = value.strip()
+        self.mismatches = 0
+        if len(value) >= 19 and value[4] == '-' and value[7] == '-':
+            try:
+                datetime.fromisoformat(value)
+                self.mode = 'iso'
+                return
+            except ValueError:
+                pass
+        for fmt, layout in self.FIXED_LAYOUTS.items():
+            try:
+                datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            # mode를 바꾸기 전에 layout을 먼저 설정
+            self.layout = layout
+            self.mode = 'fixed'
+            return
+        self.mode = 'general'
+        self.layout = None
+    
+    def _parse_fixed(self, value):
+        length, separators, slices = self.layout
+        if len(value) != length:
+            return None
+        for pos, char in separators:
+            if value[pos] != char:
+                return None
+        parts = [value[start:end] for start, end in slices]
+        if not ''.join(parts).isdigit():
+            return None
+        try:
+            return datetime(*map(int, parts))
+        except ValueError:
+            return None
+    
+    def _parse_general(self, value):
+        """형식이 맞지 않는 값은 일반 파서로 변환"""
+        result = parse_cdr_datetime(value)
+        self.mismatches += 1
+        if self.mismatches >= self.REDETECT_AFTER:
+            self.detect(value)
+        return result
+    
+    def parse(self, value):
+        # ISO 형식은 fromisoformat이 캐시 조회만큼 빠르므로 캐시를 쓰지 않음
+        if self.mode == 'iso':
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                return self._parse_general(value)
+        
+        cached = self._cache.get(value)
+        if cached is not None:
+            return cached
+        if self.mode is None:
+            self.detect(value)
+            if self.mode == 'iso':
+                return self.parse(value)
+        
+        result = self._parse_fixed(value) if self.mode == 'fixed' else None
+        if result is None:
+            result = self._parse_general(value)
+        else:
+            self.mismatches = 0
+        
+        if result.microsecond == 0:
+            if len(self._cache) >= self.CACHE_SIZE:
+                self._cache.clear()
+            self._cache[value] = result
+        return result
+
+
+def _normalize_column(column, is_datetime, parser):
+    """한 컬럼 전처리: 빈 값은 None, 일시 컬럼은 datetime"""
+    if is_datetime:
+        parse = parser.parse
+        return [None if not value or value.isspace() else parse(value) for value in column]
+    return [None if not value or value.isspace() else value for value in column]
+
+
+def normalize_batch(rows, parser=None):
+    """배치를 컬럼 단위로 전처리해서 레코드 튜플 목록으로 반환
+
+    빈 문자열/공백은 None(NULL)로, RecDT/StartDT/EndDT는 datetime으로 변환한다.
+    parser는 형식 감지 결과와 캐시를 배치 간에 재사용할 CDRDatetimeParser (None이면 이 배치용으로 새로 만듦).
+    """
+    if not rows:
+        return []
+    if parser is None:
+        parser = CDRDatetimeParser()
+    width = len(CDR_COLUMNS)
+    for line_no, row in enumerate(rows, 1):
+        if len(row) != width:
+            raise Exception(f"컬럼 수가 맞지 않는 레코드 (배치 내 {line_no}번째, {len(row)}개): {row}")
+    
+    normalized = [
+        _normalize_column(column, idx in DATETIME_COLUMN_INDEXES, parser)
+        for idx, column in enumerate(zip(*rows))
+    ]
+    return list(zip(*normalized))
+
+
+class StagingInsertEngine:
+    """스테이징 테이블 삽입 엔진 (기본: 일반 executemany)
+
+    하위 클래스는 _insert()만 바꾸며, 삽입 건수와 소요 시간은 공통으로 측정한다.
+    """
+    name = 'executemany'
+    
+    def __init__(self, conn, table_name, options=None, table_hint=''):
+        self.conn = conn
+        self.table_name = table_name
+        self.options = options or DEFAULT_PROCESS_OPTIONS
+        self.cursor = conn.cursor()
+        self.rows = 0
+        self.elapsed = 0.0
+        # 테이블 힌트 (예: WITH (TABLOCK)) 는 INSERT 대상 바로 뒤에 붙임
+        self.target = f"{table_name} {table_hint}" if table_hint else table_name
+        self.insert_sql = (
+            f"INSERT INTO {self.target} ({', '.join(CDR_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(CDR_COLUMNS))})"
+        )
+    
+    def prepare(self):
+        """삽입 전 준비 작업"""
+        pass
+    
+    def insert(self, batch):
+        """배치 삽입 (커밋은 호출하는 쪽에서 수행)"""
+        start = time.perf_counter()
+        self._insert(batch)
+        self.elapsed += time.perf_counter() - start
+        self.rows += len(batch)
+    
+    def _insert(self, batch):
+        self.cursor.executemany(self.insert_sql, batch)
+    
+    @property
+    def rows_per_sec(self):
+        if self.elapsed <= 0:
+            return 0.0
+        return self.rows / self.elapsed
+    
+    def summary(self):
+        return f"{self.name}: {self.rows:,}건 / {self.elapsed:.2f}초 ({self.rows_per_sec:,.0f} rows/sec)"
+    
+    def close(self):
+        try:
+            self.cursor.close()
+        except Exception:
+            # pyodbc 외 DB-API 연결(시험용 sqlite3 등)의 오류도 무시
+            pass
+
+
+class FastExecuteManyEngine(StagingInsertEngine):
+    """fast_executemany + 입력 크기 선언 (배치 전체를 한 번에 전송)"""
+    name = 'fast_executemany'
+    
+    # CDR 8개 컬럼의 입력 크기 (일시 컬럼은 datetime2(7), 나머지는 nvarchar(50))
+    INPUT_SIZES = [
+        (pyodbc.SQL_TYPE_TIMESTAMP, 27, 7) if idx in DATETIME_COLUMN_INDEXES else (pyodbc.SQL_WVARCHAR, 50, 0)
+        for idx in range(len(CDR_COLUMNS))
+    ]
+    
+    def prepare(self):
+        if not hasattr(self.cursor, 'fast_executemany'):
+            # pyodbc 커서가 아니면 일반 executemany로 삽입
+            self.name = StagingInsertEngine.name
+            return
+        self.cursor.fast_executemany = True
+        self.cursor.setinputsizes(self.INPUT_SIZES)
+
+
+class TvpInsertEngine(StagingInsertEngine):
+    """테이블 반환 매개변수(TVP)로 배치 전체를 단일 INSERT ... SELECT로 전송"""
+    name = 'tvp'
+    
+    def __init__(self, conn, table_name, options=None, table_hint=''):
+        super().__init__(conn, table_name, options, table_hint)
+        self.type_name = self.options['tvp_type_name']
+        self.insert_sql = (
+            f"INSERT INTO {self.target} ({', '.join(CDR_COLUMNS)}) "
+            f"SELECT {', '.join(CDR_COLUMNS)} FROM ?"
+        )
+    
+    def prepare(self):
+        # 테이블 형식이 없으면 생성
+        self.cursor.execute(f"""
+            IF TYPE_ID(N'dbo.{self.type_name}') IS NULL
+                CREATE TYPE dbo.[{self.type_name}] AS TABLE({CDR_TABLE_COLUMNS_SQL})
+        """)
+        self.conn.commit()
+    
+    def _insert(self, batch):
+        # 첫 두 요소는 TVP 형식 이름과 스키마
+        self.cursor.execute(self.insert_sql, [[self.type_name, 'dbo'] + list(batch)])
+
+
+INSERT_ENGINES = {
+    engine.name: engine
+    for engine in (StagingInsertEngine, FastExecuteManyEngine, TvpInsertEngine)
+}
+
+
+def create_insert_engine(conn, table_name, options, table_hint=''):
+    """옵션에 지정된 삽입 엔진 생성"""
+    name = options['insert_engine']
+    if name not in INSERT_ENGINES:
+        raise Exception(f"알 수 없는 삽입 엔진: {name} (사용 가능: {', '.join(INSERT_ENGINES)})")
+    engine = INSERT_ENGINES[name](conn, table_name, options, table_hint)
+    engine.prepare()
+    return engine
+
+
+class CommitPolicy(ABC):
+    """스테이징 적재 커밋 정책 (기본 클래스)
+
+    insert_rows()는 배치를 삽입할 때마다 add()를 호출하고, due()가 참이면 commit()한다.
+    실패 시에는 마지막 커밋 이후의 배치만 롤백되며 체크포인트는 커밋 시점에만 기록된다.
+    하위 클래스는 name(commit_policy 옵션 값)과 due()를 정한다.
+    """
+    name = None
+    table_hint = ''
+    # 실패 시 로그에 남길 롤백 범위 설명
+    rollback_scope = "마지막 커밋 이후 배치"
+    
+    def __init__(self, options):
+        self.options = options
+        self.pending_rows = 0
+        self.commits = 0
+        self.commit_elapsed = 0.0
+        self.started = time.perf_counter()
+        self.last_commit = self.started
+    
+    def add(self, rows):
+        self.pending_rows += rows
+    
+    @abstractmethod
+    def due(self):
+        """지금 커밋해야 하는지 여부"""
+    
+    def describe(self):
+        return self.name
+    
+    def commit(self, conn):
+        """커밋하고 소요 시간 기록"""
+        start = time.perf_counter()
+        conn.commit()
+        now = time.perf_counter()
+        self.commit_elapsed += now - start
+        self.commits += 1
+        self.pending_rows = 0
+        self.last_commit = now
+    
+    def summary(self):
+        total = time.perf_counter() - self.started
+        return (f"{self.describe()}: 커밋 {self.commits}회 / 커밋 대기 {self.commit_elapsed:.2f}초 "
+                f"(전체 {total:.2f}초)")
+
+
+class RowCountCommitPolicy(CommitPolicy):
+    """지정한 건수 이상 쌓이면 커밋"""
+    name = 'rows'
+    
+    def __init__(self, options):
+        super().__init__(options)
+        self.commit_rows = max(1, int(options['commit_rows']))
+    
+    def due(self):
+        return self.pending_rows >= self.commit_rows
+    
+    def describe(self):
+        return f"rows:{self.commit_rows}"
+
+
+class IntervalCommitPolicy(CommitPolicy):
+    """마지막 커밋 후 지정한 시간이 지나면 커밋"""
+    name = 'seconds'
+    
+    def __init__(self, options):
+        super().__init__(options)
+        self.commit_seconds = max(0.0, float(options['commit_seconds']))
+    
+    def due(self):
+        return self.pending_rows > 0 and time.perf_counter() - self.last_commit >= self.commit_seconds
+    
+    def describe(self):
+        return f"seconds:{self.commit_seconds:g}"
+
+
+class SingleTransactionCommitPolicy(CommitPolicy):
+    """전체를 하나의 트랜잭션으로 적재 (힙 테이블 + TABLOCK → 최소 로깅 대상)
+
+    중간 커밋이 없으므로 실패하면 임시 테이블이 빈 상태로 롤백되고 체크포인트도 남지 않는다.
+    """
+    name = 'single'
+    table_hint = 'WITH (TABLOCK)'
+    rollback_scope = "이번 실행에서 삽입한 전체 배치"
+    
+    def due(self):
+        return False
+
+
+COMMIT_POLICIES = {
+    policy.name: policy for policy in (RowCountCommitPolicy, IntervalCommitPolicy, SingleTransactionCommitPolicy)
+}
+
+
+def create_commit_policy(options):
+    """옵션에 지정된 커밋 정책 생성"""
+    name = options['commit_policy']
+    if name not in COMMIT_POLICIES:
+        raise Exception(f"알 수 없는 커밋 정책: {name} (사용 가능: {', '.join(COMMIT_POLICIES)})")
+    return COMMIT_POLICIES[name](options)
+
+
+class ParallelStagingWriter:
+    """여러 연결로 스테이징 테이블에 배치를 나눠 삽입 (삽입 순서는 보장하지 않음)
+
+    acquire()는 DB-API 연결 하나를 반환하고 release(conn)는 그 연결을 돌려준다.
+    연결 풀 대신 로컬 DB(예: sqlite3, check_same_thread=False) 연결 함수를 넘겨 시험할 수 있다.
+    쓰기 쓰레드는 커밋 정책대로 중간 커밋하고, 배치가 끝나면 남은 트랜잭션도 각자 커밋한다
+    (다른 연결이 잠금을 기다리지 않도록 종료를 기다리기 전에 커밋).
+    하나라도 실패하면 나머지도 멈추고 커밋되지 않은 배치를 롤백한 뒤 예외 하나로 알린다.
+    이미 커밋된 배치는 남으므로 호출하는 쪽은 성공했을 때만 체크포인트를 기록한다.
+    """
+    
+    def __init__(self, acquire, release, table_name, options, writers):
+        self.acquire = acquire
+        self.release = release
+        self.table_name = table_name
+        self.options = options
+        self.writers = max(1, int(writers))
+        self.stop = threading.Event()
+        self.errors = []
+        self.engines = []
+        self.policies = []
+        self.elapsed = 0.0
+    
+    def _write(self, index, batch_queue):
+        engine = self.engines[index]
+        policy = self.policies[index]
+        try:
+            while True:
+                batch = batch_queue.get()
+                if batch is None:
+                    break
+                if self.stop.is_set():
+                    continue        # 다른 쓰레드가 실패하면 남은 배치는 버림
+                engine.insert(batch)
+                policy.add(len(batch))
+                if policy.due():
+                    policy.commit(engine.conn)
+            if self.stop.is_set():
+                # 다른 쓰레드가 실패했으면 커밋하지 않고 잠금을 바로 풀어 줌
+                engine.conn.rollback()
+            elif policy.pending_rows:
+                policy.commit(engine.conn)
+        except Exception as e:
+            self.errors.append((index + 1, e))
+            self.stop.set()
+            # 다른 연결이 이 연결의 잠금을 기다리지 않도록 바로 롤백
+            try:
+                engine.conn.rollback()
+            except Exception:
+                pass
+            # 종료 신호를 받을 때까지 큐를 비워 읽는 쪽이 막히지 않게 함
+            while batch is not None and batch_queue.get() is not None:
+                pass
+    
+    def write(self, batches, on_batch=None):
+        """배치를 모두 삽입하고 전체 건수 반환 (on_batch: 배치를 큐에 넣을 때마다 호출)"""
+        start = time.perf_counter()
+        connections = []
+        threads = []
+        batch_queue = queue.Queue(maxsize=self.writers * 2)
+        try:
+            for _ in range(self.writers):
+                conn = self.acquire()
+                connections.append(conn)
+                self.policies.append(create_commit_policy(self.options))
+                self.engines.append(create_insert_engine(conn, self.table_name, self.options))
+            for index in range(self.writers):
+                thread = threading.Thread(target=self._write, args=(index, batch_queue), daemon=True)
+                thread.start()
+                threads.append(thread)
+            
+            try:
+                for batch in batches:
+                    if self.stop.is_set():
+                        break
+                    batch_queue.put(batch)
+                    if on_batch:
+                        on_batch(len(batch))
+            except Exception as e:
+                self.errors.append((0, e))
+                self.stop.set()
+            finally:
+                for _ in threads:
+                    batch_queue.put(None)
+                for thread in threads:
+                    thread.join()
+            
+            if self.errors:
+                raise Exception("; ".join(
+                    f"{'CSV 읽기' if index == 0 else f'쓰기 {index}번'}: {e}" for index, e in self.errors
+                ))
+            return sum(engine.rows for engine in self.engines)
+        except Exception:
+            for conn in connections:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+            raise
+        finally:
+            self.elapsed = time.perf_counter() - start
+            for engine in self.engines:
+                engine.close()
+            for conn in connections:
+                self.release(conn)
+    
+    @property
+    def rows(self):
+        return sum(engine.rows for engine in self.engines)
+    
+    def summary(self):
+        """전체 처리량과 쓰기 쓰레드별 처리량"""
+        rate = self.rows / self.elapsed if self.elapsed > 0 else 0.0
+        lines = [f"병렬 삽입 {self.writers}개 연결: {self.rows:,}건 / {self.elapsed:.2f}초 ({rate:,.0f} rows/sec)"]
+        for index, (engine, policy) in enumerate(zip(self.engines, self.policies), 1):
+            lines.append(f"  쓰기 {index}번 - {engine.summary()}, 커밋 {policy.commits}회")
+        return "\n".join(lines)
+
+
+class BulkLoadError(Exception):
+    """BULK INSERT를 사용할 수 없음 (행 단위 삽입으로 대체)"""
+
+
+class BulkInsertLoader:
+    """전처리된 레코드를 문자 형식 파일로 쓴 뒤 BULK INSERT ... WITH (TABLOCK) 한 번으로 적재
+
+    SQL Server가 파일을 직접 읽으므로 bulk_local_dir은 서버에서도 접근 가능한
+    공유 폴더여야 하며, 서버 쪽 경로가 다르면 bulk_server_dir에 지정한다.
+    """
+    FIELD_TERMINATOR = '\t'
+    ROW_TERMINATOR = '\n'
+    
+    def __init__(self, conn, table_name, file_stem, options):
+        local_dir = options['bulk_local_dir']
+        if not local_dir:
+            raise BulkLoadError("bulk_local_dir 옵션이 설정되지 않았습니다.")
+        server_dir = options['bulk_server_dir'] or local_dir
+        
+        self.conn = conn
+        self.table_name = table_name
+        self.data_path = os.path.join(local_dir, f"{file_stem}.dat")
+        self.format_path = os.path.join(local_dir, f"{file_stem}.fmt")
+        # 서버 경로 구분자는 Windows 기준
+        self.server_data_path = server_dir.rstrip('\\/') + '\\' + f"{file_stem}.dat"
+        self.server_format_path = server_dir.rstrip('\\/') + '\\' + f"{file_stem}.fmt"
+        self.rows = 0
+        self.write_elapsed = 0.0
+        self.load_elapsed = 0.0
+    
+    def write_format_file(self):
+        """XML 형식 파일 작성 (모든 필드를 UTF-8 문자 데이터로 기술)"""
+        fields = []
+        columns = []
+        for idx, column in enumerate(CDR_COLUMNS, 1):
+            terminator = '\\n' if idx == len(CDR_COLUMNS) else '\\t'
+            fields.append(f'  <FIELD ID="{idx}" xsi:type="CharTerm" TERMINATOR="{terminator}" MAX_LENGTH="200"/>')
+            columns.append(f'  <COLUMN SOURCE="{idx}" NAME="{column}" xsi:type="SQLNVARCHAR"/>')
+        content = (
+            '<?xml version="1.0"?>\n'
+            '<BCPFORMAT xmlns="http://schemas.microsoft.com/sqlserver/2004/bulkload/format" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\n'
+            ' <RECORD>\n' + '\n'.join(fields) + '\n </RECORD>\n'
+            ' <ROW>\n' + '\n'.join(columns) + '\n </ROW>\n'
+            '</BCPFORMAT>\n'
+        )
+        with open(self.format_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def write_data_file(self, batches, on_batch=None):
+        """레코드를 구분자 파일로 작성 (None은 빈 필드 → NULL)"""
+        start = time.perf_counter()
+        self.rows = 0
+        with open(self.data_path, 'w', encoding='utf-8', newline='') as f:
+            for batch in batches:
+                lines = []
+                for row in batch:
+                    if len(row) != len(CDR_COLUMNS):
+                        raise BulkLoadError(f"컬럼 수가 맞지 않는 레코드: {row}")
+                    values = ['' if value is None else str(value) for value in row]
+                    for value in values:
+                        if self.FIELD_TERMINATOR in value or self.ROW_TERMINATOR in value or '\r' in value:
+                            raise BulkLoadError(f"구분자가 포함된 값은 BULK INSERT로 적재할 수 없습니다: {value!r}")
+                    lines.append(self.FIELD_TERMINATOR.join(values))
+                f.write(self.ROW_TERMINATOR.join(lines) + self.ROW_TERMINATOR)
+                self.rows += len(batch)
+                if on_batch:
+                    on_batch(self.rows)
+        self.write_elapsed = time.perf_counter() - start
+    
+    def load(self):
+        """BULK INSERT 실행 (단일 트랜잭션)"""
+        start = time.perf_counter()
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"""
+                BULK INSERT {self.table_name}
+                FROM '{self.server_data_path.replace("'", "''")}'
+                WITH (
+                    FORMATFILE = '{self.server_format_path.replace("'", "''")}',
+                    CODEPAGE = '65001',
+                    KEEPNULLS,
+                    TABLOCK
+                )
+            """)
+            self.conn.commit()
+        except pyodbc.Error as e:
+            self.conn.rollback()
+            raise BulkLoadError(f"BULK INSERT 실패: {e}")
+        finally:
+            cursor.close()
+        self.load_elapsed = time.perf_counter() - start
+    
+    def cleanup(self):
+        for path in (self.data_path, self.format_path):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError:
+                pass
+    
+    def summary(self):
+        total = self.write_elapsed + self.load_elapsed
+        rate = self.rows / total if total > 0 else 0.0
+        return (f"bulk: {self.rows:,}건 / 파일 작성 {self.write_elapsed:.2f}초 + "
+                f"BULK INSERT {self.load_elapsed:.2f}초 ({rate:,.0f} rows/sec)")
+
+
+class PartitionSwitchError(Exception):
+    """파티션 전환을 사용할 수 없음 (INSERT 병합으로 대체)"""
+
+
+class PartitionSwitchLoader:
+    """임시 테이블을 CDR의 날짜 파티션으로 전환 (ALTER TABLE ... SWITCH, 메타데이터만 변경)
+
+    CDR은 pf_CDR_RecDT(RANGE RIGHT, 하루 단위 경계) / ps_CDR_RecDT 위에 RecDT 클러스터형 인덱스로
+    구성되어 있어야 한다. 전환하려면 임시 테이블의 인덱스와 제약 조건이 CDR과 같아야 하므로
+    sys.indexes / sys.check_constraints / sys.default_constraints에서 CDR 정의를 읽어 그대로 만든다.
+    클러스터형 인덱스, 기본값, CHECK 제약 조건은 테이블을 만들 때, 비클러스터형 인덱스는 적재가 끝난 뒤
+    만들고, 해당 날짜 범위 CHECK 제약 조건을 걸어 대상 파티션이 비어 있으면 전환한다.
+    """
+    FUNCTION_NAME = 'pf_CDR_RecDT'
+    SCHEME_NAME = 'ps_CDR_RecDT'
+    INDEX_NAME = 'CIX_CDR_RecDT'
+    FILEGROUP = '[PRIMARY]'
+    
+    def __init__(self, conn, day, options):
+        self.conn = conn
+        self.day = datetime(day.year, day.month, day.day)
+        self.next_day = self.day + timedelta(days=1)
+        self.options = options
+        self.partition_number = None
+        self.elapsed = 0.0
+    
+    @staticmethod
+    def _literal(value):
+        return f"CONVERT(datetime2(7), '{value:%Y-%m-%dT%H:%M:%S}', 126)"
+    
+    def _scalar(self, sql, *params):
+        cursor = self.conn.cursor()
+        try:
+            row = cursor.execute(sql, *params).fetchone()
+            return row[0] if row else None
+        finally:
+            cursor.close()
+    
+    def _execute(self, sql, *params):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, *params)
+        finally:
+            cursor.close()
+    
+    def ensure_partition_objects(self):
+        """파티션 함수와 스키마가 없으면 생성"""
+        self._execute(f"""
+            IF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = N'{self.FUNCTION_NAME}')
+                CREATE PARTITION FUNCTION {self.FUNCTION_NAME} (datetime2(7)) AS RANGE RIGHT FOR VALUES ()
+        """)
+        self._execute(f"""
+            IF NOT EXISTS (SELECT 1 FROM sys.partition_schemes WHERE name = N'{self.SCHEME_NAME}')
+                CREATE PARTITION SCHEME {self.SCHEME_NAME} AS PARTITION {self.FUNCTION_NAME} ALL TO ({self.FILEGROUP})
+        """)
+        self.conn.commit()
+    
+    def is_cdr_partitioned(self):
+        """CDR(힙 또는 클러스터형 인덱스)이 파티션 스키마 위에 있는지 여부"""
+        scheme = self._scalar("""
+            SELECT ps.name FROM sys.indexes i
+            JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+            WHERE i.object_id = OBJECT_ID(N'dbo.CDR') AND i.index_id IN (0, 1)
+        """)
+        return scheme == self.SCHEME_NAME
+    
+    def migrate_cdr(self):
+        """힙인 CDR을 RecDT 클러스터형 인덱스로 파티션 스키마에 올림 (테이블 전체를 다시 씀)"""
+        has_clustered = self._scalar(
+            "SELECT COUNT(*) FROM sys.indexes WHERE object_id = OBJECT_ID(N'dbo.CDR') AND index_id = 1"
+        )
+        if has_clustered:
+            raise PartitionSwitchError(
+                f"CDR에 다른 클러스터형 인덱스가 있어 자동으로 파티션을 구성할 수 없습니다. "
+                f"{self.SCHEME_NAME}(RecDT) 위로 직접 다시 만들어 주세요."
+            )
+        self._execute(
+            f"CREATE CLUSTERED INDEX {self.INDEX_NAME} ON dbo.CDR (RecDT) ON {self.SCHEME_NAME} (RecDT)"
+        )
+        self.conn.commit()
+    
+    def ensure_day_partition(self):
+        """해당 날짜와 다음 날짜 경계가 없으면 추가해 [day, next_day) 파티션을 만들고 번호 반환"""
+        for boundary in (self.day, self.next_day):
+            exists = self._scalar(f"""
+                SELECT COUNT(*) FROM sys.partition_range_values prv
+                JOIN sys.partition_functions pf ON pf.function_id = prv.function_id
+                WHERE pf.name = N'{self.FUNCTION_NAME}' AND CAST(prv.value AS datetime2(7)) = {self._literal(boundary)}
+            """)
+            if not exists:
+                self._execute(f"ALTER PARTITION SCHEME {self.SCHEME_NAME} NEXT USED {self.FILEGROUP}")
+                self._execute(f"ALTER PARTITION FUNCTION {self.FUNCTION_NAME}() SPLIT RANGE ({self._literal(boundary)})")
+        self.conn.commit()
+        self.partition_number = self._scalar(f"SELECT $PARTITION.{self.FUNCTION_NAME}({self._literal(self.day)})")
+        return self.partition_number
+    
+    def prepare(self):
+        """파티션 함수/스키마와 날짜 파티션 준비 (사용할 수 없으면 PartitionSwitchError)"""
+        try:
+            self.ensure_partition_objects()
+            if not self.is_cdr_partitioned():
+                if not self.options['partition_setup']:
+                    raise PartitionSwitchError(
+                        "CDR 테이블이 파티션으로 구성되어 있지 않습니다 (partition_setup 옵션으로 최초 1회 구성)."
+                    )
+                self.migrate_cdr()
+            return self.ensure_day_partition()
+        except pyodbc.Error as e:
+            self.conn.rollback()
+            raise PartitionSwitchError(f"파티션 준비 실패: {e}")
+    
+    def _fetchall(self, sql):
+        cursor = self.conn.cursor()
+        try:
+            return cursor.execute(sql).fetchall()
+        finally:
+            cursor.close()
+    
+    def target_indexes(self):
+        """CDR의 인덱스 정의 목록 (클러스터형이 먼저)
+
+        각 항목: {'name', 'clustered', 'unique', 'constraint'(PRIMARY KEY/UNIQUE/None),
+                 'keys'[(컬럼, 내림차순 여부)], 'includes'[컬럼], 'filter', 'compression'}
+        """
+        rows = self._fetchall(f"""
+            SELECT i.index_id, i.name, i.type_desc, i.is_unique, i.is_primary_key, i.is_unique_constraint,
+                   i.filter_definition, c.name, ic.key_ordinal, ic.is_included_column, ic.is_descending_key,
+                   (SELECT p.data_compression_desc FROM sys.partitions p
+                    WHERE p.object_id = i.object_id AND p.index_id = i.index_id
+                      AND p.partition_number = {int(self.partition_number or 1)})
+            FROM sys.indexes i
+            JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+            JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+            WHERE i.object_id = OBJECT_ID(N'dbo.CDR') AND i.index_id > 0
+              AND i.is_hypothetical = 0 AND i.is_disabled = 0
+            ORDER BY i.index_id, ic.is_included_column, ic.key_ordinal, ic.index_column_id
+        """)
+        indexes = {}
+        for (index_id, name, type_desc, is_unique, is_primary_key, is_unique_constraint,
+             filter_definition, column, key_ordinal, is_included, is_descending, compression) in rows:
+            if type_desc not in ('CLUSTERED', 'NONCLUSTERED'):
+                raise PartitionSwitchError(f"CDR의 {type_desc} 인덱스({name})는 임시 테이블에 만들 수 없습니다.")
+            index = indexes.setdefault(index_id, {
+                'name': name,
+                'clustered': type_desc == 'CLUSTERED',
+                'unique': bool(is_unique),
+                'constraint': 'PRIMARY KEY' if is_primary_key else 'UNIQUE' if is_unique_constraint else None,
+                'keys': [],
+                'includes': [],
+                'filter': filter_definition,
+                'compression': compression,
+            })
+            if is_included:
+                index['includes'].append(column)
+            elif key_ordinal:
+                # key_ordinal이 0이면 파티션 정렬 때문에 붙은 컬럼이므로 제외
+                index['keys'].append((column, bool(is_descending)))
+        return sorted(indexes.values(), key=lambda index: not index['clustered'])
+    
+    def index_sql(self, table_name, index):
+        """CDR 인덱스 정의로 임시 테이블 인덱스(또는 PRIMARY KEY/UNIQUE 제약 조건) 생성 SQL"""
+        kind = 'CLUSTERED' if index['clustered'] else 'NONCLUSTERED'
+        keys = ', '.join(f"[{column}] {'DESC' if descending else 'ASC'}" for column, descending in index['keys'])
+        options = ''
+        if index['compression'] and index['compression'] != 'NONE':
+            options = f" WITH (DATA_COMPRESSION = {index['compression']})"
+        if index['constraint']:
+            # 제약 조건 이름은 스키마 안에서 고유해야 하므로 임시 테이블 이름을 붙임
+            name = f"{index['name']}_{table_name.strip('[]')}"
+            return (f"ALTER TABLE {table_name} ADD CONSTRAINT [{name}] {index['constraint']} {kind} ({keys})"
+                    f"{options} ON {self.FILEGROUP}")
+        sql = f"CREATE {'UNIQUE ' if index['unique'] else ''}{kind} INDEX [{index['name']}] ON {table_name} ({keys})"
+        if index['includes']:
+            sql += f" INCLUDE ({', '.join(f'[{column}]' for column in index['includes'])})"
+        if index['filter']:
+            sql += f" WHERE {index['filter']}"
+        return sql + f"{options} ON {self.FILEGROUP}"
+    
+    def create_staging(self, table_name):
+        """CDR과 같은 컬럼, 클러스터형 인덱스, 기본값, CHECK 제약 조건을 가진 임시 테이블 생성 (전환 대상 파일 그룹)
+
+        만들 수 없으면 롤백하고 PartitionSwitchError (임시 테이블은 남지 않음)
+        """
+        try:
+            self._create_staging(table_name)
+        except pyodbc.Error as e:
+            self.conn.rollback()
+            raise PartitionSwitchError(f"CDR과 같은 구조의 임시 테이블 생성 실패: {e}")
+        except PartitionSwitchError:
+            self.conn.rollback()
+            raise
+    
+    def _create_staging(self, table_name):
+        name = table_name.strip('[]')
+        self._execute(f"SELECT TOP 0 * INTO {table_name} FROM dbo.CDR")
+        for index in self.target_indexes():
+            if index['clustered']:
+                self._execute(self.index_sql(table_name, index))
+        for constraint, definition, column in self._fetchall("""
+            SELECT dc.name, dc.definition, c.name FROM sys.default_constraints dc
+            JOIN sys.columns c ON c.object_id = dc.parent_object_id AND c.column_id = dc.parent_column_id
+            WHERE dc.parent_object_id = OBJECT_ID(N'dbo.CDR')
+        """):
+            self._execute(f"ALTER TABLE {table_name} ADD CONSTRAINT [{constraint}_{name}] DEFAULT {definition} FOR [{column}]")
+        for constraint, definition in self._fetchall("""
+            SELECT name, definition FROM sys.check_constraints
+            WHERE parent_object_id = OBJECT_ID(N'dbo.CDR') AND is_disabled = 0
+        """):
+            self._execute(f"ALTER TABLE {table_name} WITH CHECK ADD CONSTRAINT [{constraint}_{name}] CHECK {definition}")
+        self.conn.commit()
+    
+    def switch(self, table_name):
+        """날짜 CHECK 제약 조건을 건 뒤 파티션으로 전환하고 전환한 건수 반환"""
+        start = time.perf_counter()
+        try:
+            target_rows = self._scalar("""
+                SELECT SUM(rows) FROM sys.partitions
+                WHERE object_id = OBJECT_ID(N'dbo.CDR') AND index_id IN (0, 1) AND partition_number = ?
+            """, self.partition_number)
+            if target_rows:
+                raise PartitionSwitchError(
+                    f"CDR의 {self.day:%Y-%m-%d} 파티션에 이미 {target_rows}건이 있어 전환할 수 없습니다."
+                )
+            staged_rows = self._scalar(f"SELECT COUNT_BIG(*) FROM {table_name}")
+            # 조회용 인덱스 등 CDR에 없는 비클러스터형 인덱스는 삭제하고 CDR의 비클러스터형 인덱스를 만듦
+            cursor = self.conn.cursor()
+            try:
+                staged_indexes = [row[0] for row in cursor.execute(
+                    "SELECT name FROM sys.indexes WHERE object_id = OBJECT_ID(?) AND index_id > 1 AND is_primary_key = 0 "
+                    "AND is_unique_constraint = 0", table_name
+                ).fetchall()]
+            finally:
+                cursor.close()
+            target_indexes = [index for index in self.target_indexes() if not index['clustered']]
+            target_names = {index['name'] for index in target_indexes if not index['constraint']}
+            for index_name in staged_indexes:
+                if index_name not in target_names:
+                    self._execute(f"DROP INDEX [{index_name}] ON {table_name}")
+            for index in target_indexes:
+                if index['constraint'] or index['name'] not in staged_indexes:
+                    self._execute(self.index_sql(table_name, index))
+            # NULL 또는 다른 날짜 레코드가 있으면 여기서 실패
+            self._execute(f"""
+                ALTER TABLE {table_name} WITH CHECK ADD CONSTRAINT [CK_{table_name.strip('[]')}_RecDT]
+                CHECK (RecDT IS NOT NULL AND RecDT >= {self._literal(self.day)} AND RecDT < {self._literal(self.next_day)})
+            """)
+            self._execute(f"ALTER TABLE {table_name} SWITCH TO dbo.CDR PARTITION {self.partition_number}")
+            self.conn.commit()
+        except pyodbc.Error as e:
+            self.conn.rollback()
+            raise PartitionSwitchError(f"파티션 전환 실패: {e}")
+        except PartitionSwitchError:
+            self.conn.rollback()
+            raise
+        self.elapsed = time.perf_counter() - start
+        return staged_rows
+
+
+class DedupMerger:
+    """행 해시로 이미 들어간 레코드를 건너뛰며 RecDT 구간 단위로 CDR에 병합 (같은 파일을 다시 처리해도 안전)
+
+    행 해시는 8개 컬럼 값과 같은 값을 가진 레코드 안에서의 순번(ROW_NUMBER)으로 만든다.
+    그래서 한 파일 안의 똑같은 레코드 두 건은 둘 다 들어가고, 같은 파일을 다시 넣으면 모두 건너뛴다.
+    해시는 dbo.CDR_RowHash에 날짜와 함께 기록하며, 해시 기록이 없는 날짜에 이미 CDR 레코드가 있으면
+    (이 모드 이전에 적재된 날) 먼저 그 날 레코드의 해시를 채운다.
+    구간마다 CDR 삽입과 해시 기록을 한 트랜잭션으로 커밋해 잠금을 짧게 유지한다.
+    """
+    HASH_TABLE_NAME = 'dbo.CDR_RowHash'
+    WORK_TABLE_NAME = '#CDRMerge'
+    
+    def __init__(self, conn, table_name, options):
+        self.conn = conn
+        self.table_name = table_name
+        self.chunk = timedelta(minutes=max(1, int(options['merge_chunk_minutes'])))
+        self.inserted = 0
+        self.skipped = 0
+        self.backfilled = 0
+        self.chunks = 0
+        self.elapsed = 0.0
+    
+    @staticmethod
+    def row_hash_sql():
+        """8개 컬럼 + 같은 값 레코드 안의 순번으로 SHA2_256 해시 (NULL은 NCHAR(0)로 구분)"""
+        values = []
+        for idx, column in enumerate(CDR_COLUMNS):
+            value = f"CONVERT(nvarchar(27), {column}, 121)" if idx in DATETIME_COLUMN_INDEXES else column
+            values.append(f"ISNULL({value}, NCHAR(0))")
+        values.append(f"ROW_NUMBER() OVER (PARTITION BY {', '.join(CDR_COLUMNS)} ORDER BY (SELECT NULL))")
+        separator = ", N'|', "
+        return f"HASHBYTES('SHA2_256', CONCAT({separator.join(values)}))"
+    
+    def _scalar(self, cursor, sql, *params):
+        row = cursor.execute(sql, *params).fetchone()
+        return row[0] if row else None
+    
+    def prepare(self, cursor):
+        """해시 테이블 생성, 임시 테이블 해시 계산, 해시가 없는 날짜의 기존 CDR 해시 채우기"""
+        cursor.execute(f"""
+            IF OBJECT_ID(N'{self.HASH_TABLE_NAME}', N'U') IS NULL
+                CREATE TABLE {self.HASH_TABLE_NAME} (
+                    RowHash binary(32) NOT NULL CONSTRAINT PK_CDR_RowHash PRIMARY KEY,
+                    RecDay date NULL
+                )
+        """)
+        cursor.execute(f"""
+            IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'{self.HASH_TABLE_NAME}') AND name = N'IX_CDR_RowHash_RecDay')
+                CREATE INDEX IX_CDR_RowHash_RecDay ON {self.HASH_TABLE_NAME} (RecDay)
+        """)
+        self.conn.commit()
+        
+        cursor.execute(f"IF OBJECT_ID(N'tempdb..{self.WORK_TABLE_NAME}') IS NOT NULL DROP TABLE {self.WORK_TABLE_NAME}")
+        cursor.execute(f"""
+            SELECT {', '.join(CDR_COLUMNS)}, {self.row_hash_sql()} AS RowHash
+            INTO {self.WORK_TABLE_NAME}
+            FROM {self.table_name}
+        """)
+        cursor.execute(f"CREATE CLUSTERED INDEX CIX_CDRMerge ON {self.WORK_TABLE_NAME} (RecDT)")
+        self.conn.commit()
+        
+        days = [row[0] for row in cursor.execute(
+            f"SELECT DISTINCT CAST(RecDT AS date) FROM {self.WORK_TABLE_NAME} WHERE RecDT IS NOT NULL"
+        ).fetchall()]
+        for day in days:
+            day = datetime(day.year, day.month, day.day) if not isinstance(day, datetime) else day
+            next_day = day + timedelta(days=1)
+            if self._scalar(cursor, f"SELECT COUNT(*) FROM {self.HASH_TABLE_NAME} WHERE RecDay = ?", day.date()):
+                continue
+            cursor.execute(f"""
+                INSERT INTO {self.HASH_TABLE_NAME} (RowHash, RecDay)
+                SELECT {self.row_hash_sql()}, CAST(RecDT AS date)
+                FROM dbo.CDR WITH(NOLOCK)
+                WHERE RecDT >= ? AND RecDT < ?
+            """, day, next_day)
+            self.backfilled += max(cursor.rowcount, 0)
+            self.conn.commit()
+    
+    def _merge_chunk(self, cursor, where, *params):
+        """구간 하나 병합 (이미 있는 해시 삭제 → CDR 삽입 → 해시 기록 → 커밋)"""
+        try:
+            cursor.execute(f"""
+                DELETE w FROM {self.WORK_TABLE_NAME} w
+                WHERE {where} AND EXISTS (SELECT 1 FROM {self.HASH_TABLE_NAME} h WHERE h.RowHash = w.RowHash)
+            """, *params)
+            skipped = max(cursor.rowcount, 0)
+            cursor.execute(f"INSERT INTO CDR SELECT {', '.join(CDR_COLUMNS)} FROM {self.WORK_TABLE_NAME} w WHERE {where}", *params)
+            inserted = max(cursor.rowcount, 0)
+            cursor.execute(f"""
+                INSERT INTO {self.HASH_TABLE_NAME} (RowHash, RecDay)
+                SELECT RowHash, CAST(RecDT AS date) FROM {self.WORK_TABLE_NAME} w WHERE {where}
+            """, *params)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.inserted += inserted
+        self.skipped += skipped
+        self.chunks += 1
+    
+    def merge(self, on_chunk=None):
+        """전체 병합 후 삽입 건수 반환 (on_chunk(완료 구간 수, 전체 구간 수))"""
+        start = time.perf_counter()
+        cursor = self.conn.cursor()
+        try:
+            self.prepare(cursor)
+            first, last = cursor.execute(f"SELECT MIN(RecDT), MAX(RecDT) FROM {self.WORK_TABLE_NAME}").fetchone()
+            ranges = []
+            if first is not None:
+                chunk_start = first.replace(minute=0, second=0, microsecond=0)
+                while chunk_start <= last:
+                    ranges.append((chunk_start, chunk_start + self.chunk))
+                    chunk_start += self.chunk
+            for index, (chunk_start, chunk_end) in enumerate(ranges, 1):
+                self._merge_chunk(cursor, "w.RecDT >= ? AND w.RecDT < ?", chunk_start, chunk_end)
+                if on_chunk:
+                    on_chunk(index, len(ranges))
+            # 일시가 비어 있는 레코드
+            self._merge_chunk(cursor, "w.RecDT IS NULL")
+            cursor.execute(f"DROP TABLE {self.WORK_TABLE_NAME}")
+            self.conn.commit()
+        finally:
+            cursor.close()
+            self.elapsed = time.perf_counter() - start
+        return self.inserted
+    
+    def summary(self):
+        text = f"추가 {self.inserted:,}건 / 중복 제외 {self.skipped:,}건 ({self.chunks}개 구간, {self.elapsed:.2f}초)"
+        if self.backfilled:
+            text += f", 기존 CDR 해시 {self.backfilled:,}건 등록"
+        return text
+
+
+# 적재 진행 상황 등 로컬 상태 저장 DB
+STATE_DB_PATH = os.path.join("./DB", "CDR_State.db")
+
+
+class CheckpointStore:
+    """파일별 적재 체크포인트(커밋된 바이트 위치와 레코드 수) 로컬 저장소
+
+    파일 크기나 수정 시각이 바뀌면 체크포인트는 무효로 본다.
+    """
+    
+    def __init__(self, db_path=STATE_DB_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS CHECKPOINT (
+                FilePath TEXT PRIMARY KEY,
+                FileSize INTEGER NOT NULL,
+                FileMtime REAL NOT NULL,
+                TableName TEXT NOT NULL,
+                ByteOffset INTEGER NOT NULL,
+                RowCount INTEGER NOT NULL,
+                UpdatedAt TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+    
+    @staticmethod
+    def _file_key(csv_file):
+        path = os.path.normcase(os.path.abspath(csv_file))
+        stat = os.stat(csv_file)
+        return path, stat.st_size, stat.st_mtime
+    
+    def load(self, csv_file):
+        """유효한 체크포인트 반환 (없으면 None)"""
+        path, size, mtime = self._file_key(csv_file)
+        row = self.conn.execute(
+            "SELECT FileSize, FileMtime, TableName, ByteOffset, RowCount, UpdatedAt FROM CHECKPOINT WHERE FilePath = ?",
+            (path,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[0] != size or row[1] != mtime:
+            self.clear(csv_file)
+            return None
+        return {
+            'TableName': row[2],
+            'ByteOffset': row[3],
+            'RowCount': row[4],
+            'UpdatedAt': row[5],
+        }
+    
+    def save(self, csv_file, table_name, byte_offset, row_count):
+        path, size, mtime = self._file_key(csv_file)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO CHECKPOINT VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, size, mtime, table_name, byte_offset, row_count, datetime.now().isoformat(timespec='seconds'))
+        )
+        self.conn.commit()
+    
+    def clear(self, csv_file):
+        path = os.path.normcase(os.path.abspath(csv_file))
+        self.conn.execute("DELETE FROM CHECKPOINT WHERE FilePath = ?", (path,))
+        self.conn.commit()
+    
+    def close(self):
+        self.conn.close()
+
+
+class ProcessedFileStore:
+    """처리를 마친 CDR 파일 기록 (일괄/감시 모드에서 같은 파일을 다시 병합하지 않기 위함)
+
+    파일 크기나 수정 시각이 바뀌면 처리하지 않은 파일로 본다.
+    """
+    
+    def __init__(self, db_path=STATE_DB_PATH):
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS PROCESSED_FILE (
+                FilePath TEXT PRIMARY KEY,
+                FileSize INTEGER NOT NULL,
+                FileMtime REAL NOT NULL,
+                ResultPath TEXT NOT NULL,
+                ProcessedAt TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+    
+    def is_processed(self, csv_file):
+        path, size, mtime = CheckpointStore._file_key(csv_file)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT FileSize, FileMtime FROM PROCESSED_FILE WHERE FilePath = ?", (path,)
+            ).fetchone()
+        return row is not None and row[0] == size and row[1] == mtime
+    
+    def mark(self, csv_file, result_path):
+        path, size, mtime = CheckpointStore._file_key(csv_file)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO PROCESSED_FILE VALUES (?, ?, ?, ?, ?)",
+                (path, size, mtime, result_path, datetime.now().isoformat(timespec='seconds'))
+            )
+            self.conn.commit()
+    
+    def close(self):
+        self.conn.close()
+
+
+class BatchSizeStore:
+    """적응형 배치가 자리잡은 크기를 서버/DB/삽입 엔진별로 기록 (다음 실행의 시작 크기)"""
+    
+    def __init__(self, db_path=STATE_DB_PATH):
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS BATCH_SIZE (
+                ProfileKey TEXT PRIMARY KEY,
+                BatchSize INTEGER NOT NULL,
+                RowsPerSec REAL NOT NULL,
+                UpdatedAt TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+    
+    @staticmethod
+    def profile_key(db_config, options):
+        return f"{db_config['Host']}:{db_config['Port']}/{db_config['DB_Name']}/{options['insert_engine']}"
+    
+    def load(self, key):
+        """기록된 배치 크기 반환 (없으면 None)"""
+        row = self.conn.execute("SELECT BatchSize FROM BATCH_SIZE WHERE ProfileKey = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def save(self, key, batch_size, rows_per_sec):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO BATCH_SIZE VALUES (?, ?, ?, ?)",
+            (key, batch_size, rows_per_sec, datetime.now().isoformat(timespec='seconds'))
+        )
+        self.conn.commit()
+    
+    def close(self):
+        self.conn.close()
+
+
+class AdaptiveBatchSizer:
+    """배치별 삽입 시간과 처리량을 보고 다음 배치 크기를 min_size ~ max_size 안에서 조정
+
+    삽입 시간이 목표의 절반보다 짧으면 키우고, 목표의 두 배를 넘으면(네트워크 지연, 잠금 대기) 줄인다.
+    키운 뒤 처리량이 오히려 떨어지면 이전 크기로 되돌리고 이번 실행에서는 그 이상 키우지 않는다.
+    """
+    GROW_FACTOR = 2.0
+    SHRINK_FACTOR = 0.5
+    SAMPLES_PER_STEP = 3        # 크기를 키우기 전 같은 크기로 측정할 배치 수
+    EWMA_ALPHA = 0.3
+    
+    def __init__(self, min_size, max_size, target_seconds, start_size=None):
+        self.min_size = max(1, int(min_size))
+        self.max_size = max(self.min_size, int(max_size))
+        self.target_seconds = float(target_seconds)
+        self.ceiling = self.max_size
+        self.size = self._clamp(start_size or self.min_size)
+        self.start_size = self.size
+        self.previous_size = None
+        self.rates = {}         # 배치 크기 → 처리량(rows/sec) 지수 이동 평균
+        self.samples = 0        # 현재 크기로 측정한 배치 수
+        self.adjustments = 0
+    
+    def _clamp(self, size):
+        return max(self.min_size, min(int(size), self.ceiling))
+    
+    def _resize(self, size):
+        size = self._clamp(size)
+        if size != self.size:
+            self.previous_size, self.size = self.size, size
+            self.samples = 0
+            self.adjustments += 1
+    
+    def record(self, rows, seconds):
+        """배치 하나의 삽입 결과 반영"""
+        if rows <= 0:
+            return
+        seconds = max(seconds, 1e-6)
+        rate = rows / seconds
+        average = self.rates.get(self.size)
+        self.rates[self.size] = rate if average is None else average + self.EWMA_ALPHA * (rate - average)
+        self.samples += 1
+        
+        # 목표를 크게 넘으면 바로 줄임
+        if seconds > self.target_seconds * 2:
+            self._resize(self.size * self.SHRINK_FACTOR)
+            return
+        if self.samples < self.SAMPLES_PER_STEP:
+            return
+        # 직전에 키웠는데 처리량이 떨어졌으면 되돌리고 상한으로 고정
+        if self.previous_size and self.previous_size < self.size:
+            if self.rates[self.size] < self.rates.get(self.previous_size, 0.0) * 0.95:
+                self.ceiling = self.previous_size
+                self._resize(self.previous_size)
+                return
+        if seconds < self.target_seconds / 2:
+            self._resize(self.size * self.GROW_FACTOR)
+    
+    @property
+    def rows_per_sec(self):
+        """현재 크기의 처리량 (막 바뀐 크기라 측정값이 없으면 지금까지의 최고값)"""
+        if self.size in self.rates:
+            return self.rates[self.size]
+        return max(self.rates.values(), default=0.0)
+    
+    def summary(self):
+        return (f"적응형 배치: {self.start_size:,} → {self.size:,}건 "
+                f"(조정 {self.adjustments}회, {self.rows_per_sec:,.0f} rows/sec)")
+
+
+def sized_batches(batches, sizer):
+    """읽은 배치를 이어 붙여 sizer.size 건 이상이 되면 반환
+
+    읽기 배치 경계에서만 끊으므로 반환 시점의 batch_end_offset이 그대로 체크포인트 위치가 된다.
+    """
+    pending = []
+    for batch in batches:
+        pending.extend(batch)
+        if len(pending) >= sizer.size:
+            yield pending
+            pending = []
+    if pending:
+        yield pending
+
+
+# 스트리밍으로 압축을 풀어 읽을 수 있는 확장자
+COMPRESSED_SUFFIXES = ('.gz', '.zst')
+
+
+def is_compressed_file(path):
+    return path.lower().endswith(COMPRESSED_SUFFIXES)
+
+
+def cdr_file_stem(path):
+    """압축 확장자까지 뗀 파일명 (CDR-25120900.csv.gz -> CDR-25120900)"""
+    name = os.path.basename(path)
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.lower().endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return os.path.splitext(name)[0]
+
+
+def open_cdr_binary(path):
+    """CDR 파일을 바이너리로 열기 (.gz/.zst는 임시 파일 없이 스트리밍으로 압축 해제)
+
+    반환값: (읽기용 스트림, 원본 파일) - 진행률은 원본 파일 위치로 계산한다.
+    """
+    raw = open(path, 'rb')
+    lower = path.lower()
+    try:
+        if lower.endswith('.gz'):
+            return gzip.GzipFile(fileobj=raw, mode='rb'), raw
+        if lower.endswith('.zst'):
+            if zstandard is None:
+                raise Exception("zst 파일을 읽으려면 zstandard 패키지가 필요합니다. (pip install zstandard)")
+            reader = zstandard.ZstdDecompressor().stream_reader(raw, read_size=1024 * 1024)
+            return io.BufferedReader(reader, buffer_size=1024 * 1024), raw
+    except Exception:
+        raw.close()
+        raise
+    return raw, raw
+
+
+class CDRCsvStream:
+    """CDR CSV 파일을 배치 단위로 스트리밍 읽기
+
+    파일 전체를 메모리에 올리지 않고 한 배치씩 읽고 전처리하므로
+    메모리 사용량은 파일 크기가 아닌 배치 크기에 비례한다.
+    .gz/.zst 파일은 스트리밍으로 압축을 풀며, 이때 바이트 위치(bytes_read,
+    batch_end_offset)는 압축 해제된 데이터 기준이다.
+    """
+
+    # 배치 끝 바이트 위치를 정확히 알 수 있으므로 중단 지점부터 이어서 읽을 수 있음
+    supports_resume = True
+
+    def __init__(self, csv_file, encoding='utf-8-sig'):
+        self.csv_file = csv_file
+        self.encoding = encoding
+        self.compressed = is_compressed_file(csv_file)
+        self.total_bytes = os.path.getsize(csv_file)
+        self.bytes_read = 0
+        self.rows_read = 0
+        self.batch_end_offset = 0
+        self.datetime_parser = CDRDatetimeParser()
+        self._raw = None
+
+    def _iter_lines(self, f):
+        """바이너리 파일을 줄 단위로 디코딩 (읽은 바이트 수 추적)"""
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        for raw_line in f:
+            self.bytes_read += len(raw_line)
+            yield decoder.decode(raw_line)
+
+    def rows(self, start_offset=0):
+        """CSV 레코드를 한 건씩 그대로 반환 (전처리는 배치 단위로 수행)
+
+        start_offset은 레코드 경계의 바이트 위치 (체크포인트에서 이어 읽을 때 사용)
+        """
+        self.bytes_read = start_offset
+        self.rows_read = 0
+        f, self._raw = open_cdr_binary(self.csv_file)
+        try:
+            if self.compressed:
+                # 압축 스트림은 앞에서부터 풀면서 건너뜀
+                remaining = start_offset
+                while remaining > 0:
+                    chunk = f.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+            else:
+                f.seek(start_offset)
+            for row in csv.reader(self._iter_lines(f)):
+                # 빈 줄은 건너뜀
+                if not row:
+                    continue
+                self.rows_read += 1
+                yield row
+        finally:
+            f.close()
+            self._raw.close()
+
+    def batches(self, batch_size, start_offset=0):
+        """batch_size 개씩 묶어서 컬럼 단위로 전처리한 뒤 반환
+
+        각 배치를 반환할 때 batch_end_offset은 그 배치 마지막 레코드 다음 바이트 위치다.
+        """
+        batch = []
+        for row in self.rows(start_offset):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self.batch_end_offset = self.bytes_read
+                yield normalize_batch(batch, parser=self.datetime_parser)
+                batch = []
+        if batch:
+            self.batch_end_offset = self.bytes_read
+            yield normalize_batch(batch, parser=self.datetime_parser)
+
+    @property
+    def progress(self):
+        """읽기 진행률 (0.0 ~ 1.0, 압축 파일은 원본 파일 위치 기준)"""
+        if self.total_bytes == 0:
+            return 1.0
+        if self.compressed:
+            if self._raw is None or self._raw.closed:
+                return 1.0 if self.rows_read else 0.0
+            return min(self._raw.tell() / self.total_bytes, 1.0)
+        return min(self.bytes_read / self.total_bytes, 1.0)
+
+
+def _next_line_end(mm, offset):
+    """offset 이후 첫 줄바꿈 다음 위치 (없으면 파일 끝)"""
+    if offset >= len(mm):
+        return len(mm)
+    newline = mm.find(b'\n', offset)
+    return len(mm) if newline < 0 else newline + 1
+
+
+def _quoted_line_end(mm, start, end):
+    """[start, end) 안의 따옴표 수가 짝수가 될 때까지 end를 다음 줄바꿈으로 늘림
+
+    따옴표 수가 홀수이면 end 직전 줄바꿈이 따옴표 필드 안에 있는 것이다 (""는 2개로 세므로 홀짝 유지).
+    따옴표가 없는 범위는 복사하지 않고 find로만 확인한다.
+    """
+    if mm.find(b'"', start, end) < 0:
+        return end
+    size = len(mm)
+    quotes = mm[start:end].count(b'"')
+    while quotes % 2 and end < size:
+        next_end = _next_line_end(mm, end)
+        quotes += mm[end:next_end].count(b'"')
+        end = next_end
+    return end
+
+
+def split_byte_ranges(csv_file, chunk_bytes, start_offset=0):
+    """파일을 레코드 경계에 맞춘 (시작, 끝) 바이트 범위로 나눠 차례로 반환 (BOM 제외)
+
+    범위 끝은 줄바꿈 직후이고, 따옴표 필드 안의 줄바꿈에서는 나누지 않는다.
+    요청할 때마다 다음 범위만 정하므로 앞 범위의 파싱과 겹쳐 진행된다.
+    """
+    if os.path.getsize(csv_file) == 0:
+        return
+    with open(csv_file, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            start = len(codecs.BOM_UTF8) if mm[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+            start = max(start, start_offset)
+            while start < size:
+                end = _quoted_line_end(mm, start, _next_line_end(mm, start + chunk_bytes))
+                yield start, end
+                start = end
+
+
+def _split_block(data, row_ends):
+    """따옴표·빈 줄이 없는 블록을 줄 단위 반복 없이 한 번에 분할 (조건이 맞지 않으면 None)
+
+    줄바꿈을 쉼표로 바꿔 전체를 한 번에 나눈 뒤 컬럼 위치별로 잘라낸다.
+    """
+    width = len(CDR_COLUMNS)
+    if data.endswith(b'\r\n'):
+        body = data[:-2]
+    elif data.endswith(b'\n'):
+        body = data[:-1]
+    else:
+        body = data
+    if not body:
+        return None
+    body = body.replace(b'\r\n', b'\n')
+    if b'\r' in body or b'\n\n' in body or body.startswith(b'\n') or body.endswith(b'\n'):
+        return None
+    line_count = body.count(b'\n') + 1
+    
+    flat = body.decode('utf-8').replace('\n', ',').split(',')
+    if len(flat) != line_count * width:
+        return None
+    selected = [flat[idx::width] for idx in range(width)]
+    
+    if row_ends is not None:
+        # 각 줄 길이 + 줄바꿈 1바이트를 누적 (마지막 줄은 블록 끝을 넘지 않게)
+        ends = list(accumulate(map((1).__add__, map(len, data.split(b'\n', line_count - 1)))))
+        ends[-1] = len(data)
+        row_ends.extend(ends)
+    return list(zip(*selected))
+
+
+def parse_cdr_block(data, row_ends=None):
+    """레코드 경계로 끝나는 CSV 바이트 블록을 레코드 목록으로 변환
+
+    따옴표가 없으면 줄/쉼표 단위로 바로 나누고, 있으면 csv 모듈로 파싱한다.
+    어느 경우든 CDRCsvStream과 같은 결과를 낸다.
+    row_ends 목록을 넘기면 각 레코드가 끝나는 블록 내 바이트 위치를 채운다.
+    """
+    width = len(CDR_COLUMNS)
+    
+    rows = []
+    if b'"' in data:
+        consumed = 0
+        
+        def iter_lines():
+            nonlocal consumed
+            for raw_line in io.BytesIO(data):
+                consumed += len(raw_line)
+                yield raw_line.decode('utf-8')
+        
+        for row in csv.reader(iter_lines()):
+            if not row:
+                continue
+            if len(row) != width:
+                raise Exception(f"컬럼 수가 맞지 않는 레코드 ({len(row)}개): {row}")
+            rows.append(row)
+            if row_ends is not None:
+                row_ends.append(consumed)
+        return rows
+    
+    fast_rows = _split_block(data, row_ends)
+    if fast_rows is not None:
+        return fast_rows
+    
+    pos = 0
+    for line in data.split(b'\n'):
+        pos += len(line) + 1
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        if not line:
+            continue
+        fields = line.split(b',')
+        if len(fields) != width:
+            raise Exception(f"컬럼 수가 맞지 않는 레코드 ({len(fields)}개): {line.decode('utf-8', 'replace')}")
+        rows.append([field.decode('utf-8') for field in fields])
+        if row_ends is not None:
+            row_ends.append(min(pos, len(data)))
+    return rows
+
+
+def parse_byte_range(csv_file, start, end, batch_size):
+    """[start, end) 범위를 파싱·전처리 (병렬 파싱 워커 프로세스에서 실행)
+
+    범위는 split_byte_ranges가 레코드 경계에 맞춰 나눈 것이어야 한다.
+    반환값: ((전처리된 배치, 배치 끝 바이트 위치) 목록, 레코드 수)
+    """
+    with open(csv_file, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[start:end]
+    
+    row_ends = []
+    rows = parse_cdr_block(data, row_ends=row_ends)
+    parser = CDRDatetimeParser()
+    batches = [
+        (normalize_batch(rows[i:i + batch_size], parser=parser), start + row_ends[min(i + batch_size, len(rows)) - 1])
+        for i in range(0, len(rows), batch_size)
+    ]
+    return batches, len(rows)
+
+
+class ParallelCsvReader:
+    """CDR CSV를 레코드 경계 바이트 범위로 나눠 프로세스 풀에서 파싱·전처리
+
+    CDRCsvStream과 같은 인터페이스(batches, progress, rows_read)를 제공한다.
+    범위는 따옴표 수의 홀짝으로 따옴표 필드 밖에서만 나누므로 워커 결과를 다시 파싱하지 않는다.
+    동시에 메모리에 있는 범위 결과는 워커 수의 2배로 제한된다.
+    순서 무관 모드에서는 배치가 파일 순서대로 오지 않으므로 이어서 읽기를 지원하지 않는다.
+    """
+    MIN_CHUNK_BYTES = 1024 * 1024
+    
+    def __init__(self, csv_file, workers, chunk_bytes, ordered=True):
+        self.csv_file = csv_file
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_bytes = max(chunk_bytes, self.MIN_CHUNK_BYTES)
+        self.ordered = ordered
+        self.supports_resume = ordered
+        self.total_bytes = os.path.getsize(csv_file)
+        self.bytes_read = 0
+        self.rows_read = 0
+        self.batch_end_offset = None
+    
+    def _submit(self, pool, byte_range, batch_size):
+        start, end = byte_range
+        return pool.submit(parse_byte_range, self.csv_file, start, end, batch_size)
+    
+    def _ordered_results(self, pool, ranges, batch_size):
+        """범위 순서대로 (범위, 결과) 반환 (동시 작업 수는 워커 수의 2배로 제한)"""
+        pending = deque()
+        while True:
+            for byte_range in itertools.islice(ranges, self.workers * 2 - len(pending)):
+                pending.append((byte_range, self._submit(pool, byte_range, batch_size)))
+            if not pending:
+                return
+            byte_range, future = pending.popleft()
+            yield byte_range, future.result()
+    
+    def _unordered_results(self, pool, ranges, batch_size):
+        """완료되는 순서대로 (범위, 결과) 반환"""
+        pending = {}
+        while True:
+            for byte_range in itertools.islice(ranges, self.workers * 2 - len(pending)):
+                pending[self._submit(pool, byte_range, batch_size)] = byte_range
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    
+    def batches(self, batch_size, start_offset=0):
+        """전처리된 배치 반환 (범위 경계에서는 batch_size보다 작을 수 있음)"""
+        if start_offset and not self.ordered:
+            raise Exception("순서 무관 병렬 파싱은 이어서 읽기를 지원하지 않습니다.")
+        self.rows_read = 0
+        self.batch_end_offset = None
+        # 시작 위치(체크포인트)까지는 읽은 것으로 처리
+        self.bytes_read = start_offset
+        ranges = split_byte_ranges(self.csv_file, self.chunk_bytes, start_offset)
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        results = self._ordered_results if self.ordered else self._unordered_results
+        try:
+            for (start, end), (batches, rows) in results(pool, ranges, batch_size):
+                self.bytes_read += end - start
+                self.rows_read += rows
+                for batch, end_offset in batches:
+                    self.batch_end_offset = end_offset if self.ordered else None
+                    yield batch
+            self.bytes_read = self.total_bytes
+        finally:
+            ranges.close()
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    @property
+    def progress(self):
+        """읽기 진행률 (0.0 ~ 1.0)"""
+        if self.total_bytes == 0:
+            return 1.0
+        return min(self.bytes_read / self.total_bytes, 1.0)
+
+
+def open_cdr_reader(csv_file, options):
+    """옵션에 맞는 CSV 리더 생성 (parse_workers가 1이면 단일 프로세스)
+
+    압축 파일은 임의 위치 접근이 안 되므로 항상 스트리밍 리더를 사용한다.
+    """
+    workers = options['parse_workers']
+    if is_compressed_file(csv_file):
+        return CDRCsvStream(csv_file)
+    if workers == 1:
+        return CDRCsvStream(csv_file)
+    return ParallelCsvReader(
+        csv_file,
+        workers,
+        options['parse_chunk_mb'] * 1024 * 1024,
+        ordered=options['parse_ordered'],
+    )
+
+
+# 미통화 리스트 조회 시간대 (당일 09:30 ~ 18:00 수신 건)
+MISSED_CALL_START = timedelta(hours=9, minutes=30)
+MISSED_CALL_END = timedelta(hours=18)
+
+
+def build_missed_call_query(table_name, day, legacy=False, with_names=True, member_key=None):
+    """미통화 리스트 조회 SQL과 매개변수 반환
+
+    legacy: 기존 SQL (성공 번호 UNION ALL 4회 + NOT IN, CONVERT로 시간대 비교)
+    기본: 성공 번호 집합을 한 번만 만들어 NOT EXISTS로 제외하고, 시간대는 RecDT 범위로 비교해
+    인덱스를 사용할 수 있게 한다. NOT IN과 달리 성공 건에 빈 번호(NULL)가 있어도 결과가 비지 않는다.
+    day: 레코드가 모두 그 날짜일 때만 지정 (None이면 기존 SQL처럼 날짜와 관계없이 시각만 비교)
+    with_names=False: 회원/담당자를 조인하지 않고 (발신번호, 통화시도횟수, 통화결과)만 반환 (개선 SQL만 해당)
+    member_key: 지정하면 dbo.CDR_MemberMobile을 거쳐 회원 키로 조인 (REPLACE 없이 인덱스 탐색)
+    """
+    if legacy:
+        return f"""
+                SELECT DISTINCT c1.SendNum AS 발신번호, c2.CntNum AS 통화시도횟수, 
+                       ISNULL(s1.SaName,'') AS 담당자, ISNULL(m1.Name,'') AS 성명, 
+                       Result AS 통화결과 
+                FROM {table_name} c1 WITH(NOLOCK)
+                LEFT JOIN dbo.Member m1 WITH(NOLOCK) ON c1.SendNum = REPLACE(m1.Mobile,'-','')
+                LEFT JOIN dbo.Staff s1 WITH(NOLOCK) ON m1.Charge_IDP = s1.SaBun
+                LEFT JOIN (SELECT SendNum, COUNT(SendNum) AS CntNum FROM {table_name} WITH(NOLOCK) GROUP BY SendNum) c2 
+                    ON c1.SendNum = c2.SendNum
+                WHERE LEN(c1.SendNum) > 10 AND c1.SendNum NOT IN
+                (
+                    SELECT SendNum FROM {table_name} WHERE Result = 'Success'
+                    UNION ALL
+                    SELECT SendNum FROM {table_name} WHERE Result = 'Success'
+                    UNION ALL
+                    SELECT RecvNum FROM {table_name} WHERE Result = 'Success'
+                    UNION ALL
+                    SELECT RecvNum FROM {table_name} WHERE Result = 'Success'
+                )
+                AND CONVERT(CHAR(8),c1.RecDT,8) >= '09:30:00' AND CONVERT(CHAR(8),c1.RecDT,8) < '18:00:00'
+                ORDER BY 통화시도횟수 DESC
+                """, ()
+    
+    if day is None:
+        time_filter = "CAST(c1.RecDT AS time) >= ? AND CAST(c1.RecDT AS time) < ?"
+        time_params = ((datetime.min + MISSED_CALL_START).time(), (datetime.min + MISSED_CALL_END).time())
+    else:
+        day = datetime(day.year, day.month, day.day)
+        time_filter = "c1.RecDT >= ? AND c1.RecDT < ?"
+        time_params = (day + MISSED_CALL_START, day + MISSED_CALL_END)
+    if with_names:
+        select_sql = f"""
+                SELECT DISTINCT m.SendNum AS 발신번호, a.CntNum AS 통화시도횟수, 
+                       ISNULL(s1.SaName,'') AS 담당자, ISNULL(m1.Name,'') AS 성명, 
+                       m.Result AS 통화결과 
+                FROM Missed m
+                JOIN Attempts a ON a.SendNum = m.SendNum
+                {member_join_sql('m.SendNum', member_key)}
+                LEFT JOIN dbo.Staff s1 WITH(NOLOCK) ON m1.Charge_IDP = s1.SaBun
+                ORDER BY 통화시도횟수 DESC"""
+    else:
+        select_sql = """
+                SELECT m.SendNum AS 발신번호, a.CntNum AS 통화시도횟수, m.Result AS 통화결과
+                FROM Missed m
+                JOIN Attempts a ON a.SendNum = m.SendNum"""
+    return f"""
+                WITH Success AS (
+                    SELECT SendNum AS Num FROM {table_name} WITH(NOLOCK) WHERE Result = 'Success'
+                    UNION
+                    SELECT RecvNum FROM {table_name} WITH(NOLOCK) WHERE Result = 'Success'
+                ),
+                Missed AS (
+                    SELECT DISTINCT c1.SendNum, c1.Result
+                    FROM {table_name} c1 WITH(NOLOCK)
+                    WHERE {time_filter}
+                      AND LEN(c1.SendNum) > 10
+                      AND NOT EXISTS (SELECT 1 FROM Success s WHERE s.Num = c1.SendNum)
+                ),
+                Attempts AS (
+                    SELECT c2.SendNum, COUNT(c2.SendNum) AS CntNum
+                    FROM {table_name} c2 WITH(NOLOCK)
+                    WHERE c2.SendNum IN (SELECT SendNum FROM Missed)
+                    GROUP BY c2.SendNum
+                ){select_sql}
+                """, time_params
+
+
+def member_join_sql(number_expr, member_key=None, join='LEFT JOIN'):
+    """번호 컬럼과 dbo.Member(m1) 조인 구문 (member_key가 있으면 CDR_MemberMobile을 거쳐 조인)"""
+    if member_key:
+        # 번호 테이블에만 남은 회원(삭제됨)은 조인되지 않도록 두 테이블을 먼저 묶음
+        return (f"{join} (dbo.CDR_MemberMobile mm JOIN dbo.Member m1 WITH(NOLOCK) ON m1.[{member_key}] = mm.MemberKey)\n"
+                f"                    ON mm.MobileNorm = {number_expr}")
+    return f"{join} dbo.Member m1 WITH(NOLOCK) ON REPLACE(m1.Mobile,'-','') = {number_expr}"
+
+
+def sql_type_name(type_name, max_length, precision, scale):
+    """sys.types/sys.columns 값으로 CREATE TABLE에 쓸 형식 문자열 생성"""
+    if type_name in ('varchar', 'char', 'varbinary', 'binary'):
+        return f"{type_name}({'max' if max_length == -1 else max_length})"
+    if type_name in ('nvarchar', 'nchar'):
+        return f"{type_name}({'max' if max_length == -1 else max_length // 2})"
+    if type_name in ('decimal', 'numeric'):
+        return f"{type_name}({precision},{scale})"
+    if type_name in ('datetime2', 'datetimeoffset', 'time'):
+        return f"{type_name}({scale})"
+    return type_name
+
+
+class MemberMobileTable:
+    """dbo.CDR_MemberMobile: 하이픈을 뺀 휴대폰 번호 → 회원 키 (번호 기준 클러스터형 기본 키)
+
+    REPLACE(Mobile,'-','') 조인은 인덱스를 쓸 수 없어 Member 전체를 읽으므로, 정규화한 번호를
+    따로 저장해 두고 조회 SQL이 이 테이블을 탐색(seek)한 뒤 회원 키로 Member를 찾게 한다.
+    setup()으로 한 번 만들고, 실행할 때마다 refresh()를 부른다. 수정 일시 컬럼이 있으면 바뀐 회원만
+    반영하고, 없으면 Member 전체를 읽어야 하므로 member_mobile_full_sync_hours 주기로만 전체 동기화한다.
+    """
+    TABLE_NAME = 'dbo.CDR_MemberMobile'
+    SYNC_TABLE_NAME = 'dbo.CDR_MemberMobileSync'
+    
+    def __init__(self, conn, options):
+        self.conn = conn
+        self.options = options
+        self.member_key = options['member_key_column']
+        self.modified_column = options['member_modified_column']
+    
+    def _source_sql(self, where=''):
+        return f"""
+            SELECT DISTINCT CAST(REPLACE(m.Mobile,'-','') AS nvarchar(50)) AS MobileNorm, m.[{self.member_key}] AS MemberKey
+            FROM dbo.Member m WITH(NOLOCK)
+            WHERE m.Mobile IS NOT NULL AND m.[{self.member_key}] IS NOT NULL {where}
+        """
+    
+    def exists(self):
+        cursor = self.conn.cursor()
+        try:
+            row = cursor.execute(
+                f"SELECT OBJECT_ID(N'{self.TABLE_NAME}', N'U'), OBJECT_ID(N'{self.SYNC_TABLE_NAME}', N'U')"
+            ).fetchone()
+            return row[0] is not None and row[1] is not None
+        finally:
+            cursor.close()
+    
+    def member_key_type(self, cursor):
+        """dbo.Member 회원 키 컬럼의 형식 (IDENTITY·NULL 허용 여부는 가져오지 않음)"""
+        row = cursor.execute("""
+            SELECT t.name, c.max_length, c.precision, c.scale
+            FROM sys.columns c
+            JOIN sys.types t ON t.user_type_id = c.system_type_id
+            WHERE c.object_id = OBJECT_ID(N'dbo.Member') AND c.name = ?
+        """, self.member_key).fetchone()
+        if row is None:
+            raise Exception(f"dbo.Member에 회원 키 컬럼이 없습니다: {self.member_key} (member_key_column 확인)")
+        return sql_type_name(*row)
+    
+    def setup(self):
+        """테이블/인덱스 생성 (회원 키 형식은 dbo.Member에서 조회) 후 전체 동기화"""
+        cursor = self.conn.cursor()
+        try:
+            key_type = self.member_key_type(cursor)
+            cursor.execute(f"""
+                IF OBJECT_ID(N'{self.TABLE_NAME}', N'U') IS NULL
+                    CREATE TABLE {self.TABLE_NAME} (
+                        MobileNorm nvarchar(50) NOT NULL,
+                        MemberKey {key_type} NOT NULL
+                    )
+            """)
+            cursor.execute(f"""
+                IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'{self.TABLE_NAME}') AND name = N'PK_CDR_MemberMobile')
+                    ALTER TABLE {self.TABLE_NAME} ADD CONSTRAINT PK_CDR_MemberMobile PRIMARY KEY CLUSTERED (MobileNorm, MemberKey)
+            """)
+            cursor.execute(f"""
+                IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'{self.TABLE_NAME}') AND name = N'IX_CDR_MemberMobile_MemberKey')
+                    CREATE INDEX IX_CDR_MemberMobile_MemberKey ON {self.TABLE_NAME} (MemberKey)
+            """)
+            cursor.execute(f"""
+                IF OBJECT_ID(N'{self.SYNC_TABLE_NAME}', N'U') IS NULL
+                BEGIN
+                    CREATE TABLE {self.SYNC_TABLE_NAME} (LastModified datetime2(7) NULL, FullSyncAt datetime2(7) NULL);
+                    INSERT INTO {self.SYNC_TABLE_NAME} VALUES (NULL, NULL);
+                END
+            """)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        return self.refresh(force_full=True)
+    
+    def refresh(self, force_full=False):
+        """전체 동기화 주기가 지났으면 MERGE로 전체 비교, 아니면 변경된 회원만 반영
+
+        수정 일시 컬럼이 없으면 변경분을 알 수 없으므로 주기가 지나기 전에는 아무것도 하지 않는다.
+        반환값: 갱신 방식과 반영한 행 수 문자열
+        """
+        cursor = self.conn.cursor()
+        try:
+            last_modified, full_sync_at = cursor.execute(
+                f"SELECT TOP 1 LastModified, FullSyncAt FROM {self.SYNC_TABLE_NAME}"
+            ).fetchone()
+            full_sync_due = (
+                full_sync_at is None
+                or datetime.now() - full_sync_at >= timedelta(hours=self.options['member_mobile_full_sync_hours'])
+            )
+            max_modified_sql = (
+                f"(SELECT MAX([{self.modified_column}]) FROM dbo.Member WITH(NOLOCK))" if self.modified_column else "NULL"
+            )
+            
+            if not force_full and not full_sync_due and not self.modified_column:
+                # 수정 일시 컬럼이 없으면 매번 Member 전체를 읽지 않고 다음 전체 동기화까지 그대로 사용
+                next_sync = full_sync_at + timedelta(hours=self.options['member_mobile_full_sync_hours'])
+                return f"건너뜀 (수정 일시 컬럼 없음, 다음 전체 동기화 {next_sync:%Y-%m-%d %H:%M})"
+            if force_full or full_sync_due or not self.modified_column or last_modified is None:
+                cursor.execute(f"""
+                    MERGE {self.TABLE_NAME} AS t
+                    USING ({self._source_sql()}) AS s
+                    ON t.MobileNorm = s.MobileNorm AND t.MemberKey = s.MemberKey
+                    WHEN NOT MATCHED BY TARGET THEN INSERT (MobileNorm, MemberKey) VALUES (s.MobileNorm, s.MemberKey)
+                    WHEN NOT MATCHED BY SOURCE THEN DELETE;
+                """)
+                changed = cursor.rowcount
+                cursor.execute(
+                    f"UPDATE {self.SYNC_TABLE_NAME} SET LastModified = {max_modified_sql}, FullSyncAt = SYSDATETIME()"
+                )
+                mode = "전체"
+            else:
+                cursor.execute(f"""
+                    DELETE mm FROM {self.TABLE_NAME} mm
+                    JOIN dbo.Member m WITH(NOLOCK) ON m.[{self.member_key}] = mm.MemberKey
+                    WHERE m.[{self.modified_column}] > ?
+                """, last_modified)
+                changed = max(cursor.rowcount, 0)
+                cursor.execute(f"""
+                    INSERT INTO {self.TABLE_NAME} (MobileNorm, MemberKey)
+                    {self._source_sql(f"AND m.[{self.modified_column}] > ?")}
+                """, last_modified)
+                changed += max(cursor.rowcount, 0)
+                cursor.execute(f"UPDATE {self.SYNC_TABLE_NAME} SET LastModified = ISNULL({max_modified_sql}, LastModified)")
+                mode = "변경분"
+            self.conn.commit()
+            return f"{mode} {max(changed, 0):,}건 반영"
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+def setup_member_mobile_table():
+    """CDR_MemberMobile 생성/이관 명령 (python -m cdr setup-member-mobile)"""
+    options = load_process_options()
+    conn = pyodbc.connect(build_connection_string(load_db_config()))
+    try:
+        table = MemberMobileTable(conn, options)
+        print(f"{MemberMobileTable.TABLE_NAME} 생성 및 동기화 중...")
+        print(f"완료: {table.setup()}")
+    finally:
+        conn.close()
+    return 0
+
+
+def create_report_indexes(conn, table_name):
+    """미통화 리스트 조회용 임시 테이블 인덱스 생성 후 소요 시간(초) 반환"""
+    name = table_name.strip('[]')
+    start = time.perf_counter()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"CREATE INDEX [IX_{name}_SendNum] ON {table_name} (SendNum) INCLUDE (RecDT, Result)")
+        cursor.execute(f"CREATE INDEX [IX_{name}_Result] ON {table_name} (Result, SendNum, RecvNum)")
+        conn.commit()
+    finally:
+        cursor.close()
+    return time.perf_counter() - start
+
+
+class MissedCallCollector:
+    """CSV를 읽는 동안 미통화 리스트를 집계 (서버 조회 SQL과 같은 조건)
+
+    - 성공 번호: Result가 Success인 건의 SendNum, RecvNum
+    - 통화 시도 횟수: SendNum별 전체 건수
+    - 후보: 09:30 ~ 18:00 수신(날짜와 관계없이 시각만 비교), 11자리 이상 SendNum의 (번호, 통화결과)
+    DB에는 최종 미통화 번호의 이름(회원/담당자)만 조회한다.
+    """
+    COLUMNS = ('발신번호', '통화시도횟수', '담당자', '성명', '통화결과')
+    
+    def __init__(self):
+        self.window_start = (datetime.min + MISSED_CALL_START).time()
+        self.window_end = (datetime.min + MISSED_CALL_END).time()
+        self.success = set()
+        self.attempts = {}
+        self.candidates = set()
+        self.rows = 0
+        self.elapsed = 0.0
+    
+    def feed(self, batch):
+        """전처리된 배치 하나 반영"""
+        start = time.perf_counter()
+        success = self.success
+        attempts = self.attempts
+        candidates = self.candidates
+        window_start = self.window_start
+        window_end = self.window_end
+        for rec_dt, send_num, recv_num, _, _, _, _, result in batch:
+            if send_num is not None:
+                attempts[send_num] = attempts.get(send_num, 0) + 1
+            if result is not None and result.rstrip().lower() == 'success':
+                success.add(send_num)
+                success.add(recv_num)
+            elif (send_num is not None and len(send_num.rstrip()) > 10
+                  and rec_dt is not None and window_start <= rec_dt.time() < window_end):
+                candidates.add((send_num, result))
+        self.rows += len(batch)
+        self.elapsed += time.perf_counter() - start
+    
+    def wrap(self, batches, on_complete=None):
+        """배치를 그대로 넘겨주면서 집계 (on_complete: 마지막 배치까지 집계한 뒤 호출)"""
+        for batch in batches:
+            self.feed(batch)
+            yield batch
+        if on_complete:
+            on_complete(self)
+    
+    def missed(self):
+        """성공 번호를 뺀 (번호, 통화결과) 목록"""
+        return [(number, result) for number, result in self.candidates if number not in self.success]
+    
+    def report_rows(self, names):
+        """미통화 리스트 행 생성 (names: 번호 → [(성명, 담당자), ...]), 통화 시도 횟수 내림차순"""
+        return expand_contact_names(
+            [(number, self.attempts[number], result) for number, result in self.missed()], names
+        )
+
+
+def expand_contact_names(missed_rows, names):
+    """(번호, 통화 시도 횟수, 통화결과) 목록에 성명/담당자를 붙여 미통화 리스트 행으로 변환
+
+    번호에 회원이 여러 명이면 회원마다 한 행씩 (SQL의 LEFT JOIN + DISTINCT와 같음).
+    """
+    rows = set()
+    for number, count, result in missed_rows:
+        for name, staff in names.get(number) or [('', '')]:
+            rows.add((number, count, staff, name, result))
+    return sorted(rows, key=lambda row: (-row[1], row[0], row[4] or '', row[3], row[2]))
+
+
+def lookup_contact_names(conn, numbers, member_key=None):
+    """번호 목록의 회원 성명과 담당자 이름 조회. 반환값: 번호 → [(성명, 담당자), ...]
+
+    member_key: 지정하면 dbo.CDR_MemberMobile을 거쳐 조인
+    """
+    names = {}
+    if not numbers:
+        return names
+    cursor = conn.cursor()
+    try:
+        cursor.execute("CREATE TABLE #MissedNum (Num nvarchar(50) NOT NULL PRIMARY KEY)")
+        cursor.fast_executemany = True
+        cursor.executemany("INSERT INTO #MissedNum (Num) VALUES (?)", [(number,) for number in numbers])
+        cursor.execute(f"""
+            SELECT DISTINCT n.Num, ISNULL(m1.Name,''), ISNULL(s1.SaName,'')
+            FROM #MissedNum n
+            {member_join_sql('n.Num', member_key, join='JOIN')}
+            LEFT JOIN dbo.Staff s1 WITH(NOLOCK) ON m1.Charge_IDP = s1.SaBun
+        """)
+        for number, name, staff in cursor.fetchall():
+            names.setdefault(number, []).append((name, staff))
+        cursor.execute("DROP TABLE #MissedNum")
+        conn.commit()
+    finally:
+        cursor.close()
+    return names
+
+
+# 회원/담당자 이름 로컬 캐시 DB
+CONTACT_CACHE_PATH = os.path.join("./DB", "CDR_Contacts.db")
+
+
+class ContactCache:
+    """회원 휴대폰 번호(하이픈 제거) → 회원 성명/담당자 이름 로컬 캐시 (SQLite)
+
+    처음이거나 contact_cache_ttl_hours가 지나면 dbo.Member/dbo.Staff 전체를 다시 받고,
+    그 사이에는 수정 일시 컬럼(member_modified_column / staff_modified_column)이 지정된
+    테이블만 마지막으로 받은 시각 이후 변경분을 받는다. 삭제는 전체 갱신 때 반영된다.
+    """
+    FETCH_SIZE = 5000
+    
+    def __init__(self, options, db_path=CONTACT_CACHE_PATH):
+        self.options = options
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS MEMBER_CACHE (
+                MemberKey TEXT PRIMARY KEY,
+                MobileNorm TEXT,
+                Name TEXT,
+                ChargeIDP TEXT
+            );
+            CREATE INDEX IF NOT EXISTS IX_MEMBER_CACHE_MobileNorm ON MEMBER_CACHE (MobileNorm);
+            CREATE TABLE IF NOT EXISTS STAFF_CACHE (
+                SaBun TEXT PRIMARY KEY,
+                SaName TEXT
+            );
+            CREATE TABLE IF NOT EXISTS CACHE_META (
+                Name TEXT PRIMARY KEY,
+                FullRefreshAt TEXT,
+                LastModified TEXT
+            );
+        """)
+        self.conn.commit()
+    
+    @staticmethod
+    def _text(value):
+        return None if value is None else str(value)
+    
+    def _meta(self, name):
+        row = self.conn.execute("SELECT FullRefreshAt, LastModified FROM CACHE_META WHERE Name = ?", (name,)).fetchone()
+        return row or (None, None)
+    
+    def _source_tables(self):
+        """(캐시 이름, 원본 SELECT 컬럼, 원본 테이블, 수정 일시 컬럼, 캐시 테이블, 캐시 컬럼 수)"""
+        key = self.options['member_key_column']
+        return (
+            ('Member', f"[{key}], REPLACE(Mobile,'-',''), Name, Charge_IDP", 'dbo.Member',
+             self.options['member_modified_column'], 'MEMBER_CACHE', 4),
+            ('Staff', "SaBun, SaName", 'dbo.Staff',
+             self.options['staff_modified_column'], 'STAFF_CACHE', 2),
+        )
+    
+    def refresh(self, server_conn):
+        """만료되었으면 전체, 아니면 변경분 갱신. 반환값: 이름별 받은 행 수와 갱신 방식 문자열"""
+        ttl = timedelta(hours=self.options['contact_cache_ttl_hours'])
+        now = datetime.now()
+        parts = []
+        for name, columns, source, modified_column, cache_table, width in self._source_tables():
+            full_refresh_at, last_modified = self._meta(name)
+            full = full_refresh_at is None or now - datetime.fromisoformat(full_refresh_at) >= ttl
+            if not full and not modified_column:
+                parts.append(f"{name} 유지")
+                continue
+            
+            select_sql = f"SELECT {columns}"
+            if modified_column:
+                select_sql += f", [{modified_column}]"
+            select_sql += f" FROM {source} WITH(NOLOCK)"
+            params = ()
+            if not full and last_modified:
+                select_sql += f" WHERE [{modified_column}] > ?"
+                params = (datetime.fromisoformat(last_modified),)
+            
+            cursor = server_conn.cursor()
+            count = 0
+            max_modified = datetime.fromisoformat(last_modified) if last_modified and not full else None
+            try:
+                cursor.execute(select_sql, *params)
+                if full:
+                    self.conn.execute(f"DELETE FROM {cache_table}")
+                placeholders = ', '.join('?' * width)
+                while True:
+                    rows = cursor.fetchmany(self.FETCH_SIZE)
+                    if not rows:
+                        break
+                    self.conn.executemany(
+                        f"INSERT OR REPLACE INTO {cache_table} VALUES ({placeholders})",
+                        [tuple(self._text(value) for value in row[:width]) for row in rows]
+                    )
+                    if modified_column:
+                        for row in rows:
+                            if row[width] is not None and (max_modified is None or row[width] > max_modified):
+                                max_modified = row[width]
+                    count += len(rows)
+            except Exception:
+                self.conn.rollback()
+                raise
+            finally:
+                cursor.close()
+            
+            self.conn.execute(
+                "INSERT OR REPLACE INTO CACHE_META VALUES (?, ?, ?)",
+                (name, now.isoformat(timespec='seconds') if full else full_refresh_at,
+                 max_modified.isoformat() if max_modified else None)
+            )
+            self.conn.commit()
+            parts.append(f"{name} {'전체' if full else '변경분'} {count:,}건")
+        return ", ".join(parts)
+    
+    def lookup(self, numbers):
+        """번호 목록의 회원 성명과 담당자 이름. 반환값: 번호 → [(성명, 담당자), ...]"""
+        names = {}
+        numbers = list(numbers)
+        # SQLite 매개변수 개수 제한에 맞춰 나눠서 조회
+        for start in range(0, len(numbers), 500):
+            chunk = numbers[start:start + 500]
+            rows = self.conn.execute(f"""
+                SELECT DISTINCT m.MobileNorm, IFNULL(m.Name, ''), IFNULL(s.SaName, '')
+                FROM MEMBER_CACHE m
+                LEFT JOIN STAFF_CACHE s ON s.SaBun = m.ChargeIDP
+                WHERE m.MobileNorm IN ({', '.join('?' * len(chunk))})
+            """, chunk).fetchall()
+            for number, name, staff in rows:
+                names.setdefault(number, []).append((name, staff))
+        return names
+    
+    def close(self):
+        self.conn.close()
+
+
+# 미통화 리스트 엑셀 시트 이름과 스타일 (모든 셀이 같은 스타일 객체를 공유)
+EXCEL_SHEET_TITLE = "미통화리스트"
+EXCEL_HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+EXCEL_HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+EXCEL_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+EXCEL_ALIGNMENT = Alignment(horizontal='center', vertical='center')
+EXCEL_MAX_ROWS = 1048576            # 엑셀 시트 최대 행 수 (헤더 포함)
+EXCEL_SHEET_TITLE_MAX = 31          # 엑셀 시트 이름 최대 길이
+
+
+class ColumnWidthTracker:
+    """행을 쓰는 동안 열별 최대 str() 길이 기록 (헤더 포함, 너비는 길이 + 2, 최대 50 - 기존 자동 조정과 같음)"""
+    
+    def __init__(self, columns):
+        self.lengths = [len(str(column)) for column in columns]
+    
+    def update(self, row):
+        lengths = self.lengths
+        for idx, value in enumerate(row):
+            length = len(str(value))
+            if length > lengths[idx]:
+                lengths[idx] = length
+    
+    def widths(self):
+        return [min(length + 2, 50) for length in self.lengths]
+
+
+def excel_column_widths(columns, rows):
+    """행 전체로 열 너비 계산 (쓰기 전에 너비가 필요한 경우)"""
+    tracker = ColumnWidthTracker(columns)
+    for row in rows:
+        tracker.update(row)
+    return tracker.widths()
+
+
+def excel_sheet_title(title, number=1):
+    """엑셀에서 쓸 수 없는 문자를 바꾸고 31자에 맞춘 시트 이름 (number > 1이면 ' (2)' 같은 번호를 붙임)"""
+    title = re.sub(r"[\[\]:*?/\\]", "_", str(title)).strip("'") or "_"
+    suffix = f" ({number})" if number > 1 else ""
+    return title[:EXCEL_SHEET_TITLE_MAX - len(suffix)] + suffix
+
+
+class ReportWriter(ABC):
+    """리포트 파일 작성기 (추상 기본 클래스)
+
+    사용 순서: writer = 하위 클래스(path, columns) → write_rows(rows) (여러 번 가능) → close()
+    열 너비는 행을 쓰면서 ColumnWidthTracker로 기록한다.
+    시트가 있는 형식(max_sheet_rows 지정)은 시트가 가득 차면 '이름 (2)' 시트로 넘어가고,
+    new_sheet()로 이름이 다른 시트를 시작할 수 있다.
+    """
+    name = None                 # REPORT_WRITERS 키 (하위 클래스에서 지정)
+    extension = '.xlsx'
+    max_sheet_rows = None       # 시트당 데이터 행 수 (None이면 시트 없음)
+    
+    def __init__(self, path, columns, sheet_title=EXCEL_SHEET_TITLE):
+        self.path = path
+        self.columns = list(columns)
+        self.tracker = ColumnWidthTracker(self.columns)
+        self.rows = 0
+        self.elapsed = 0.0
+        self.sheet_title = sheet_title
+        self.sheet_titles = []      # 만든 시트 이름
+        self.sheet_number = 0       # 현재 이름으로 만든 시트 수
+        self.sheet_rows = 0         # 현재 시트의 데이터 행 수
+    
+    def new_sheet(self, title):
+        """다음 행부터 새 이름의 시트에 기록"""
+        self.sheet_title = title
+        self.sheet_number = 0
+    
+    def write_rows(self, rows):
+        start = time.perf_counter()
+        if self.max_sheet_rows is None:
+            self._write_rows(rows)
+        else:
+            rows = rows if isinstance(rows, list) else list(rows)
+            pos = 0
+            while pos < len(rows) or not self.sheet_number:
+                if not self.sheet_number or self.sheet_rows >= self.max_sheet_rows:
+                    self._next_sheet(rows[pos:pos + self.max_sheet_rows])
+                chunk = rows[pos:pos + self.max_sheet_rows - self.sheet_rows]
+                self._write_rows(chunk)
+                self.sheet_rows += len(chunk)
+                pos += len(chunk)
+        self.elapsed += time.perf_counter() - start
+    
+    def close(self):
+        start = time.perf_counter()
+        if self.max_sheet_rows is not None and not self.sheet_titles:
+            self._next_sheet([])
+        self._close()
+        self.elapsed += time.perf_counter() - start
+    
+    def _next_sheet(self, rows):
+        """현재 이름의 다음 시트 시작 (rows: 이 시트에 처음 쓸 행)"""
+        if self.sheet_titles:
+            self._finish_sheet()
+        self.sheet_number += 1
+        title = excel_sheet_title(self.sheet_title, self.sheet_number)
+        # 잘린 이름이 겹치면 번호를 더 붙여 구분
+        while title.lower() in (used.lower() for used in self.sheet_titles):
+            self.sheet_number += 1
+            title = excel_sheet_title(self.sheet_title, self.sheet_number)
+        self.sheet_titles.append(title)
+        self.sheet_rows = 0
+        self.tracker = ColumnWidthTracker(self.columns)
+        self._start_sheet(title, rows)
+    
+    @abstractmethod
+    def _start_sheet(self, title, rows):
+        """새 시트 시작 (rows: 이 시트에 처음 쓸 행)"""
+    
+    def _finish_sheet(self):
+        pass
+    
+    @abstractmethod
+    def _write_rows(self, rows):
+        """현재 시트(또는 파일)에 행 기록"""
+    
+    def _close(self):
+        pass
+    
+    def summary(self):
+        sheets = f", 시트 {len(self.sheet_titles)}개" if len(self.sheet_titles) > 1 else ""
+        return f"{self.name}, {self.rows}건{sheets}, {self.elapsed:.2f}초"
+
+
+def excel_cell_style(cell, header=False):
+    """미통화 리스트 셀 스타일 적용 후 스타일 배열 반환 (셀마다 스타일을 다시 찾지 않고 복사해 쓰기 위함)"""
+    cell.border = EXCEL_BORDER
+    cell.alignment = EXCEL_ALIGNMENT
+    if header:
+        cell.fill = EXCEL_HEADER_FILL
+        cell.font = EXCEL_HEADER_FONT
+    return cell._style
+
+
+class OpenpyxlReportWriter(ReportWriter):
+    """openpyxl 쓰기 전용 워크시트 (행을 바로 파일에 흘려 써서 메모리가 행 수에 따라 늘지 않음)
+
+    열마다 셀 하나와 스타일 배열 하나를 만들어 모든 행에 다시 쓴다. 그래도 openpyxl이 셀마다
+    스타일 셀을 변환하는 비용이 있어 lxml이 없으면 일반 워크북보다 느리다 (benchmark_cdr.py report).
+
+    쓰기 전용 시트는 첫 행을 쓰기 전에 열 너비를 정해야 하므로 시트를 시작하는 write_rows 호출의
+    행으로만 너비를 정한다. 같은 시트에 나중에 쓴 행은 너비에 반영되지 않으며 summary()에 표시한다.
+    """
+    name = 'openpyxl'
+    max_sheet_rows = EXCEL_MAX_ROWS - 1
+    
+    def __init__(self, path, columns, sheet_title=EXCEL_SHEET_TITLE):
+        super().__init__(path, columns, sheet_title)
+        self.wb = openpyxl.Workbook(write_only=True)
+        self.ws = None
+        self.header_style = None
+        self.cell_style = None
+        self.row_cells = None
+        self.sized_rows = 0         # 현재 시트 열 너비를 계산한 행 수
+        self.unsized_rows = 0       # 열 너비 계산에 들어가지 않은 행 수
+    
+    def _cell(self, value, style):
+        cell = WriteOnlyCell(self.ws, value=value)
+        # 쓰기 전용 셀은 스타일을 바꾸지 않으므로 스타일 배열을 복사하지 않고 공유
+        cell._style = style
+        return cell
+    
+    def _start_sheet(self, title, rows):
+        self.ws = self.wb.create_sheet(title)
+        if self.cell_style is None:
+            self.header_style = excel_cell_style(WriteOnlyCell(self.ws), header=True)
+            self.cell_style = excel_cell_style(WriteOnlyCell(self.ws))
+        for row_data in rows:
+            self.tracker.update(row_data)
+        for idx, width in enumerate(self.tracker.widths(), 1):
+            self.ws.column_dimensions[get_column_letter(idx)].width = width
+        self.sized_rows = len(rows)
+        self.ws.append([self._cell(column_name, self.header_style) for column_name in self.columns])
+        # append가 행을 바로 파일에 쓰므로 열마다 셀 하나를 만들어 두고 값만 바꿔 다시 씀
+        self.row_cells = [self._cell(None, self.cell_style) for _ in self.columns]
+    
+    def _write_rows(self, rows):
+        append = self.ws.append
+        cells = self.row_cells
+        for row_data in rows:
+            for cell, value in zip(cells, row_data):
+                cell.value = value
+            append(cells)
+            self.rows += 1
+        # 시트를 시작할 때 너비를 계산한 행보다 많이 쓰면 나머지는 너비에 반영되지 않음
+        written = self.sheet_rows + len(rows)
+        if written > self.sized_rows:
+            self.unsized_rows += written - max(self.sheet_rows, self.sized_rows)
+    
+    def _close(self):
+        self.wb.save(self.path)
+    
+    def summary(self):
+        summary = super().summary()
+        if self.unsized_rows:
+            summary += f", 열 너비에 반영되지 않은 행 {self.unsized_rows}건 (쓰기 전용 시트는 시트 첫 기록 행으로 너비 결정)"
+        return summary
+
+
+class OpenpyxlNormalReportWriter(ReportWriter):
+    """openpyxl 일반 워크북 (기존 방식, 셀 단위로 작성하고 시트를 마칠 때 열 너비 적용)"""
+    name = 'openpyxl_normal'
+    max_sheet_rows = EXCEL_MAX_ROWS - 1
+    
+    def __init__(self, path, columns, sheet_title=EXCEL_SHEET_TITLE):
+        super().__init__(path, columns, sheet_title)
+        self.wb = openpyxl.Workbook()
+        self.ws = None
+        self.cell_style = excel_cell_style(Cell(self.wb.active))
+    
+    def _start_sheet(self, title, rows):
+        if self.ws is None:
+            self.ws = self.wb.active
+            self.ws.title = title
+        else:
+            self.ws = self.wb.create_sheet(title)
+        
+        # 헤더 작성
+        for col_idx, column_name in enumerate(self.columns, 1):
+            excel_cell_style(self.ws.cell(row=1, column=col_idx, value=column_name), header=True)
+    
+    def _write_rows(self, rows):
+        ws = self.ws
+        style = self.cell_style
+        row_idx = self.sheet_rows + 1
+        for row_data in rows:
+            self.tracker.update(row_data)
+            self.rows += 1
+            row_idx += 1
+            for col_idx, value in enumerate(row_data, 1):
+                ws.cell(row=row_idx, column=col_idx, value=value)._style = copy(style)
+    
+    def _finish_sheet(self):
+        for idx, width in enumerate(self.tracker.widths(), 1):
+            self.ws.column_dimensions[get_column_letter(idx)].width = width
+    
+    def _close(self):
+        self._finish_sheet()
+        self.wb.save(self.path)
+
+
+class XlsxWriterReportWriter(ReportWriter):
+    """xlsxwriter constant_memory 모드 (행을 임시 파일로 흘려 쓰고, 열 너비는 시트를 마칠 때 적용)"""
+    name = 'xlsxwriter'
+    max_sheet_rows = EXCEL_MAX_ROWS - 1
+    
+    def __init__(self, path, columns, sheet_title=EXCEL_SHEET_TITLE):
+        super().__init__(path, columns, sheet_title)
+        if xlsxwriter is None:
+            raise Exception("xlsxwriter 리포트를 쓰려면 xlsxwriter 패키지가 필요합니다. (pip install xlsxwriter)")
+        self.wb = xlsxwriter.Workbook(path, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd hh:mm:ss'})
+        self.ws = None
+        border = {'border': 1, 'align': 'center', 'valign': 'vcenter'}
+        self.cell_format = self.wb.add_format(border)
+        self.header_format = self.wb.add_format(dict(
+            border, bold=True, font_color='#FFFFFF', font_size=11, bg_color='#366092', pattern=1
+        ))
+    
+    def _start_sheet(self, title, rows):
+        self.ws = self.wb.add_worksheet(title)
+        self.ws.write_row(0, 0, self.columns, self.header_format)
+    
+    def _write_rows(self, rows):
+        ws = self.ws
+        cell_format = self.cell_format
+        row_idx = self.sheet_rows
+        for row_data in rows:
+            self.tracker.update(row_data)
+            self.rows += 1
+            row_idx += 1
+            ws.write_row(row_idx, 0, row_data, cell_format)
+    
+    def _finish_sheet(self):
+        for idx, width in enumerate(self.tracker.widths()):
+            self.ws.set_column(idx, idx, width)
+    
+    def _close(self):
+        self._finish_sheet()
+        self.wb.close()
+
+
+class FlatReportWriter(ReportWriter):
+    """시트가 없는 형식의 작성기 (max_sheet_rows가 None이므로 시트를 시작하지 않음)"""
+    
+    def _start_sheet(self, title, rows):
+        raise Exception(f"{self.name} 형식은 시트를 만들 수 없습니다")
+
+
+class CsvReportWriter(FlatReportWriter):
+    """CSV (UTF-8 BOM - 엑셀에서 바로 열 수 있음, 서식과 열 너비 없음)"""
+    name = 'csv'
+    extension = '.csv'
+    
+    def __init__(self, path, columns, sheet_title=EXCEL_SHEET_TITLE):
+        super().__init__(path, columns, sheet_title)
+        self.file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.columns)
+    
+    def _write_rows(self, rows):
+        writer = self.writer
+        for row_data in rows:
+            writer.writerow(row_data)
+            self.rows += 1
+    
+    def _close(self):
+        self.file.close()
+
+
+class ParquetReportWriter(FlatReportWriter):
+    """Parquet (pyarrow 필요). 열 단위 형식이므로 행을 열로 모아 닫을 때 한 번에 기록"""
+    name = 'parquet'
+    extension = '.parquet'
+    
+    def __init__(self, path, columns, sheet_title=EXCEL_SHEET_TITLE):
+        super().__init__(path, columns, sheet_title)
+        if pa is None:
+            raise Exception("Parquet 리포트를 쓰려면 pyarrow 패키지가 필요합니다. (pip install pyarrow)")
+        self.values = [[] for _ in self.columns]
+    
+    def _write_rows(self, rows):
+        values = self.values
+        for row_data in rows:
+            for idx, value in enumerate(row_data):
+                values[idx].append(value)
+            self.rows += 1
+    
+    def _close(self):
+        import pyarrow.parquet as pq
+        table = pa.table({
+            # 이름 열은 모두 NULL일 수 있으므로 형식을 추론하지 못하면 문자열로 저장
+            column: pa.array(values, type=pa.string()) if all(value is None for value in values) else pa.array(values)
+            for column, values in zip(self.columns, self.values)
+        })
+        pq.write_table(table, self.path)
+
+
+REPORT_WRITERS = {
+    writer.name: writer
+    for writer in (OpenpyxlReportWriter, OpenpyxlNormalReportWriter, XlsxWriterReportWriter,
+                   CsvReportWriter, ParquetReportWriter)
+}
+
+
+def report_writer_class(options):
+    """옵션에 지정된 리포트 작성기 클래스 (excel_mode=normal이면 openpyxl 일반 워크북)"""
+    name = options['report_writer']
+    if name == 'openpyxl' and options['excel_mode'] == 'normal':
+        name = 'openpyxl_normal'
+    if name not in REPORT_WRITERS:
+        raise Exception(f"알 수 없는 리포트 형식: {name} (사용 가능: {', '.join(REPORT_WRITERS)})")
+    return REPORT_WRITERS[name]
+
+
+def partial_report_path(path, folder=False):
+    """확정 전 리포트 경로 (파일은 확장자 앞, 폴더는 이름 끝에 .partial)"""
+    if folder:
+        return path + '.partial'
+    root, extension = os.path.splitext(path)
+    return f"{root}.partial{extension}"
+
+
+def commit_report(partial, path):
+    """확정 전 리포트를 최종 경로로 옮김 (폴더면 안의 파일만 옮기고 기존 폴더의 다른 파일은 그대로 둠)"""
+    if os.path.isdir(partial):
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(partial):
+            os.replace(os.path.join(partial, name), os.path.join(path, name))
+        os.rmdir(partial)
+    else:
+        os.replace(partial, path)
+    return path
+
+
+def discard_report(partial):
+    """확정하지 않은 리포트 삭제 (없으면 무시)"""
+    if os.path.isdir(partial):
+        shutil.rmtree(partial, ignore_errors=True)
+    elif os.path.exists(partial):
+        os.remove(partial)
+
+
+def write_report(writer_class, path, columns, rows, sheet_title=EXCEL_SHEET_TITLE):
+    """리포트 작성기로 행 전체를 기록하고 작성기를 반환"""
+    writer = writer_class(path, columns, sheet_title)
+    try:
+        writer.write_rows(rows)
+    finally:
+        writer.close()
+    return writer
+
+
+def write_missed_call_excel(path, columns, rows, write_only=True):
+    """미통화 리스트 엑셀 파일 저장 (write_only: 쓰기 전용 워크시트, 아니면 기존 방식)"""
+    writer_class = OpenpyxlReportWriter if write_only else OpenpyxlNormalReportWriter
+    return write_report(writer_class, path, columns, rows)
+
+
+REPORT_SPLITS = ('none', 'sheet', 'file')
+REPORT_SPLIT_COLUMN = '담당자'
+REPORT_SPLIT_EMPTY = '(담당자 없음)'
+
+
+def split_report_rows(columns, rows):
+    """미통화 리스트를 담당자별로 나눔. 반환값: [(담당자, 행 목록), ...] (담당자 이름순, 담당자 없음은 마지막)"""
+    key_idx = list(columns).index(REPORT_SPLIT_COLUMN)
+    parts = {}
+    for row in rows:
+        parts.setdefault(row[key_idx] or '', []).append(tuple(row))
+    return [(staff or REPORT_SPLIT_EMPTY, parts[staff]) for staff in sorted(parts, key=lambda staff: (not staff, staff))]
+
+
+def report_file_name(title):
+    """담당자 이름으로 만든 파일 이름 (Windows 파일 이름에 쓸 수 없는 문자는 '_')"""
+    return re.sub(r'[<>:"/\\|?*\x00-\x1f]', '_', title).strip(' .') or '_'
+
+
+def write_split_report_sheets(writer_class, path, columns, rows):
+    """담당자별 시트로 나눈 리포트 (한 파일). 반환값: 작성기"""
+    if writer_class.max_sheet_rows is None:
+        raise Exception(f"담당자별 시트 분할은 엑셀 형식에서만 사용할 수 있습니다 (현재: {writer_class.name})")
+    parts = split_report_rows(columns, rows)
+    if not parts:
+        return write_report(writer_class, path, columns, rows)
+    writer = writer_class(path, columns, parts[0][0])
+    try:
+        for staff, part_rows in parts:
+            writer.new_sheet(staff)
+            writer.write_rows(part_rows)
+    finally:
+        writer.close()
+    return writer
+
+
+def render_report_file(writer_name, path, columns, rows, sheet_title):
+    """리포트 파일 한 개 작성 (프로세스 풀 작업). 반환값: (경로, 행 수, 시트 수, 소요 시간)"""
+    writer = write_report(REPORT_WRITERS[writer_name], path, columns, rows, sheet_title)
+    return path, writer.rows, len(writer.sheet_titles), writer.elapsed
+
+
+def write_split_report_files(writer_class, folder, columns, rows, workers=1):
+    """담당자별 파일로 나눈 리포트 (folder 안에 담당자 이름.확장자). workers가 1이 아니면 프로세스 풀에서 작성 (0이면 CPU 코어 수)
+
+    반환값: [(경로, 행 수, 시트 수, 소요 시간), ...]
+    """
+    os.makedirs(folder, exist_ok=True)
+    jobs = []
+    used = set()
+    for staff, part_rows in split_report_rows(columns, rows):
+        file_name = report_file_name(staff)
+        # 바꾼 이름이 겹치면 번호를 붙여 구분
+        candidate, number = file_name, 1
+        while candidate.lower() in used:
+            number += 1
+            candidate = f"{file_name} ({number})"
+        used.add(candidate.lower())
+        jobs.append((writer_class.name, os.path.join(folder, candidate + writer_class.extension),
+                     list(columns), part_rows, staff))
+    
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [render_report_file(*job) for job in jobs]
+    # 행이 많은 담당자부터 넘겨 마지막에 큰 작업 하나만 남지 않도록 함
+    order = sorted(range(len(jobs)), key=lambda idx: -len(jobs[idx][3]))
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(render_report_file, *jobs[idx]): idx for idx in order}
+        for future, idx in futures.items():
+            results[idx] = future.result()
+    return results
+
+
+class StageExecutor:
+    """선행 단계를 선언한 처리 단계 실행기 (서로 독립인 단계는 별도 쓰레드에서 겹쳐 실행)
+
+    db='main' 단계는 주 연결에서만 실행한다 (연결에 묶인 객체를 쓰는 단계).
+    db='any' 단계는 주 연결이 사용 중이면 acquire()로 얻은 추가 연결에서 실행한다.
+    한 단계가 실패하면 새 단계는 시작하지 않고, 실행 중인 단계가 끝난 뒤 첫 번째 오류를 다시 발생시킨다.
+    overlap=False면 추가한 순서대로 한 단계씩 주 연결에서 실행한다.
+    """
+    
+    def __init__(self, conn, acquire=None, release=None, overlap=True, extra_connections=1, log=None):
+        self.conn = conn
+        self.acquire = acquire
+        self.release = release
+        self.overlap = overlap
+        self.extra_connections = extra_connections
+        self.log = log or (lambda message: None)
+        self.stages = {}       # 이름 → (함수, 선행 단계, db)
+        self.results = {}
+        self.elapsed = {}
+        self.done = set()
+        self.wall_seconds = 0.0
+        self._acquire_failed = False
+    
+    def add(self, name, func, after=(), db=None):
+        """단계 추가. func는 db 단계면 연결을 인자로 받고, 아니면 인자 없이 호출된다."""
+        for dep in after:
+            if dep not in self.stages:
+                raise Exception(f"알 수 없는 선행 단계: {dep}")
+        self.stages[name] = (func, tuple(after), db)
+    
+    def _acquire_extra(self, count):
+        if not self.overlap or self.acquire is None or self._acquire_failed or count >= self.extra_connections:
+            return None
+        try:
+            return self.acquire()
+        except Exception as e:
+            # 추가 연결을 얻지 못하면 주 연결이 빌 때까지 기다려 실행
+            self._acquire_failed = True
+            self.log(f"⚠ 추가 DB 연결 실패, 주 연결에서 차례로 실행합니다: {e}")
+            return None
+    
+    def _run_stage(self, name, func, conn):
+        start = time.perf_counter()
+        try:
+            return func() if conn is None else func(conn)
+        finally:
+            self.elapsed[name] = time.perf_counter() - start
+    
+    def run(self):
+        """모든 단계 실행. 반환값: 단계 이름 → 반환값"""
+        start = time.perf_counter()
+        pending = list(self.stages)
+        running = {}           # future → (이름, 연결)
+        free = [self.conn]     # 사용 가능한 연결
+        extra = []             # 추가로 얻은 연결
+        error = None
+        try:
+            with ThreadPoolExecutor(max_workers=max(len(self.stages), 1)) as pool:
+                while True:
+                    if error is None and (self.overlap or not running):
+                        ready = [name for name in pending if all(dep in self.done for dep in self.stages[name][1])]
+                        if self.overlap:
+                            # 주 연결이 필요한 단계부터 배정
+                            ready.sort(key=lambda name: self.stages[name][2] != 'main')
+                        for name in ready:
+                            func, _, db = self.stages[name]
+                            conn = None
+                            if db == 'main':
+                                if self.conn not in free:
+                                    continue
+                                conn = self.conn
+                            elif db == 'any':
+                                if not free:
+                                    extra_conn = self._acquire_extra(len(extra))
+                                    if extra_conn is None:
+                                        continue
+                                    extra.append(extra_conn)
+                                    free.append(extra_conn)
+                                # 추가 연결이 있으면 주 연결은 남겨 둠
+                                conn = next((c for c in free if c is not self.conn), self.conn)
+                            if conn is not None:
+                                free.remove(conn)
+                            pending.remove(name)
+                            running[pool.submit(self._run_stage, name, func, conn)] = (name, conn)
+                            if not self.overlap:
+                                break
+                    if not running:
+                        break
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        name, conn = running.pop(future)
+                        if conn is not None:
+                            free.append(conn)
+                        try:
+                            self.results[name] = future.result()
+                            self.done.add(name)
+                        except Exception as e:
+                            if error is None:
+                                error = e
+        finally:
+            for conn in extra:
+                self.release(conn)
+            self.wall_seconds = time.perf_counter() - start
+        if error is not None:
+            raise error
+        if pending:
+            raise Exception(f"선행 단계가 끝나지 않아 실행할 수 없는 단계: {', '.join(pending)}")
+        return self.results
+    
+    def summary(self):
+        stages = ", ".join(f"{name} {self.elapsed[name]:.2f}초" for name in self.stages if name in self.elapsed)
+        return (f"{stages} (전체 {self.wall_seconds:.2f}초, "
+                f"단계 합계 {sum(self.elapsed.values()):.2f}초)")
+
+
+# 여러 파일을 동시에 처리할 때 CDR_MemberMobile / 연락처 캐시 갱신이 겹치지 않도록 함
+SHARED_REFRESH_LOCK = threading.Lock()
+
+
+class CDRProcessor:
+    """CDR 파일 한 개 처리 (CSV 적재 → 미통화 리스트 → CDR 병합)
+
+    GUI나 명령행에서 사용하며, 진행 상황은 콜백으로 전달한다.
+    on_log(메시지), on_progress(0~100), on_finished(성공 여부, 결과 파일 경로 또는 오류 메시지)
+    """
+    
+    def __init__(self, csv_file, db_config, options=None, db_pool=None,
+                 on_log=None, on_progress=None, on_finished=None):
+        self.csv_file = csv_file
+        self.db_config = db_config
+        self.options = options or dict(DEFAULT_PROCESS_OPTIONS)
+        self.db_pool = db_pool
+        self.conn = None
+        self.checkpoints = None
+        self.collector = None
+        self.report_task = None     # 적재 중에 리포트를 만드는 작업 (run에서 설정)
+        self.early_report = None    # report_task 실행 결과 (Future)
+        self.partial_report = None  # 적재가 끝나기 전에 쓴 확정 전 리포트 경로
+        self.inserted_rows = 0
+        self.on_log = on_log or (lambda message: None)
+        self.on_progress = on_progress or (lambda value: None)
+        self.on_finished = on_finished or (lambda success, result: None)
+        
+    def log(self, message):
+        """로그 메시지 전송"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.on_log(f"[{timestamp}] {message}")
+        
+    def insert_rows(self, table_name, batches, csv_stream, inserted=0):
+        """삽입 엔진으로 배치 단위 삽입 후 전체 삽입 건수 반환 (inserted: 이미 적재된 건수)"""
+        if self.options['insert_writers'] > 1:
+            return self.insert_rows_parallel(table_name, batches, csv_stream, inserted)
+        policy = create_commit_policy(self.options)
+        sizer = None
+        batch_label = self.options['batch_size']
+        if self.options['adaptive_batch']:
+            sizer = self.create_batch_sizer()
+            batches = sized_batches(batches, sizer)
+            batch_label = f"적응형 {sizer.min_size}~{sizer.max_size}, 시작 {sizer.size}"
+        self.log(f"\n데이터 삽입 중... (엔진: {self.options['insert_engine']}, 배치: {batch_label}, "
+                 f"커밋: {policy.describe()})")
+        engine = create_insert_engine(self.conn, table_name, self.options, policy.table_hint)
+        try:
+            for batch in batches:
+                start = time.perf_counter()
+                engine.insert(batch)
+                if sizer:
+                    sizer.record(len(batch), time.perf_counter() - start)
+                policy.add(len(batch))
+                prev_inserted = inserted
+                inserted += len(batch)
+                if policy.due():
+                    policy.commit(self.conn)
+                    self.save_checkpoint(table_name, csv_stream, inserted)
+                progress = 30 + int(csv_stream.progress * 20)
+                self.on_progress(progress)
+                if inserted // 5000 > prev_inserted // 5000:
+                    self.log(f"  {inserted}개 레코드 삽입 완료...")
+            if policy.pending_rows:
+                policy.commit(self.conn)
+                self.save_checkpoint(table_name, csv_stream, inserted)
+            self.log(f"삽입 성능 - {engine.summary()}")
+            self.log(f"커밋 성능 - {policy.summary()}")
+            if sizer:
+                self.save_batch_size(sizer)
+            return inserted
+        except Exception:
+            # 커밋되지 않은 배치는 롤백 (커밋된 부분은 체크포인트로 이어서 적재)
+            try:
+                self.conn.rollback()
+            except pyodbc.Error:
+                pass
+            if policy.pending_rows:
+                self.log(f"⚠ 롤백: {policy.rollback_scope} {policy.pending_rows}건 ({policy.describe()})")
+            raise
+        finally:
+            engine.close()
+    
+    def insert_rows_parallel(self, table_name, batches, csv_stream, inserted=0):
+        """여러 연결로 나눠 삽입 후 전체 삽입 건수 반환
+
+        연결마다 커밋 시점이 달라 중간 체크포인트는 남기지 않고, 모두 성공했을 때만 기록한다.
+        """
+        writers = self.options['insert_writers']
+        if self.db_pool:
+            # 이 쓰레드가 쓰는 연결 하나를 빼고 남은 만큼만 사용
+            available = max(1, self.db_pool.max_size - 1)
+            if writers > available:
+                self.log(f"⚠ 연결 풀 크기(db_pool_size={self.db_pool.max_size})에 맞춰 쓰기 연결을 {available}개로 줄입니다.")
+                writers = available
+            acquire = lambda: self.db_pool.acquire()[0]
+            release = self.db_pool.release
+        else:
+            acquire = lambda: pyodbc.connect(build_connection_string(self.db_config))
+            release = lambda conn: conn.close()
+        if self.options['adaptive_batch']:
+            self.log("⚠ 병렬 삽입에서는 적응형 배치를 사용하지 않습니다.")
+        
+        self.log(f"\n데이터 삽입 중... (엔진: {self.options['insert_engine']}, 배치: {self.options['batch_size']}, "
+                 f"커밋: {create_commit_policy(self.options).describe()}, 연결 {writers}개)")
+        writer = ParallelStagingWriter(acquire, release, table_name, self.options, writers)
+        queued = [inserted]
+        
+        def on_batch(rows):
+            prev_queued = queued[0]
+            queued[0] += rows
+            self.on_progress(30 + int(csv_stream.progress * 20))
+            if queued[0] // 5000 > prev_queued // 5000:
+                self.log(f"  {queued[0]}개 레코드 전송...")
+        
+        try:
+            inserted += writer.write(batches, on_batch)
+        finally:
+            if writer.engines:
+                total, *per_writer = writer.summary().split("\n")
+                self.log(f"삽입 성능 - {total}")
+                for line in per_writer:
+                    self.log(line)
+        self.save_checkpoint(table_name, csv_stream, inserted)
+        return inserted
+    
+    def save_checkpoint(self, table_name, csv_stream, row_count):
+        """커밋된 지점(마지막으로 읽은 배치의 끝 위치)을 체크포인트로 기록"""
+        if self.checkpoints is None:
+            return
+        byte_offset = csv_stream.batch_end_offset
+        if byte_offset is None:
+            return
+        self.checkpoints.save(self.csv_file, table_name, byte_offset, row_count)
+    
+    def create_batch_sizer(self):
+        """이전 실행에서 자리잡은 크기로 시작하는 적응형 배치 조정기 생성"""
+        store = BatchSizeStore()
+        try:
+            start_size = store.load(BatchSizeStore.profile_key(self.db_config, self.options))
+        finally:
+            store.close()
+        return AdaptiveBatchSizer(
+            self.options['batch_size_min'],
+            self.options['batch_size_max'],
+            self.options['batch_target_seconds'],
+            start_size or self.options['batch_size'],
+        )
+    
+    def save_batch_size(self, sizer):
+        """자리잡은 배치 크기를 다음 실행의 시작 크기로 기록"""
+        self.log(sizer.summary())
+        store = BatchSizeStore()
+        try:
+            store.save(BatchSizeStore.profile_key(self.db_config, self.options), sizer.size, sizer.rows_per_sec)
+        finally:
+            store.close()
+    
+    def read_batch_size(self):
+        """CSV 읽기 배치 크기 (적응형이면 최소 크기 단위로 읽어 삽입 시 이어 붙임)"""
+        if self.options['adaptive_batch']:
+            return max(1, min(self.options['batch_size'], self.options['batch_size_min']))
+        return self.options['batch_size']
+    
+    def collect_missed_calls(self, batches):
+        """report_engine이 client이면 삽입할 배치를 읽는 동안 미통화 리스트를 집계
+
+        stage_overlap이면 마지막 배치를 읽자마자 적재가 끝나기를 기다리지 않고 리포트를 만들기 시작한다.
+        bulk 모드는 BULK INSERT 전체와 겹친다. insert 모드는 마지막 배치를 삽입한 뒤 다음 배치를
+        요청할 때 집계가 끝나므로 마지막 커밋(insert_writers면 쓰기 쓰레드가 대기열에 남은 배치를
+        삽입·커밋하는 시간)과만 겹친다. 배치를 미리 읽으면 체크포인트 위치가 삽입보다 앞서므로 미리 읽지 않는다.
+        """
+        if self.options['report_engine'] != 'client':
+            return batches
+        self.collector = MissedCallCollector()
+        on_complete = self.start_early_report if self.options['stage_overlap'] else None
+        return self.collector.wrap(batches, on_complete)
+    
+    def start_early_report(self, collector):
+        """집계가 끝난 collector로 리포트 작업(report_task)을 별도 쓰레드에서 시작 (한 번만)"""
+        if self.early_report is not None or self.report_task is None:
+            return
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.early_report = pool.submit(self.report_task, collector)
+        pool.shutdown(wait=False)
+    
+    def open_batches(self, csv_stream, start_offset=0):
+        """배치 반복자를 열고 첫 배치를 미리 읽음"""
+        batches = csv_stream.batches(self.read_batch_size(), start_offset)
+        return batches, next(batches, None)
+    
+    def bulk_load(self, table_name, file_stem, batches, csv_stream):
+        """BULK INSERT로 적재 후 건수 반환 (사용할 수 없으면 None)"""
+        self.log("\nBULK INSERT 적재 중...")
+        loader = None
+        try:
+            loader = BulkInsertLoader(self.conn, table_name, file_stem, self.options)
+            loader.write_format_file()
+            loader.write_data_file(
+                batches,
+                on_batch=lambda rows: self.on_progress(30 + int(csv_stream.progress * 15))
+            )
+            self.log(f"  적재 파일 작성 완료: {loader.rows}개 ({loader.data_path})")
+            loader.load()
+            self.log(f"삽입 성능 - {loader.summary()}")
+            return loader.rows
+        except (BulkLoadError, OSError) as e:
+            self.log(f"⚠ {e}")
+            self.log("⚠ 행 단위 삽입으로 전환합니다.")
+            return None
+        finally:
+            if loader:
+                loader.cleanup()
+    
+    def refresh_member_mobile(self, conn=None):
+        """member_mobile_table이면 CDR_MemberMobile을 갱신하고 조인에 쓸 회원 키 컬럼 반환 (사용 안 하면 None)"""
+        if not self.options['member_mobile_table']:
+            return None
+        table = MemberMobileTable(conn or self.conn, self.options)
+        try:
+            if not table.exists():
+                self.log(f"⚠ {MemberMobileTable.TABLE_NAME}이 없습니다 (python -m cdr setup-member-mobile로 생성). 기존 조인으로 조회합니다.")
+                return None
+        except pyodbc.Error as e:
+            self.log(f"⚠ 회원 번호 테이블 확인 실패, 기존 조인으로 조회합니다: {e}")
+            return None
+        try:
+            refresh_start = time.perf_counter()
+            with SHARED_REFRESH_LOCK:
+                refreshed = table.refresh()
+            self.log(f"회원 번호 테이블 갱신: {refreshed} ({time.perf_counter() - refresh_start:.2f}초)")
+        except pyodbc.Error as e:
+            # 갱신에 실패해도 이전 상태의 테이블로 조회
+            self.log(f"⚠ 회원 번호 테이블 갱신 경고: {e}")
+        return table.member_key
+    
+    def lookup_names(self, numbers, conn=None):
+        """미통화 번호의 성명/담당자 조회 (contact_cache면 갱신 후 로컬 캐시에서)"""
+        conn = conn or self.conn
+        if not self.options['contact_cache']:
+            return lookup_contact_names(conn, numbers, self.refresh_member_mobile(conn))
+        cache = ContactCache(self.options)
+        try:
+            refresh_start = time.perf_counter()
+            try:
+                with SHARED_REFRESH_LOCK:
+                    refreshed = cache.refresh(conn)
+                self.log(f"연락처 캐시 갱신: {refreshed} ({time.perf_counter() - refresh_start:.2f}초)")
+            except pyodbc.Error as e:
+                conn.rollback()
+                self.log(f"⚠ 연락처 캐시 갱신 실패, 기존 캐시를 사용합니다: {e}")
+            return cache.lookup(numbers)
+        finally:
+            cache.close()
+    
+    def staged_report_day(self, conn, table_name, file_day):
+        """개선 SQL의 시간대를 적용할 날짜
+
+        파일명 날짜가 아니라 임시 테이블 RecDT 범위로 정한다. 모두 같은 날이면 그 날짜,
+        여러 날에 걸치면 None (기존 SQL처럼 날짜와 관계없이 시각만 비교).
+        """
+        cursor = conn.cursor()
+        try:
+            row = cursor.execute(f"SELECT MIN(RecDT), MAX(RecDT) FROM {table_name} WITH(NOLOCK)").fetchone()
+        finally:
+            cursor.close()
+        first, last = row if row else (None, None)
+        if first is None:
+            return file_day
+        if first.date() != last.date():
+            self.log(f"⚠ 레코드가 여러 날짜({first:%Y-%m-%d} ~ {last:%Y-%m-%d})에 걸쳐 있어 날짜 구분 없이 시간대로 조회합니다.")
+            return None
+        day = datetime(first.year, first.month, first.day)
+        if day.date() != file_day.date():
+            self.log(f"⚠ 레코드 날짜({day:%Y-%m-%d})가 파일명 기준 날짜({file_day:%Y-%m-%d})와 달라 레코드 날짜로 조회합니다.")
+        return day
+    
+    def query_missed_calls(self, table_name, day, conn=None):
+        """임시 테이블에서 미통화 리스트 조회. 반환값: (행 목록, 컬럼 이름 목록)"""
+        conn = conn or self.conn
+        if self.options['report_indexes']:
+            try:
+                index_seconds = create_report_indexes(conn, table_name)
+                self.log(f"조회용 인덱스 생성 완료 ({index_seconds:.2f}초)")
+            except pyodbc.Error as e:
+                conn.rollback()
+                self.log(f"⚠ 조회용 인덱스 생성 경고: {e}")
+        cursor = conn.cursor()
+        try:
+            legacy = self.options['report_query'] == 'legacy'
+            # 연락처 캐시를 쓰면 이름은 조인하지 않고 캐시에서 붙임
+            with_names = legacy or not self.options['contact_cache']
+            member_key = self.refresh_member_mobile(conn) if with_names and not legacy else None
+            if not legacy:
+                day = self.staged_report_day(conn, table_name, day)
+            query_sql, query_params = build_missed_call_query(table_name, day, legacy, with_names, member_key)
+            
+            query_start = time.perf_counter()
+            cursor.execute(query_sql, *query_params)
+            results = cursor.fetchall()
+            columns = [column[0] for column in cursor.description]
+            self.log(f"미통화 리스트 조회 완료: {len(results)}건 "
+                     f"({self.options['report_query']}, {time.perf_counter() - query_start:.2f}초)")
+            if not with_names:
+                names = self.lookup_names(sorted({row[0] for row in results}), conn)
+                results = expand_contact_names(results, names)
+                columns = list(MissedCallCollector.COLUMNS)
+            return results, columns
+        except Exception as e:
+            raise Exception(f"쿼리 실행 실패: {e}")
+        finally:
+            cursor.close()
+    
+    def acquire_stage_connection(self):
+        """겹쳐 실행하는 단계용 추가 연결 (풀이 있으면 풀에서)"""
+        if self.db_pool:
+            return self.db_pool.acquire()[0]
+        return pyodbc.connect(build_connection_string(self.db_config))
+    
+    def release_stage_connection(self, conn):
+        if self.db_pool:
+            self.db_pool.release(conn)
+        else:
+            conn.close()
+    
+    def run(self):
+        try:
+            # 1. CSV 파일 검증
+            self.log("=" * 60)
+            self.log("CDR 파일 처리 시작")
+            self.log("=" * 60)
+            self.on_progress(5)
+            
+            if not os.path.exists(self.csv_file):
+                raise Exception(f"CSV 파일을 찾을 수 없습니다: {self.csv_file}")
+            
+            # 파일명에서 날짜 추출 (CDR-25120900.csv -> 25120900)
+            filename = cdr_file_stem(self.csv_file)
+            date_str = filename.split('-')[-1]
+            self.log(f"파일명: {filename}")
+            self.log(f"추출된 날짜: {date_str}")
+            
+            # 날짜 파싱 (YYMMDD00 형식)
+            try:
+                file_date = datetime.strptime(date_str[:6], '%y%m%d')
+                # 백업은 다음날 00시에 되므로 하루 전 날짜가 실제 데이터 날짜
+                actual_date = file_date - timedelta(days=1)
+                formatted_date = actual_date.strftime('%Y%m%d')
+                self.log(f"실제 데이터 날짜: {actual_date.strftime('%Y-%m-%d')}")
+            except Exception as e:
+                raise Exception(f"날짜 파싱 실패: {e}")
+            
+            self.on_progress(10)
+            
+            # 리포트 형식은 적재를 시작하기 전에 확인
+            try:
+                writer_options = self.options
+                if writer_options['report_writer'] == 'xlsxwriter' and xlsxwriter is None:
+                    self.log("⚠ xlsxwriter가 설치되어 있지 않아 openpyxl로 작성합니다 (pip install xlsxwriter)")
+                    writer_options = dict(writer_options, report_writer='openpyxl')
+                writer_class = report_writer_class(writer_options)
+                split = self.options['report_split']
+                if split not in REPORT_SPLITS:
+                    raise Exception(f"알 수 없는 분할 방식: {split} (사용 가능: {', '.join(REPORT_SPLITS)})")
+                if split == 'sheet' and writer_class.max_sheet_rows is None:
+                    raise Exception(f"담당자별 시트 분할은 엑셀 형식에서만 사용할 수 있습니다 (현재: {writer_class.name})")
+            except Exception as e:
+                raise Exception(f"엑셀 파일 생성 실패: {e}")
+            # 같은 날짜 파일(회선별 파일 등)이 서로 덮어쓰지 않도록 리포트 이름에 파일명을 넣음
+            if split == 'file':
+                excel_filename = f"{formatted_date}_{filename}_미통화리스트_담당자별"
+            else:
+                excel_filename = f"{formatted_date}_{filename}_미통화리스트{writer_class.extension}"
+            excel_path = os.path.join(os.path.dirname(self.csv_file), excel_filename)
+            
+            progress_lock = threading.Lock()
+            progress = [50]
+            
+            def advance(value):
+                # 겹쳐 실행되는 단계들이 진행률을 되돌리지 않도록 증가할 때만 표시
+                with progress_lock:
+                    if value > progress[0]:
+                        progress[0] = value
+                        self.on_progress(value)
+            
+            def client_report(conn, collector):
+                # CSV를 읽으면서 집계한 미통화 번호에 이름만 조회해서 붙임
+                try:
+                    missed_numbers = sorted({number for number, _ in collector.missed()})
+                    lookup_start = time.perf_counter()
+                    names = self.lookup_names(missed_numbers, conn)
+                    results = collector.report_rows(names)
+                    self.log(f"미통화 리스트 집계 완료: {len(results)}건 (client, 집계 {collector.elapsed:.2f}초, "
+                             f"번호 {len(missed_numbers)}개 이름 조회 {time.perf_counter() - lookup_start:.2f}초)")
+                    return results, list(MissedCallCollector.COLUMNS)
+                except Exception as e:
+                    raise Exception(f"쿼리 실행 실패: {e}")
+            
+            def write_excel(results, columns, path=excel_path):
+                self.log(f"\n엑셀 파일 생성 중: {os.path.basename(path)}")
+                try:
+                    if split == 'file':
+                        # 담당자별 파일을 프로세스 풀에서 나눠 작성
+                        split_start = time.perf_counter()
+                        files = write_split_report_files(
+                            writer_class, path, columns, results, self.options['report_workers']
+                        )
+                        sheets = sum(file_sheets for _, _, file_sheets, _ in files)
+                        self.log(f"담당자별 파일 저장 완료: {path} ({writer_class.name}, 파일 {len(files)}개, "
+                                 f"시트 {sheets}개, {len(results)}건, {time.perf_counter() - split_start:.2f}초)")
+                    elif split == 'sheet':
+                        writer = write_split_report_sheets(writer_class, path, columns, results)
+                        self.log(f"담당자별 시트 저장 완료: {path} ({writer.summary()})")
+                    else:
+                        writer = write_report(writer_class, path, columns, results)
+                        self.log(f"엑셀 파일 저장 완료: {path} ({writer.summary()})")
+                except Exception as e:
+                    raise Exception(f"엑셀 파일 생성 실패: {e}")
+                return path
+            
+            def early_report_task(collector):
+                # client 집계가 끝나면 적재(BULK INSERT, 남은 배치 삽입)를 기다리지 않고 리포트 작성
+                # 적재가 성공하기 전까지는 .partial 이름으로 두고 excel_stage에서 확정
+                self.log("\nCSV 집계 완료 - 적재와 함께 미통화 리스트를 만듭니다.")
+                try:
+                    conn = self.acquire_stage_connection()
+                except Exception as e:
+                    self.log(f"⚠ 리포트용 추가 연결 실패, 적재가 끝난 뒤 만듭니다: {e}")
+                    return None
+                try:
+                    results, columns = client_report(conn, collector)
+                finally:
+                    self.release_stage_connection(conn)
+                self.partial_report = partial_report_path(excel_path, folder=(split == 'file'))
+                return results, columns, write_excel(results, columns, self.partial_report)
+            
+            self.report_task = early_report_task
+            
+            # 2. CSV 파일 열기 (스트리밍)
+            self.log("\nCSV 파일 확인 중...")
+            checkpoint = None
+            try:
+                csv_stream = open_cdr_reader(self.csv_file, self.options)
+                self.log(f"파일 크기: {csv_stream.total_bytes:,} bytes (배치 단위 스트리밍 처리)")
+                if is_compressed_file(self.csv_file):
+                    self.log("압축 파일: 스트리밍으로 압축을 풀면서 처리합니다.")
+                if isinstance(csv_stream, ParallelCsvReader):
+                    order = "순서 유지" if csv_stream.ordered else "순서 무관"
+                    self.log(f"병렬 파싱: 워커 {csv_stream.workers}개, 범위 {csv_stream.chunk_bytes // (1024 * 1024)}MB ({order})")
+                
+                # 이전 실행의 체크포인트 확인
+                if self.options['resume']:
+                    if csv_stream.supports_resume:
+                        self.checkpoints = CheckpointStore()
+                        checkpoint = self.checkpoints.load(self.csv_file)
+                    else:
+                        self.log("⚠ 현재 읽기 방식은 이어서 적재를 지원하지 않아 체크포인트를 사용하지 않습니다.")
+                if checkpoint:
+                    self.log(f"체크포인트 발견: {checkpoint['RowCount']}건 적재됨 "
+                             f"({checkpoint['ByteOffset']:,} bytes, {checkpoint['UpdatedAt']})")
+                
+                batches, first_batch = self.open_batches(csv_stream, checkpoint['ByteOffset'] if checkpoint else 0)
+            except Exception as e:
+                raise Exception(f"CSV 파일 읽기 실패: {e}")
+            
+            if first_batch is None and not checkpoint:
+                raise Exception("CSV 파일에 데이터가 없습니다.")
+            
+            self.on_progress(20)
+            
+            # 3. DB 연결
+            self.log("\nSQL Server에 연결 중...")
+            self.log(f"서버: {self.db_config['Host']}:{self.db_config['Port']}")
+            self.log(f"데이터베이스: {self.db_config['DB_Name']}")
+            
+            try:
+                if self.db_pool:
+                    self.conn, reused = self.db_pool.acquire()
+                    self.log("데이터베이스 연결 성공" + (" (기존 연결 재사용)" if reused else ""))
+                else:
+                    self.conn = pyodbc.connect(build_connection_string(self.db_config))
+                    self.log("데이터베이스 연결 성공")
+            except Exception as e:
+                raise Exception(f"DB 연결 실패: {e}")
+            
+            self.on_progress(25)
+            
+            # 파티션 전환 모드: 파티션 함수/스키마와 날짜 파티션 준비
+            switch_loader = None
+            if self.options['merge_mode'] == 'switch':
+                self.log("\nCDR 파티션 확인 중...")
+                switch_loader = PartitionSwitchLoader(self.conn, actual_date, self.options)
+                try:
+                    partition_number = switch_loader.prepare()
+                    self.log(f"{actual_date.strftime('%Y-%m-%d')} 파티션 준비 완료 (파티션 {partition_number})")
+                except PartitionSwitchError as e:
+                    self.log(f"⚠ {e}")
+                    self.log("⚠ INSERT 병합으로 진행합니다.")
+                    switch_loader = None
+            
+            # 4. 임시 테이블 생성
+            table_name = f"[{filename}]"
+            self.log(f"\n임시 테이블 생성 중: {table_name}")
+            cursor = self.conn.cursor()
+            
+            try:
+                # 체크포인트가 있으면 임시 테이블 건수가 기록과 같을 때만 이어서 적재
+                if checkpoint:
+                    cursor.execute(f"""
+                        IF OBJECT_ID(N'{table_name}', N'U') IS NOT NULL
+                            SELECT COUNT_BIG(*) FROM {table_name}
+                        ELSE
+                            SELECT CAST(-1 AS BIGINT)
+                    """)
+                    staged_rows = cursor.fetchone()[0]
+                    if checkpoint['TableName'] == table_name and staged_rows == checkpoint['RowCount']:
+                        self.log(f"기존 임시 테이블을 이어서 사용합니다 ({staged_rows}건)")
+                    else:
+                        self.log(f"⚠ 임시 테이블 상태가 체크포인트와 다릅니다 (테이블 {staged_rows}건). 처음부터 적재합니다.")
+                        self.checkpoints.clear(self.csv_file)
+                        checkpoint = None
+                        batches.close()
+                        batches, first_batch = self.open_batches(csv_stream)
+                
+                if not checkpoint:
+                    # 테이블이 이미 존재하면 삭제
+                    cursor.execute(f"""
+                        IF OBJECT_ID(N'{table_name}', N'U') IS NOT NULL
+                            DROP TABLE {table_name}
+                    """)
+                    self.conn.commit()
+                    
+                    # 테이블 생성 (파티션 전환 모드는 CDR과 같은 구조로 생성)
+                    if switch_loader:
+                        try:
+                            switch_loader.create_staging(table_name)
+                        except PartitionSwitchError as e:
+                            self.log(f"⚠ {e}")
+                            self.log("⚠ INSERT 병합으로 진행합니다.")
+                            switch_loader = None
+                    if not switch_loader:
+                        create_table_sql = f"""
+                        CREATE TABLE {table_name}({CDR_TABLE_COLUMNS_SQL}) ON [PRIMARY]
+                        """
+                        cursor.execute(create_table_sql)
+                        self.conn.commit()
+                    self.log("테이블 생성 완료")
+            except Exception as e:
+                raise Exception(f"테이블 생성 실패: {e}")
+            
+            self.on_progress(30)
+            
+            # 5. 데이터 삽입 (읽기 → 전처리 → 삽입을 배치 단위로 진행)
+            try:
+                if checkpoint and first_batch is None:
+                    self.log("\n체크포인트 기준으로 모든 레코드가 이미 적재되어 있습니다.")
+                    inserted = checkpoint['RowCount']
+                elif checkpoint:
+                    # 중단된 지점부터 행 단위로 이어서 삽입 (앞부분을 읽지 않으므로 읽으면서 집계하지 않음)
+                    inserted = self.insert_rows(
+                        table_name, itertools.chain([first_batch], batches), csv_stream, checkpoint['RowCount']
+                    )
+                elif self.options['load_mode'] == 'bulk':
+                    inserted = self.bulk_load(
+                        table_name, filename,
+                        self.collect_missed_calls(itertools.chain([first_batch], batches)), csv_stream
+                    )
+                    if inserted is None:
+                        # BULK INSERT 실패 시 파일을 처음부터 다시 읽어 행 단위로 삽입
+                        cursor.execute(f"TRUNCATE TABLE {table_name}")
+                        self.conn.commit()
+                        inserted = self.insert_rows(
+                            table_name,
+                            self.collect_missed_calls(csv_stream.batches(self.read_batch_size())),
+                            csv_stream
+                        )
+                    else:
+                        # 압축 파일의 이어 읽기 위치는 압축 해제된 데이터 기준 (원본 파일 크기가 아님)
+                        self.save_checkpoint(table_name, csv_stream, inserted)
+                else:
+                    inserted = self.insert_rows(
+                        table_name, self.collect_missed_calls(itertools.chain([first_batch], batches)),
+                        csv_stream
+                    )
+            except Exception as e:
+                if self.checkpoints and self.checkpoints.load(self.csv_file):
+                    self.log("⚠ 다음 실행 시 마지막 커밋 지점부터 이어서 적재합니다.")
+                raise Exception(f"데이터 삽입 실패: {e}")
+            
+            self.log(f"전체 데이터 삽입 완료: {inserted}개")
+            self.inserted_rows = inserted
+            
+            self.on_progress(50)
+            
+            # 6~9. 조회 → 엑셀 생성 / CDR 병합 → 임시 테이블 삭제
+            # 엑셀 생성과 병합은 서로 독립이므로 stage_overlap이면 겹쳐 실행한다.
+            # 서버 조회는 임시 테이블을 읽으므로 병합(파티션 전환 시 행이 옮겨짐)은 조회가 끝난 뒤 실행한다.
+            # client 집계는 적재 중에 이미 리포트를 만들었을 수 있다 (early_report).
+            def report_stage(conn):
+                # 6. 쿼리 실행 (적재 중에 만든 리포트가 있으면 그 결과 사용)
+                early = self.early_report.result() if self.early_report else None
+                if early:
+                    results, columns, _ = early
+                elif self.collector is not None:
+                    self.log("\n미통화 리스트 조회 중...")
+                    results, columns = client_report(conn, self.collector)
+                else:
+                    self.log("\n미통화 리스트 조회 중...")
+                    if self.options['report_engine'] == 'client':
+                        self.log("⚠ 이어서 적재한 실행은 CSV 전체를 읽지 않아 서버에서 조회합니다.")
+                    results, columns = self.query_missed_calls(table_name, actual_date, conn)
+                advance(60)
+                return results, columns
+            
+            def excel_stage():
+                # 7. 엑셀 파일 생성
+                early = self.early_report.result() if self.early_report else None
+                if early:
+                    path = commit_report(early[2], excel_path)
+                    self.partial_report = None
+                    self.log(f"적재 완료 - 미리 만든 리포트 확정: {path}")
+                else:
+                    path = write_excel(*executor.results['report'])
+                advance(75)
+                return path
+            
+            def merge_stage(conn):
+                # 8. CDR 테이블에 데이터 병합
+                self.log("\nCDR 메인 테이블에 데이터 병합 중...")
+                merge_cursor = conn.cursor()
+                try:
+                    affected_rows = None
+                    if switch_loader:
+                        try:
+                            affected_rows = switch_loader.switch(table_name)
+                            self.log(f"파티션 {switch_loader.partition_number}로 전환 완료 ({switch_loader.elapsed:.2f}초)")
+                        except PartitionSwitchError as e:
+                            self.log(f"⚠ {e}")
+                            self.log("⚠ INSERT 병합으로 진행합니다.")
+                    if affected_rows is None and self.options['merge_mode'] == 'dedup':
+                        merger = DedupMerger(conn, table_name, self.options)
+                        affected_rows = merger.merge(
+                            on_chunk=lambda done, total: advance(80 + int(done / total * 10))
+                        )
+                        self.log(f"중복 제외 병합 - {merger.summary()}")
+                    if affected_rows is None:
+                        insert_main_sql = f"INSERT INTO CDR SELECT * FROM {table_name}"
+                        merge_cursor.execute(insert_main_sql)
+                        affected_rows = merge_cursor.rowcount
+                        conn.commit()
+                    # 병합이 끝났으므로 다시 실행해도 이어서 적재하지 않도록 체크포인트 삭제
+                    if self.checkpoints:
+                        self.checkpoints.clear(self.csv_file)
+                    self.log(f"CDR 테이블에 {affected_rows}개 레코드 추가 완료")
+                except Exception as e:
+                    raise Exception(f"메인 테이블 병합 실패: {e}")
+                finally:
+                    merge_cursor.close()
+                advance(90)
+                return affected_rows
+            
+            def drop_stage(conn):
+                # 9. 임시 테이블 삭제
+                self.log(f"\n임시 테이블 삭제 중: {table_name}")
+                try:
+                    conn.cursor().execute(f"DROP TABLE {table_name}")
+                    conn.commit()
+                    self.log("임시 테이블 삭제 완료")
+                except Exception as e:
+                    self.log(f"⚠ 임시 테이블 삭제 경고: {e}")
+            
+            executor = StageExecutor(
+                self.conn, self.acquire_stage_connection, self.release_stage_connection,
+                overlap=self.options['stage_overlap'], log=self.log
+            )
+            executor.add('report', report_stage, db='any')
+            executor.add('excel', excel_stage, after=('report',))
+            executor.add('merge', merge_stage, after=('report',) if self.collector is None else (), db='main')
+            executor.add('drop', drop_stage, after=('report', 'merge'), db='main')
+            try:
+                executor.run()
+            except Exception:
+                if 'merge' in executor.done:
+                    self.log("\n⚠ CDR 병합은 완료되었습니다. 같은 파일을 다시 처리하면 다시 병합됩니다.")
+                raise
+            self.log(f"\n단계 실행: {executor.summary()}")
+            results = executor.results['report'][0]
+            excel_path = executor.results['excel']
+            
+            self.on_progress(100)
+            
+            # 완료
+            self.log("\n" + "=" * 60)
+            self.log("✓ 모든 작업이 성공적으로 완료되었습니다!")
+            self.log(f"✓ 엑셀 파일: {excel_path}")
+            self.log(f"✓ 미통화 건수: {len(results)}건")
+            self.log("=" * 60)
+            
+            self.on_finished(True, excel_path)
+            
+        except Exception as e:
+            self.log(f"\n❌ 오류 발생: {str(e)}")
+            self.log("=" * 60)
+            self.on_finished(False, str(e))
+            
+        finally:
+            # 적재 중에 시작한 리포트 작업이 추가 연결을 반납할 때까지 기다림
+            if self.early_report is not None:
+                wait([self.early_report])
+                self.early_report = None
+            self.report_task = None
+            # 적재나 조회가 끝나기 전에 실패하면 미리 만든 리포트를 남기지 않음
+            if self.partial_report is not None:
+                discard_report(self.partial_report)
+                self.log("⚠ 처리가 완료되지 않아 미리 만든 리포트를 삭제했습니다.")
+                self.partial_report = None
+            if self.checkpoints:
+                self.checkpoints.close()
+                self.checkpoints = None
+            if self.conn:
+                if self.db_pool:
+                    self.db_pool.release(self.conn)
+                    self.log("\n데이터베이스 연결 반납")
+                else:
+                    self.conn.close()
+                    self.log("\n데이터베이스 연결 종료")
+                self.conn = None
+
+
+def is_cdr_file(path):
+    """CDR 파일 이름인지 확인 (CDR-*.csv / .csv.gz / .csv.zst)"""
+    name = os.path.basename(path).lower()
+    return name.startswith('cdr-') and name.endswith(('.csv',) + tuple('.csv' + suffix for suffix in COMPRESSED_SUFFIXES))
+
+
+def find_cdr_files(patterns):
+    """폴더 / glob 패턴 / 파일 경로 목록에서 CDR 파일 찾기 (이름순, 중복 제외)"""
+    found = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        elif glob.has_magic(pattern):
+            paths = glob.glob(pattern)
+        else:
+            if not os.path.isfile(pattern):
+                raise Exception(f"CDR 파일을 찾을 수 없습니다: {pattern}")
+            paths = [pattern]
+        for path in paths:
+            if os.path.isfile(path) and is_cdr_file(path):
+                found.setdefault(os.path.normcase(os.path.abspath(path)), path)
+    return sorted(found.values(), key=lambda path: os.path.basename(path))
+
+
+class CDRBatchRunner:
+    """여러 CDR 파일을 작업자 풀로 처리 (일괄/감시 모드)
+
+    작업자들은 SQL Server 연결 풀 하나를 공유한다. 같은 임시 테이블을 쓰는 파일은 겹쳐 실행하지 않고,
+    처리를 마친 파일은 ProcessedFileStore에 기록해 다시 실행해도 건너뛴다 (force면 다시 처리).
+    """
+    
+    def __init__(self, db_config, options=None, workers=None, force=False, on_log=None):
+        self.options = options or dict(DEFAULT_PROCESS_OPTIONS)
+        self.workers = max(1, workers or self.options['batch_workers'])
+        self.force = force
+        self.on_log = on_log or (lambda message: None)
+        # 파일마다 주 연결 + 삽입 쓰기 연결(insert_writers) + 단계 겹침용 추가 연결을 쓸 수 있도록 풀 크기를 맞춤
+        self.db_pool = SqlConnectionPool(
+            db_config,
+            max_size=max(self.options['db_pool_size'], self.workers * (1 + self.options['insert_writers'] + 1)),
+            max_idle_seconds=self.options['db_pool_idle_seconds'],
+        )
+        self.db_config = db_config
+        self.processed = ProcessedFileStore()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.lock = threading.Lock()
+        self.submitted = set()
+        self.last_by_report = {}    # 리포트 키 → 마지막으로 넣은 작업
+        self.results = []           # (파일, 성공 여부, 결과, 소요 시간, 바이트, 레코드 수)
+        self.skipped = []
+        self.start_time = time.perf_counter()
+    
+    def log(self, message):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.on_log(f"[{timestamp}] {message}")
+    
+    @staticmethod
+    def _report_key(csv_file):
+        # 파일명(압축 확장자 제외)이 같은 파일은 같은 임시 테이블과 미통화 리스트 파일을 씀
+        return os.path.normcase(os.path.dirname(os.path.abspath(csv_file))), os.path.normcase(cdr_file_stem(csv_file))
+    
+    def submit(self, csv_file):
+        """파일을 처리 대기열에 넣음. 반환값: 넣었으면 True (이미 넣었거나 처리한 파일이면 False)"""
+        key = os.path.normcase(os.path.abspath(csv_file))
+        with self.lock:
+            if key in self.submitted:
+                return False
+            self.submitted.add(key)
+            if not self.force and self.processed.is_processed(csv_file):
+                self.skipped.append(csv_file)
+                self.log(f"건너뜀 (이미 처리됨): {os.path.basename(csv_file)}")
+                return False
+            report_key = self._report_key(csv_file)
+            previous = self.last_by_report.get(report_key)
+            future = self.executor.submit(self._process, csv_file, previous)
+            self.last_by_report[report_key] = future
+        self.log(f"대기열 추가: {os.path.basename(csv_file)}")
+        return True
+    
+    def _process(self, csv_file, previous):
+        if previous is not None:
+            # 먼저 넣은 작업이 풀 대기열 앞에 있으므로 교착 없이 끝남
+            wait([previous])
+        name = os.path.basename(csv_file)
+        outcome = {}
+        
+        def finished(success, result):
+            outcome['success'] = success
+            outcome['result'] = result
+        
+        self.log(f"처리 시작: {name}")
+        start = time.perf_counter()
+        processor = CDRProcessor(
+            csv_file, self.db_config, dict(self.options), self.db_pool,
+            on_log=lambda message: self.on_log(f"[{name}] {message}"),
+            on_finished=finished,
+        )
+        try:
+            processor.run()
+        except Exception as e:
+            outcome = {'success': False, 'result': str(e)}
+        elapsed = time.perf_counter() - start
+        success = outcome.get('success', False)
+        result = outcome.get('result', "처리 결과 없음")
+        if success:
+            self.processed.mark(csv_file, result)
+        size = os.path.getsize(csv_file) if os.path.exists(csv_file) else 0
+        with self.lock:
+            self.results.append((csv_file, success, result, elapsed, size, processor.inserted_rows))
+        self.log(f"{'처리 완료' if success else '처리 실패'}: {name} ({elapsed:.2f}초)")
+    
+    def run(self, patterns):
+        """패턴에 맞는 파일을 모두 처리하고 끝날 때까지 기다림"""
+        files = find_cdr_files(patterns)
+        self.log(f"CDR 파일 {len(files)}개 발견 (작업자 {self.workers}개)")
+        for csv_file in files:
+            self.submit(csv_file)
+        self.wait()
+    
+    def watch(self, folder, interval=None, stop_event=None):
+        """폴더를 주기적으로 확인해 새 CDR 파일을 처리 (stop_event가 설정되거나 Ctrl+C까지)
+
+        복사 중인 파일을 읽지 않도록 크기와 수정 시각이 한 주기 동안 그대로인 파일만 넣는다.
+        """
+        interval = interval or self.options['watch_interval_seconds']
+        stop_event = stop_event or threading.Event()
+        if not os.path.isdir(folder):
+            raise Exception(f"감시할 폴더를 찾을 수 없습니다: {folder}")
+        self.log(f"폴더 감시 시작: {folder} ({interval}초 주기, 작업자 {self.workers}개, Ctrl+C로 종료)")
+        last_seen = {}
+        try:
+            while not stop_event.is_set():
+                seen = {}
+                for csv_file in find_cdr_files([folder]):
+                    try:
+                        stat = os.stat(csv_file)
+                    except OSError:
+                        continue
+                    seen[csv_file] = (stat.st_size, stat.st_mtime)
+                    if last_seen.get(csv_file) == seen[csv_file]:
+                        self.submit(csv_file)
+                last_seen = seen
+                stop_event.wait(interval)
+        except KeyboardInterrupt:
+            self.log("감시 중지 요청 - 진행 중인 파일을 마치고 종료합니다.")
+        self.wait()
+    
+    def wait(self):
+        with self.lock:
+            futures = list(self.last_by_report.values())
+        # 같은 리포트 키의 앞 작업은 마지막 작업이 기다리므로 마지막 작업만 기다리면 됨
+        for future in futures:
+            future.result()
+    
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.processed.close()
+        self.db_pool.close()
+    
+    def failed(self):
+        return [result for result in self.results if not result[1]]
+    
+    def summary(self):
+        """처리량/실패 요약 (여러 줄)"""
+        wall = time.perf_counter() - self.start_time
+        succeeded = [result for result in self.results if result[1]]
+        rows = sum(result[5] for result in succeeded)
+        size_mb = sum(result[4] for result in succeeded) / (1024 * 1024)
+        busy = sum(result[3] for result in self.results)
+        lines = [
+            f"파일 {len(self.results) + len(self.skipped)}개: 성공 {len(succeeded)}, "
+            f"실패 {len(self.failed())}, 건너뜀 {len(self.skipped)}",
+            f"전체 {wall:.2f}초 (파일 처리 합계 {busy:.2f}초, 작업자 {self.workers}개)",
+        ]
+        if succeeded and wall > 0:
+            lines.append(f"처리량: {rows:,}건 ({rows / wall:,.0f}건/초), {size_mb:,.1f}MB ({size_mb / wall:,.2f}MB/초), "
+                         f"파일 {len(succeeded) / wall * 60:,.1f}개/분")
+        for csv_file, _, error, elapsed, _, _ in self.failed():
+            lines.append(f"  실패: {os.path.basename(csv_file)} ({elapsed:.2f}초) - {error}")
+        return "\n".join(lines)
@@ -19,6 +19,8 @@ build_exe_options = {
         "requests",
         "pyodbc",
         "openpyxl",
+        "xlsxwriter",   # 미통화 리스트 기본 작성기
+        "cdr",          # 처리 핵심 + 명령행 도구
         "PySide6.QtCore",
         "PySide6.QtGui",
         "PySide6.QtWidgets",
@@ -77,6 +79,15 @@ executable = Executable(
     target_name="Make_CDR_v5.exe",  # 생성될 실행파일 이름
 )
 
+# 명령행 실행파일 (PySide6 없이 시작, 콘솔 출력)
+# 사용: Make_CDR_cli.exe process CDR-25120900.csv
+cli_executable = Executable(
+    script="cdr/__main__.py",
+    base=None,
+    icon=icon_file,
+    target_name="Make_CDR_cli.exe",
+)
+
 # Setup 설정
 setup(
     name="Make_CDR",
@@ -84,5 +95,5 @@ setup(
     description="CDR 파일 처리 및 미통화 리스트 생성 프로그램",
     author="CDR Team",
     options={"build_exe": build_exe_options},
-    executables=[executable],
+    executables=[executable, cli_executable],
 )
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+CDRBatchRunner 테스트 (연결 풀 크기와 작업 직렬화 키)
+
+풀은 연결을 만들지 않은 상태로 크기만 확인한다.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("pyodbc")
+
+import cdr.core as core
+
+
+DB_CONFIG = {'DB_Type': 'x', 'Host': 'h', 'Port': 1, 'DB_Name': 'd', 'DB_ID': 'u', 'DB_PW': 'p'}
+
+
+@pytest.fixture
+def make_runner(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    runners = []
+
+    def make(workers, **options):
+        runner = core.CDRBatchRunner(DB_CONFIG, dict(core.DEFAULT_PROCESS_OPTIONS, **options), workers)
+        runners.append(runner)
+        return runner
+
+    yield make
+    for runner in runners:
+        runner.close()
+
+
+@pytest.mark.parametrize('workers, insert_writers, expected', [
+    (1, 1, 4),      # db_pool_size 기본값
+    (3, 1, 9),
+    (2, 4, 12),
+])
+def test_pool_covers_insert_writers(make_runner, workers, insert_writers, expected):
+    """파일마다 주 연결 + 쓰기 연결 + 단계 겹침 연결을 동시에 쓸 수 있는 크기"""
+    runner = make_runner(workers, insert_writers=insert_writers)
+    assert runner.db_pool.max_size == expected
+
+
+def test_report_key_follows_staging_table(tmp_path):
+    """같은 날짜라도 파일명이 다르면 따로, 압축 여부만 다르면 같은 임시 테이블이므로 차례로 처리"""
+    folder = str(tmp_path)
+    key = core.CDRBatchRunner._report_key
+    assert key(os.path.join(folder, "CDR-25120900.csv")) != key(os.path.join(folder, "CDR-25120901.csv"))
+    assert key(os.path.join(folder, "CDR-25120900.csv")) == key(os.path.join(folder, "CDR-25120900.csv.gz"))
@@ -0,0 +1,97 @@
+"""
+MemberMobileTable 테스트 (실행한 SQL만 기록하는 연결 대역)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pyodbc")
+
+import cdr.core as core
+
+
+class RecordingCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+        self._row = None
+
+    def execute(self, sql, *params):
+        self.conn.statements.append(sql)
+        self._row = None
+        if 'FROM sys.columns' in sql:
+            self._row = self.conn.key_column
+        elif 'FROM dbo.CDR_MemberMobileSync' in sql and 'SELECT TOP 1' in sql:
+            self._row = (None, self.conn.full_sync_at)
+        return self
+
+    def fetchone(self):
+        return self._row
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self, key_column=('int', 4, 10, 0), full_sync_at=None):
+        self.key_column = key_column
+        self.full_sync_at = full_sync_at
+        self.statements = []
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def ran(self, keyword):
+        return any(keyword in sql for sql in self.statements)
+
+
+def member_mobile(conn, **options):
+    return core.MemberMobileTable(conn, dict(core.DEFAULT_PROCESS_OPTIONS, **options))
+
+
+@pytest.mark.parametrize('key_column, expected', [
+    (('int', 4, 10, 0), 'MemberKey int NOT NULL'),
+    (('nvarchar', 40, 0, 0), 'MemberKey nvarchar(20) NOT NULL'),
+    (('decimal', 9, 18, 0), 'MemberKey decimal(18,0) NOT NULL'),
+])
+def test_setup_creates_not_null_key(key_column, expected):
+    """회원 키는 IDENTITY·NULL 허용을 복사하지 않고 형식만 가져와 NOT NULL로 만듦"""
+    conn = RecordingConnection(key_column)
+
+    member_mobile(conn).setup()
+
+    create = next(sql for sql in conn.statements if 'CREATE TABLE dbo.CDR_MemberMobile ' in sql)
+    assert expected in create
+    assert not conn.ran('SELECT TOP 0')
+
+
+def test_setup_reports_missing_key_column():
+    conn = RecordingConnection(key_column=None)
+    with pytest.raises(Exception, match="회원 키 컬럼이 없습니다"):
+        member_mobile(conn).setup()
+
+
+def test_refresh_without_modified_column_waits_for_full_sync():
+    """수정 일시 컬럼이 없으면 전체 동기화 주기 전에는 Member를 읽지 않음"""
+    conn = RecordingConnection(full_sync_at=datetime.now() - timedelta(hours=1))
+
+    result = member_mobile(conn).refresh()
+
+    assert result.startswith("건너뜀")
+    assert not conn.ran('MERGE') and not conn.ran('dbo.Member m')
+
+
+def test_refresh_without_modified_column_runs_due_full_sync():
+    conn = RecordingConnection(full_sync_at=datetime.now() - timedelta(hours=25))
+
+    result = member_mobile(conn).refresh()
+
+    assert result.startswith("전체")
+    assert conn.ran('MERGE')
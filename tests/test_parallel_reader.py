@@ -0,0 +1,89 @@
+"""
+ParallelCsvReader 테스트 (따옴표 필드가 범위 경계에 걸치는 CSV)
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pyodbc")
+
+import cdr.core as core
+
+
+def write_quoted_csv(path, rows):
+    """모든 필드를 따옴표로 감싸고 일부 필드에 줄바꿈과 "" 를 넣은 CDR 파일"""
+    day = datetime(2025, 12, 8, 9)
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        for n in range(rows):
+            rec_dt = f"{day + timedelta(seconds=n):%Y-%m-%d %H:%M:%S}"
+            memo = f'line "{n}"\r\nnext' if n % 7 == 0 else 'NORMAL'
+            fields = [rec_dt, f"010{n:08d}", '0212345678', 'IN', rec_dt, rec_dt, memo, 'Success']
+            f.write(','.join('"' + value.replace('"', '""') + '"' for value in fields) + '\r\n')
+
+
+def read_all(reader, batch_size=300):
+    return [row for batch in reader.batches(batch_size) for row in batch]
+
+
+def read_all_from(reader, offset):
+    return [row for batch in reader.batches(300, offset) for row in batch]
+
+
+def parallel_reader(path, ordered=True):
+    reader = core.ParallelCsvReader(path, 2, 0, ordered=ordered)
+    # 작은 범위로 나눠 따옴표 필드 안의 줄바꿈이 범위 경계 근처에 오게 함
+    reader.chunk_bytes = 4096
+    return reader
+
+
+def test_ranges_split_outside_quoted_fields(tmp_path):
+    path = str(tmp_path / "CDR-25120900.csv")
+    write_quoted_csv(path, 3000)
+
+    ranges = list(core.split_byte_ranges(path, 4096))
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert ranges[0][0] == 3 and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        # 경계 앞까지의 따옴표 수가 짝수 = 따옴표 필드 밖
+        assert data[:end].count(b'"') % 2 == 0
+    # 모든 필드에 따옴표가 있어도 범위가 하나로 합쳐지지 않음
+    assert max(end - start for start, end in ranges) < 4096 + 200
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_quoted_fields_match_stream(tmp_path, ordered):
+    path = str(tmp_path / "CDR-25120900.csv")
+    write_quoted_csv(path, 3000)
+    expected = read_all(core.CDRCsvStream(path))
+
+    reader = parallel_reader(path, ordered)
+    rows = read_all(reader)
+
+    assert len(rows) == 3000
+    assert (rows if ordered else sorted(rows)) == (expected if ordered else sorted(expected))
+    assert any(row[6].startswith('line "0"\r\n') for row in rows)
+    assert reader.progress == 1.0
+
+
+def test_resume_from_batch_end_offset(tmp_path):
+    path = str(tmp_path / "CDR-25120900.csv")
+    write_quoted_csv(path, 3000)
+    expected = read_all(core.CDRCsvStream(path))
+
+    reader = parallel_reader(path)
+    head = []
+    batches = reader.batches(300)
+    for batch in batches:
+        head.extend(batch)
+        if len(head) >= 1000:
+            break
+    batches.close()
+    offset = reader.batch_end_offset
+
+    assert 0 < offset < os.path.getsize(path)
+    assert head + read_all_from(parallel_reader(path), offset) == expected
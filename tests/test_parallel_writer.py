@@ -0,0 +1,108 @@
+"""
+ParallelStagingWriter 테스트
+
+SQL Server 연결 풀 대신 로컬 sqlite3 파일 DB 연결을 넘겨 여러 연결 삽입을 확인한다.
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+pytest.importorskip("pyodbc")
+
+import cdr.core as core
+
+
+TABLE_NAME = '[CDR-25120900]'
+
+
+def make_batches(rows, batch_size):
+    """일시 컬럼도 문자열로 둔 레코드 배치 (sqlite3 기본 변환기 경고를 피함)"""
+    records = [
+        (f"2025-12-08 09:{n // 60 % 60:02d}:{n % 60:02d}", f"010{n:08d}", '0212345678', 'IN',
+         None, None, 'NORMAL', 'Success' if n % 3 else 'NoAnswer')
+        for n in range(rows)
+    ]
+    return [records[start:start + batch_size] for start in range(0, rows, batch_size)]
+
+
+class SqliteConnections:
+    """acquire/release 쌍으로 sqlite3 연결을 빌려주고 반납 여부를 기록"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.opened = 0
+        self.released = 0
+
+    def acquire(self):
+        with self.lock:
+            self.opened += 1
+        # 쓰기 쓰레드가 연결을 쓰므로 쓰레드 검사 해제, 잠금은 짧게 기다림
+        return sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+
+    def release(self, conn):
+        with self.lock:
+            self.released += 1
+        conn.close()
+
+    def count(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {TABLE_NAME}").fetchone()[0]
+        finally:
+            conn.close()
+
+
+@pytest.fixture
+def connections(tmp_path):
+    path = str(tmp_path / "staging.db")
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE {TABLE_NAME} ({', '.join(core.CDR_COLUMNS)})")
+    conn.commit()
+    conn.close()
+    return SqliteConnections(path)
+
+
+@pytest.mark.parametrize('engine', ['fast_executemany', 'executemany'])
+@pytest.mark.parametrize('commit_rows', [1000, 5000])
+def test_parallel_writer_inserts_all_rows(connections, engine, commit_rows):
+    options = dict(core.DEFAULT_PROCESS_OPTIONS, insert_engine=engine, commit_rows=commit_rows)
+    writer = core.ParallelStagingWriter(connections.acquire, connections.release, TABLE_NAME, options, 4)
+
+    inserted = writer.write(iter(make_batches(12345, 1000)))
+
+    assert inserted == 12345
+    assert connections.count() == 12345
+    assert connections.opened == connections.released == 4
+    # fast_executemany가 없는 DB-API 커서는 일반 executemany로 삽입
+    assert all(engine.name == 'executemany' for engine in writer.engines)
+
+
+def test_parallel_writer_reports_writer_failure(connections):
+    batches = make_batches(5000, 500)
+    # 컬럼 수가 맞지 않는 배치로 쓰기 쓰레드 하나를 실패시킴
+    batches[3] = [row[:7] for row in batches[3]]
+    options = dict(core.DEFAULT_PROCESS_OPTIONS, commit_policy='single')
+    writer = core.ParallelStagingWriter(connections.acquire, connections.release, TABLE_NAME, options, 3)
+
+    with pytest.raises(Exception, match="쓰기 [0-9]번"):
+        writer.write(iter(batches))
+
+    # 단일 트랜잭션 정책이면 실패한 쓰레드와 멈춘 쓰레드의 배치가 모두 롤백됨
+    assert connections.count() == 0
+    assert connections.opened == connections.released == 3
+
+
+def test_parallel_writer_reports_reader_failure(connections):
+    def batches():
+        yield from make_batches(2000, 500)
+        raise ValueError("bad csv")
+
+    options = dict(core.DEFAULT_PROCESS_OPTIONS)
+    writer = core.ParallelStagingWriter(connections.acquire, connections.release, TABLE_NAME, options, 2)
+
+    with pytest.raises(Exception, match="CSV 읽기: bad csv"):
+        writer.write(batches())
+    assert connections.opened == connections.released == 2
@@ -0,0 +1,54 @@
+"""
+리포트 작성기 열 너비 테스트
+"""
+
+import openpyxl
+import pytest
+
+pytest.importorskip("pyodbc")
+
+from cdr.core import OpenpyxlReportWriter, XlsxWriterReportWriter
+
+COLUMNS = ['번호', '이름']
+
+
+def column_widths(path):
+    # xlsxwriter는 저장할 때 너비에 여백(0.71)을 더하므로 정수 부분만 비교
+    ws = openpyxl.load_workbook(path).active
+    return [int(ws.column_dimensions[letter].width) for letter in 'AB']
+
+
+def test_xlsxwriter_sizes_columns_from_all_chunks(tmp_path):
+    pytest.importorskip("xlsxwriter")
+    path = str(tmp_path / 'report.xlsx')
+    writer = XlsxWriterReportWriter(path, COLUMNS)
+    writer.write_rows([('010', 'a')])
+    writer.write_rows([('01012345678', 'b' * 20)])
+    writer.close()
+
+    assert writer.rows == 2
+    assert column_widths(path) == [13, 22]
+
+
+def test_openpyxl_stream_reports_rows_outside_width(tmp_path):
+    path = str(tmp_path / 'report.xlsx')
+    writer = OpenpyxlReportWriter(path, COLUMNS)
+    writer.write_rows([('010', 'a')])
+    writer.write_rows([('01012345678', 'b' * 20), ('011', 'c')])
+    writer.close()
+
+    # 쓰기 전용 시트는 시트를 시작한 첫 호출의 행으로만 너비를 정함
+    assert column_widths(path) == [5, 4]
+    assert writer.unsized_rows == 2
+    assert "열 너비에 반영되지 않은 행 2건" in writer.summary()
+
+
+def test_openpyxl_stream_sizes_single_call_from_all_rows(tmp_path):
+    path = str(tmp_path / 'report.xlsx')
+    writer = OpenpyxlReportWriter(path, COLUMNS)
+    writer.write_rows([('010', 'a'), ('01012345678', 'b' * 20)])
+    writer.close()
+
+    assert column_widths(path) == [13, 22]
+    assert writer.unsized_rows == 0
+    assert "열 너비" not in writer.summary()
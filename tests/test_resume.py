@@ -0,0 +1,265 @@
+"""
+압축 CDR 파일의 이어서 적재 테스트
+
+SQL Server 대신 SQL 문을 흉내 내는 연결 풀을 넘겨 CDRProcessor를 실행한다.
+"""
+
+import gzip
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pyodbc")
+
+import cdr.core as core
+
+
+ROWS = 2500
+
+
+def write_cdr_file(path, rows=ROWS):
+    """압축 CDR 파일 작성 후 압축 해제된 바이트 수 반환"""
+    day = datetime(2025, 12, 8, 9)
+    lines = []
+    for n in range(rows):
+        rec_dt = day + timedelta(seconds=n)
+        lines.append(f"{rec_dt:%Y-%m-%d %H:%M:%S},010{n:08d},0212345678,IN,"
+                     f"{rec_dt:%Y-%m-%d %H:%M:%S},{rec_dt:%Y-%m-%d %H:%M:%S},NORMAL,"
+                     f"{'Success' if n % 3 else 'NoAnswer'}\r\n")
+    data = ('\ufeff' + ''.join(lines)).encode('utf-8')
+    if path.endswith('.zst'):
+        with open(path, 'wb') as f:
+            f.write(core.zstandard.ZstdCompressor().compress(data))
+    else:
+        with gzip.open(path, 'wb') as f:
+            f.write(data)
+    return len(data)
+
+
+def compressed_suffixes():
+    suffixes = ['.gz']
+    if core.zstandard is not None:
+        suffixes.append('.zst')
+    return suffixes
+
+
+class FakeServer:
+    """임시 테이블 건수와 CDR 병합 건수만 기억하는 SQL Server 대역"""
+
+    def __init__(self, bulk_dir):
+        self.bulk_dir = bulk_dir
+        self.staged = 0
+        self.merged = 0
+        self.fail_merge = False
+        self.bulk_gate = None       # 설정하면 BULK INSERT가 이 이벤트를 기다림
+        self.bulk_overlapped = False
+        self.fail_commit_at = None  # 한 연결로 임시 테이블에 이 건수 이상 넣으면 그 연결의 커밋 실패
+
+
+class FakeCursor:
+    def __init__(self, server, conn=None):
+        self.server = server
+        self.conn = conn
+        self.description = None
+        self.rowcount = -1
+        self.fast_executemany = False
+        self._rows = []
+
+    def execute(self, sql, *params):
+        server = self.server
+        self._rows = []
+        if 'BULK INSERT' in sql:
+            if server.bulk_gate is not None:
+                server.bulk_overlapped = server.bulk_gate.wait(5)
+            # 적재 파일의 줄 수만큼 임시 테이블에 들어간 것으로 봄
+            for name in os.listdir(server.bulk_dir):
+                if name.endswith('.dat'):
+                    with open(os.path.join(server.bulk_dir, name), encoding='utf-8') as f:
+                        server.staged = sum(1 for _ in f)
+        elif 'COUNT_BIG' in sql:
+            self._rows = [(server.staged,)]
+        elif ('DROP TABLE' in sql or 'TRUNCATE TABLE' in sql) and '[CDR-' in sql:
+            # 이름 조회용 임시 테이블이 아니라 스테이징 테이블을 지울 때만
+            server.staged = 0
+        elif sql.strip().startswith('INSERT INTO CDR'):
+            if server.fail_merge:
+                raise core.pyodbc.Error('merge failed')
+            server.merged += server.staged
+            self.rowcount = server.staged
+        elif 'WITH Success' in sql:
+            self.description = [(column,) for column in core.MissedCallCollector.COLUMNS]
+        return self
+
+    def executemany(self, sql, rows):
+        if '[CDR-' not in sql:
+            return
+        count = len(list(rows))
+        self.server.staged += count
+        if self.conn is not None:
+            self.conn.inserted += count
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, server):
+        self.server = server
+        self.inserted = 0
+
+    def cursor(self):
+        return FakeCursor(self.server, self)
+
+    def commit(self):
+        if self.server.fail_commit_at is not None and self.inserted >= self.server.fail_commit_at:
+            raise core.pyodbc.Error('commit failed')
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    max_size = 4
+
+    def __init__(self, server):
+        self.server = server
+
+    def acquire(self):
+        return FakeConnection(self.server), False
+
+    def release(self, conn):
+        pass
+
+
+def run_processor(csv_file, server, on_message=None, **options):
+    outcome = {}
+    log = []
+
+    def on_log(message):
+        log.append(message)
+        if on_message:
+            on_message(message)
+
+    processor = core.CDRProcessor(
+        csv_file,
+        {'DB_Type': 'x', 'Host': 'h', 'Port': 1, 'DB_Name': 'd', 'DB_ID': 'u', 'DB_PW': 'p'},
+        dict(core.DEFAULT_PROCESS_OPTIONS, **options),
+        FakePool(server),
+        on_log=on_log,
+        on_finished=lambda success, result: outcome.update(success=success, result=result),
+    )
+    processor.run()
+    return outcome, log
+
+
+@pytest.mark.parametrize('suffix', compressed_suffixes())
+def test_resume_from_decompressed_offset(tmp_path, suffix):
+    """압축 파일을 중간 배치 끝 위치부터 읽으면 나머지 레코드만 그대로 읽음"""
+    csv_file = str(tmp_path / f"CDR-25120900.csv{suffix}")
+    write_cdr_file(csv_file)
+
+    expected = [row for batch in core.CDRCsvStream(csv_file).batches(400) for row in batch]
+    stream = core.CDRCsvStream(csv_file)
+    head = []
+    for batch in stream.batches(400):
+        head.extend(batch)
+        if len(head) >= 1200:
+            break
+    offset = stream.batch_end_offset
+
+    tail = [row for batch in core.CDRCsvStream(csv_file).batches(400, offset) for row in batch]
+    assert head + tail == expected
+
+
+@pytest.mark.parametrize('suffix', compressed_suffixes())
+def test_bulk_load_checkpoint_resumes(tmp_path, monkeypatch, suffix):
+    """BULK INSERT 후 병합이 실패하면 압축 해제 기준 끝 위치가 기록되어 다시 실행할 때 이어서 진행"""
+    monkeypatch.chdir(tmp_path)
+    csv_file = str(tmp_path / f"CDR-25120900.csv{suffix}")
+    decompressed_size = write_cdr_file(csv_file)
+    bulk_dir = tmp_path / "bulk"
+    bulk_dir.mkdir()
+    server = FakeServer(str(bulk_dir))
+    options = {
+        'load_mode': 'bulk',
+        'bulk_local_dir': str(bulk_dir),
+        'report_writer': 'csv',
+        'stage_overlap': False,
+    }
+
+    server.fail_merge = True
+    outcome, _ = run_processor(csv_file, server, **options)
+    assert outcome['success'] is False
+    assert server.staged == ROWS
+
+    store = core.CheckpointStore()
+    try:
+        checkpoint = store.load(csv_file)
+    finally:
+        store.close()
+    assert checkpoint['RowCount'] == ROWS
+    assert checkpoint['ByteOffset'] == decompressed_size
+
+    server.fail_merge = False
+    outcome, log = run_processor(csv_file, server, **options)
+    assert outcome['success'] is True, outcome['result']
+    assert server.merged == ROWS
+    # 같은 날짜의 다른 파일과 겹치지 않도록 리포트 이름에 파일명이 들어감
+    assert os.path.basename(outcome['result']) == "20251208_CDR-25120900_미통화리스트.csv"
+    assert any("이미 적재되어 있습니다" in message for message in log)
+
+
+def test_client_report_overlaps_bulk_load(tmp_path, monkeypatch):
+    """client 집계는 BULK INSERT가 끝나기 전에 리포트 작성을 시작"""
+    monkeypatch.chdir(tmp_path)
+    csv_file = str(tmp_path / "CDR-25120900.csv.gz")
+    write_cdr_file(csv_file)
+    bulk_dir = tmp_path / "bulk"
+    bulk_dir.mkdir()
+    server = FakeServer(str(bulk_dir))
+    # 리포트 작업이 시작되어야 BULK INSERT가 끝나도록 막아 둠
+    server.bulk_gate = threading.Event()
+
+    def on_message(message):
+        if "적재와 함께" in message:
+            server.bulk_gate.set()
+
+    outcome, log = run_processor(csv_file, server, on_message, load_mode='bulk', bulk_local_dir=str(bulk_dir),
+                                 report_writer='csv', report_engine='client', stage_overlap=True)
+
+    assert outcome['success'] is True, outcome['result']
+    assert server.bulk_overlapped
+    assert os.path.exists(outcome['result'])
+    assert not [name for name in os.listdir(tmp_path) if '.partial' in name]
+    assert sum("미통화 리스트 집계 완료" in message for message in log) == 1
+
+
+def test_failed_load_discards_early_report(tmp_path, monkeypatch):
+    """적재가 끝나기 전에 만든 리포트는 적재가 실패하면 남지 않음"""
+    monkeypatch.chdir(tmp_path)
+    csv_file = str(tmp_path / "CDR-25120900.csv.gz")
+    write_cdr_file(csv_file)
+    server = FakeServer(str(tmp_path))
+    # 마지막 배치를 삽입한 뒤의 커밋(리포트 작업 시작 후)에서 실패
+    server.fail_commit_at = ROWS
+
+    outcome, log = run_processor(csv_file, server, report_writer='csv', report_engine='client', stage_overlap=True)
+
+    assert outcome['success'] is False
+    assert any("적재와 함께" in message for message in log)
+    assert any("미리 만든 리포트를 삭제" in message for message in log)
+    assert not [name for name in os.listdir(tmp_path) if '미통화리스트' in name]